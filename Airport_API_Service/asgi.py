@@ -2,6 +2,8 @@
 ASGI config for Airport_API_Service project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP goes to Django; WebSocket connections are served by the live seat
+feed in ``flights.live``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
@@ -13,4 +15,12 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Airport_API_Service.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from flights.live import seat_websocket  # noqa: E402  (needs the app registry)
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "websocket":
+        return await seat_websocket(scope, receive, send)
+    return await django_application(scope, receive, send)
@@ -0,0 +1,137 @@
+"""Database routing for order shards and read replicas.
+
+Orders and tickets of a user live on the shard picked by
+``flights.sharding`` when ``ORDER_SHARDS`` is configured. Other reads go
+to a replica only inside a request that opted in through
+``replica_reads`` (see ``flights.mixins.ReplicaReadMixin``); everything
+else, including all writes, stays on ``default``. Replicas lagging more
+than ``REPLICA_MAX_LAG_SECONDS`` are skipped until the next lag check.
+"""
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+
+from flights.sharding import (
+    PRIMARY_DATABASE,
+    SHARDED_MODELS,
+    shard_for_user,
+    sharding_enabled,
+)
+
+replica_reads = ContextVar("replica_reads", default=False)
+
+_replica_health = {}
+
+
+def replica_lag(alias: str) -> float:
+    """Return the replication delay of ``alias`` in seconds."""
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+            "THEN 0 ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+            "END"
+        )
+        return float(cursor.fetchone()[0])
+
+
+def replica_is_healthy(alias: str) -> bool:
+    checked_at, healthy = _replica_health.get(alias, (None, False))
+    now = time.monotonic()
+    if checked_at is not None and now - checked_at < settings.REPLICA_LAG_CHECK_INTERVAL:
+        return healthy
+
+    try:
+        healthy = replica_lag(alias) <= settings.REPLICA_MAX_LAG_SECONDS
+    except DatabaseError:
+        healthy = False
+    _replica_health[alias] = (now, healthy)
+    return healthy
+
+
+def _pin_key(user_id) -> str:
+    return f"replica-pin:{user_id}"
+
+
+def pin_to_primary(user) -> None:
+    """Send the user's reads to the primary until their writes have replicated."""
+    cache.set(_pin_key(user.pk), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(user) -> bool:
+    return bool(user and user.is_authenticated and cache.get(_pin_key(user.pk)))
+
+
+class OrderShardRouter:
+    """Keep each user's orders and tickets on the user's shard."""
+
+    @staticmethod
+    def _shard_for_instance(instance):
+        if instance._state.db in settings.ORDER_SHARDS:
+            return instance._state.db
+        label = instance._meta.label_lower
+        if label == "flights.order":
+            user_id = instance.user_id
+        elif label == "flights.ticket" and instance.order_id is not None:
+            user_id = instance.order.user_id
+        else:
+            return None
+        return shard_for_user(user_id) if user_id is not None else None
+
+    def db_for_read(self, model, **hints):
+        if not sharding_enabled():
+            return None
+        instance = hints.get("instance")
+        if instance is None:
+            return None
+        if model._meta.label_lower in SHARDED_MODELS:
+            return self._shard_for_instance(instance)
+        if instance._state.db in settings.ORDER_SHARDS:
+            return PRIMARY_DATABASE
+        return None
+
+    def db_for_write(self, model, **hints):
+        instance = hints.get("instance")
+        if not sharding_enabled() or instance is None:
+            return None
+        if model._meta.label_lower in SHARDED_MODELS:
+            return self._shard_for_instance(instance)
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if not sharding_enabled():
+            return None
+        databases = {PRIMARY_DATABASE, *settings.ORDER_SHARDS, *settings.REPLICA_DATABASES}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not replica_reads.get():
+            return None
+        replicas = [
+            alias for alias in settings.REPLICA_DATABASES if replica_is_healthy(alias)
+        ]
+        return random.choice(replicas) if replicas else PRIMARY_DATABASE
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DATABASE
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY_DATABASE, *settings.REPLICA_DATABASES}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.REPLICA_DATABASES:
+            return False
+        return None
@@ -0,0 +1,126 @@
+"""OpenAPI schema generated once per code version instead of on every request.
+
+``manage.py generate_schema`` (or the first request after a deploy)
+introspects the API and writes ``SCHEMA_ROOT/openapi-<version>.json``.
+``CachedSchemaView`` serves that schema from memory, rendered once per
+format, with an ETag so browsers revalidate the Swagger and Redoc pages
+for free. The version is ``APP_VERSION`` when set, otherwise a hash of
+the project's source files, so a new release always gets a new schema.
+"""
+import functools
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+import drf_spectacular
+from django.apps import apps
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from drf_spectacular.renderers import OpenApiJsonRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.views import SpectacularAPIView
+
+SCHEMA_FILE_PREFIX = "openapi-"
+
+_lock = threading.Lock()
+_schema = None
+_rendered = {}
+
+
+def _source_files():
+    base_dir = Path(settings.BASE_DIR).resolve()
+    roots = {Path(config.path).resolve() for config in apps.get_app_configs()}
+    roots.add(Path(__file__).resolve().parent)
+    for root in sorted(root for root in roots if root.is_relative_to(base_dir)):
+        for path in sorted(root.rglob("*.py")):
+            if "tests" not in path.parts and "migrations" not in path.parts:
+                yield base_dir, path
+
+
+@functools.cache
+def code_version() -> str:
+    if settings.APP_VERSION:
+        return settings.APP_VERSION
+    digest = hashlib.sha256(drf_spectacular.__version__.encode())
+    digest.update(repr(settings.SPECTACULAR_SETTINGS).encode())
+    for base_dir, path in _source_files():
+        digest.update(str(path.relative_to(base_dir)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def schema_path(version: str | None = None) -> Path:
+    return Path(settings.SCHEMA_ROOT) / f"{SCHEMA_FILE_PREFIX}{version or code_version()}.json"
+
+
+def generate_schema() -> dict:
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    return generator.get_schema(request=None, public=True)
+
+
+def write_schema(schema: dict, path: Path | None = None) -> Path:
+    """Write ``schema`` atomically and remove the files of other versions."""
+    path = path or schema_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix(f".{os.getpid()}.tmp")
+    temporary.write_bytes(OpenApiJsonRenderer().render(schema))
+    os.replace(temporary, path)
+    for old in path.parent.glob(f"{SCHEMA_FILE_PREFIX}*.json"):
+        if old != path:
+            old.unlink(missing_ok=True)
+    return path
+
+
+def load_schema() -> dict:
+    """The schema of the running code: from memory, from its file, or generated once."""
+    global _schema
+    with _lock:
+        if _schema is None:
+            path = schema_path()
+            if path.is_file():
+                _schema = json.loads(path.read_bytes())
+            else:
+                _schema = generate_schema()
+                try:
+                    write_schema(_schema, path)
+                except OSError:
+                    # A read-only deployment still serves it from memory.
+                    pass
+        return _schema
+
+
+def rendered_schema(renderer) -> tuple[bytes, str]:
+    """Schema bytes in the format of ``renderer`` and their ETag."""
+    key = type(renderer)
+    if key not in _rendered:
+        content = renderer.render(load_schema(), renderer.media_type)
+        etag = f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+        _rendered[key] = (content, etag)
+    return _rendered[key]
+
+
+def reset() -> None:
+    global _schema
+    with _lock:
+        _schema = None
+        _rendered.clear()
+
+
+class CachedSchemaView(SpectacularAPIView):
+    """``SpectacularAPIView`` serving the pre-generated schema of the running code."""
+
+    def _get_schema_response(self, request):
+        renderer, media_type = self.perform_content_negotiation(request)
+        content, etag = rendered_schema(renderer)
+        if etag in request.headers.get("If-None-Match", ""):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(content, content_type=media_type)
+            response["Content-Disposition"] = (
+                f'inline; filename="{self._get_filename(request, None)}"'
+            )
+        response["ETag"] = etag
+        response["Cache-Control"] = "no-cache"
+        return response
@@ -98,6 +98,59 @@ DATABASES = {
     }
 }
 
+# Read replicas share the primary credentials; list their hosts in
+# POSTGRES_REPLICA_HOSTS (comma-separated) to enable replica reads
+for number, host in enumerate(
+    filter(None, os.getenv("POSTGRES_REPLICA_HOSTS", "").split(",")), start=1
+):
+    DATABASES[f"replica_{number}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "TEST": {"MIRROR": "default"},
+    }
+
+REPLICA_DATABASES = [alias for alias in DATABASES if alias.startswith("replica_")]
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", 5))
+REPLICA_LAG_CHECK_INTERVAL = 10
+# How long a user's reads stay on the primary after they place an order
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", 15))
+
+# Opt-in sharding of orders and tickets by user: one host per shard in
+# ORDER_SHARD_HOSTS (comma-separated); shards carry a replicated catalog
+for number, host in enumerate(
+    filter(None, os.getenv("ORDER_SHARD_HOSTS", "").split(",")), start=1
+):
+    DATABASES[f"orders_{number}"] = {**DATABASES["default"], "HOST": host}
+
+ORDER_SHARDS = [alias for alias in DATABASES if alias.startswith("orders_")]
+
+DATABASE_ROUTERS = [
+    "Airport_API_Service.db_routers.OrderShardRouter",
+    "Airport_API_Service.db_routers.ReplicaRouter",
+]
+
+
+# Cache
+# Replica pins and the versions of the route map and airport distances
+# must be seen by every worker process, so anything serving more than one
+# process needs REDIS_URL. The local-memory fallback only suits a single
+# runserver process (`manage.py check --deploy` warns about it). The live
+# seat feed publishes through the same Redis.
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -175,3 +228,67 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "ROTATE_REFRESH_TOKENS": True
 }
+
+# Minimum ground time between two flights operated by the same airplane
+FLIGHT_MIN_TURNAROUND = timedelta(
+    minutes=int(os.getenv("FLIGHT_MIN_TURNAROUND_MINUTES", 45))
+)
+
+# Opt-in monthly partitioning of flights and tickets (PostgreSQL only),
+# maintained with `manage.py partition_tables`
+FLIGHT_PARTITIONING = os.getenv("FLIGHT_PARTITIONING", "false").lower() == "true"
+
+# Directory receiving the compressed monthly files written by `manage.py archive_flights`
+FLIGHT_ARCHIVE_ROOT = Path(os.getenv("FLIGHT_ARCHIVE_ROOT", BASE_DIR / "archive"))
+
+# Fare engine rules (see flights.fares): distance-based base fare, demand
+# surcharge above the load factor threshold and advance-purchase tiers
+FARE_RULES = {
+    "base_fare": float(os.getenv("FARE_BASE", 25)),
+    "per_km": float(os.getenv("FARE_PER_KM", 0.08)),
+    "minimum_fare": float(os.getenv("FARE_MINIMUM", 40)),
+    "load_factor_threshold": 0.6,
+    "load_factor_surcharge": 0.8,
+    "advance_purchase": [(3, 1.5), (14, 1.25), (30, 1.1)],
+}
+
+# Seconds an airport departure/arrival board is served from memory before being reloaded
+FLIGHT_BOARD_TTL = int(os.getenv("FLIGHT_BOARD_TTL_SECONDS", 60))
+
+# How long order responses are kept for Idempotency-Key replays
+IDEMPOTENCY_KEY_TTL = timedelta(hours=int(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", 24)))
+# A retry may take over a key whose request has not answered for this long
+# (it crashed); keep it above the worker timeout
+IDEMPOTENCY_CLAIM_TIMEOUT = timedelta(
+    seconds=int(os.getenv("IDEMPOTENCY_CLAIM_TIMEOUT_SECONDS", 120))
+)
+
+# Queue new orders for `manage.py run_booking_workers` instead of booking them in the request
+ASYNC_ORDER_INTAKE = os.getenv("ASYNC_ORDER_INTAKE", "false").lower() == "true"
+
+# Directory receiving the memory-mappable column files written by `manage.py snapshot_columns`
+COLUMNAR_SNAPSHOT_ROOT = Path(os.getenv("COLUMNAR_SNAPSHOT_ROOT", BASE_DIR / "snapshots"))
+
+# Release identifier; the pre-generated OpenAPI schema is keyed by it (a hash
+# of the source files when unset). `manage.py generate_schema` writes the
+# schema file to SCHEMA_ROOT.
+APP_VERSION = os.getenv("APP_VERSION")
+SCHEMA_ROOT = Path(os.getenv("SCHEMA_ROOT", BASE_DIR / "schema"))
+
+# Cache warm-up at gunicorn worker start: boards of the airports on the
+# CACHE_WARMUP_ROUTES busiest routes of the next CACHE_WARMUP_DAYS days,
+# within CACHE_WARMUP_BUDGET seconds (`manage.py warm_caches` only fills the
+# shared route map)
+CACHE_WARMUP_DAYS = int(os.getenv("CACHE_WARMUP_DAYS", 7))
+CACHE_WARMUP_ROUTES = int(os.getenv("CACHE_WARMUP_ROUTES", 20))
+CACHE_WARMUP_BUDGET = float(os.getenv("CACHE_WARMUP_BUDGET_SECONDS", 10))
+
+# Threads hashing passwords for the register and token endpoints, and how
+# many more requests may wait for one before they are refused with 429
+AUTH_EXECUTOR_WORKERS = int(os.getenv("AUTH_EXECUTOR_WORKERS", 2))
+AUTH_EXECUTOR_QUEUE = int(os.getenv("AUTH_EXECUTOR_QUEUE", 16))
+# Under a WSGI (gthread) worker a signing-in request holds its thread while it
+# waits for the pool; keep most of the GUNICORN_THREADS free for other requests
+AUTH_EXECUTOR_WSGI_SLOTS = int(
+    os.getenv("AUTH_EXECUTOR_WSGI_SLOTS", max(int(os.getenv("GUNICORN_THREADS", 4)) // 2, 1))
+)
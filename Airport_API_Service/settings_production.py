@@ -0,0 +1,39 @@
+"""
+Production settings: the development settings without debug tooling.
+
+Selected by gunicorn.conf.py; set DJANGO_SETTINGS_MODULE to
+``Airport_API_Service.settings_production`` to use them elsewhere.
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, INSTALLED_APPS, MIDDLEWARE
+
+DEBUG = os.getenv("DJANGO_DEBUG", "false").lower() == "true"
+
+ALLOWED_HOSTS = [host for host in os.getenv("ALLOWED_HOSTS", "").split(",") if host]
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app != "debug_toolbar"]
+
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE if not middleware.startswith("debug_toolbar.")
+]
+
+# Workers must share replica pins, lookup versions and live seat events
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+    }
+}
+
+# Keep connections open across requests in each worker, checked before reuse
+for database in DATABASES.values():
+    database["CONN_MAX_AGE"] = int(os.getenv("CONN_MAX_AGE", 60))
+    database["CONN_HEALTH_CHECKS"] = True
+
+SESSION_COOKIE_SECURE = os.getenv("SECURE_COOKIES", "true").lower() == "true"
+CSRF_COOKIE_SECURE = SESSION_COOKIE_SECURE
+SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
@@ -0,0 +1,64 @@
+"""Work done once in the gunicorn master before it forks its workers.
+
+With ``preload_app`` the master imports Django and runs :func:`warm_up`,
+so URL resolvers, serializer modules and field metadata, and the OpenAPI
+schema are built once and shared copy-on-write by every worker instead
+of being rebuilt on each worker's first requests. The database
+connection is opened to check it and load the driver, then closed: a
+connection must not be shared across a fork.
+"""
+import importlib
+import time
+
+from django.apps import apps
+from django.db import connections
+from django.urls import get_resolver
+from rest_framework import serializers
+
+from Airport_API_Service.schema import load_schema
+
+
+def _timed(timings: dict, name: str, step) -> None:
+    started = time.perf_counter()
+    step()
+    timings[name] = time.perf_counter() - started
+
+
+def resolve_urls() -> None:
+    resolver = get_resolver()
+    resolver.reverse_dict  # builds the reverse lookup tables of every namespace
+    for namespace in resolver.namespace_dict:
+        resolver.namespace_dict[namespace][1].reverse_dict
+
+
+def build_serializers() -> None:
+    """Import every app's serializers and build the fields of the model serializers."""
+    for config in apps.get_app_configs():
+        try:
+            module = importlib.import_module(f"{config.name}.serializers")
+        except ModuleNotFoundError:
+            continue
+        for value in vars(module).values():
+            if (
+                isinstance(value, type)
+                and issubclass(value, serializers.ModelSerializer)
+                and value.__module__ == module.__name__
+                and getattr(getattr(value, "Meta", None), "model", None) is not None
+            ):
+                value().fields
+
+
+def check_database() -> None:
+    connections["default"].ensure_connection()
+    connections.close_all()
+
+
+def warm_up(database: bool = True) -> dict[str, float]:
+    """Warm the process and return the seconds spent on each step."""
+    timings = {}
+    _timed(timings, "urls", resolve_urls)
+    _timed(timings, "serializers", build_serializers)
+    _timed(timings, "schema", load_schema)
+    if database:
+        _timed(timings, "database", check_database)
+    return timings
@@ -1,4 +1,7 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
 
 from flights.models import (
     Airport,
@@ -11,11 +14,52 @@ from flights.models import (
     Ticket
 )
 
+# Below this many rows an exact COUNT(*) is cheap enough to run.
+EXACT_COUNT_THRESHOLD = 10000
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that reads the planner's row estimate for unfiltered PostgreSQL tables.
+
+    Filtered changelists, small tables and other databases still get an
+    exact count.
+    """
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, "query", None)
+        if query is None or query.where:
+            return super().count
+
+        connection = connections[self.object_list.db]
+        if connection.vendor != "postgresql":
+            return super().count
+
+        table = self.object_list.model._meta.db_table
+        with connection.cursor() as cursor:
+            # A partitioned table keeps its rows, and their estimate, in its partitions.
+            cursor.execute(
+                "SELECT SUM(GREATEST(reltuples, 0)) FROM pg_class "
+                "WHERE oid = %s::regclass "
+                "OR oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = %s::regclass)",
+                [table, table],
+            )
+            estimate = int(cursor.fetchone()[0] or 0)
+        if estimate < EXACT_COUNT_THRESHOLD:
+            return super().count
+        return estimate
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    ordering = ("-id",)
+
 
 @admin.register(Airport)
 class AirportAdmin(admin.ModelAdmin):
-    list_display = ("id", "name", "closest_big_city")
-    search_fields = ("name", "closest_big_city")
+    list_display = ("id", "name", "iata_code", "closest_big_city")
+    search_fields = ("name", "iata_code", "closest_big_city")
 
 
 @admin.register(AirplaneType)
@@ -27,6 +71,7 @@ class AirplaneTypeAdmin(admin.ModelAdmin):
 @admin.register(Airplane)
 class AirplaneAdmin(admin.ModelAdmin):
     list_display = ("id", "name", "rows", "seats_in_row", "airplane_type")
+    list_select_related = ("airplane_type",)
     search_fields = ("name",)
     list_filter = ("airplane_type",)
 
@@ -34,8 +79,20 @@ class AirplaneAdmin(admin.ModelAdmin):
 @admin.register(Route)
 class RouteAdmin(admin.ModelAdmin):
     list_display = ("id", "source", "destination", "distance")
-    search_fields = ("source__name", "destination__name")
-    list_filter = ("source", "destination")
+    list_select_related = ("source", "destination")
+    search_fields = (
+        "source__name",
+        "source__iata_code",
+        "destination__name",
+        "destination__iata_code",
+    )
+    autocomplete_fields = ("source", "destination")
+    ordering = ("id",)
+
+    def get_queryset(self, request):
+        # Also used for autocomplete results, which render Route.__str__. The
+        # changelist skips list_select_related once a queryset has select_related.
+        return super().get_queryset(request).select_related(*self.list_select_related)
 
 
 @admin.register(Crew)
@@ -45,20 +102,66 @@ class CrewAdmin(admin.ModelAdmin):
 
 
 @admin.register(Flight)
-class FlightAdmin(admin.ModelAdmin):
+class FlightAdmin(LargeTableAdmin):
     list_display = ("id", "route", "airplane", "departure_time", "arrival_time")
-    search_fields = ("route__source__name", "route__destination__name", "airplane__name")
-    list_filter = ("route", "airplane", "departure_time")
+    list_select_related = ("route__source", "route__destination", "airplane")
+    search_fields = (
+        "route__source__name",
+        "route__source__iata_code",
+        "route__destination__name",
+        "route__destination__iata_code",
+        "airplane__name",
+    )
+    list_filter = ("departure_time", "airplane__airplane_type")
+    autocomplete_fields = ("route", "airplane", "crew")
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(*self.list_select_related)
+
+
+def flights_with_routes():
+    return Flight.objects.select_related("route__source", "route__destination")
 
 
 class TicketInLine(admin.TabularInline):
     model = Ticket
     extra = 1
+    autocomplete_fields = ("flight",)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            "flight__route__source", "flight__route__destination"
+        )
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == "flight":
+            # The widget only loads the selected flight; make that one query.
+            kwargs["queryset"] = flights_with_routes()
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(LargeTableAdmin):
+    list_display = ("id", "user", "created_at")
+    list_select_related = ("user",)
+    search_fields = ("user__email",)
+    autocomplete_fields = ("user",)
     inlines = (TicketInLine,)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(*self.list_select_related)
+
+
+@admin.register(Ticket)
+class TicketAdmin(LargeTableAdmin):
+    list_display = ("id", "flight", "row", "seat", "order")
+    list_select_related = ("flight__route__source", "flight__route__destination", "order__user")
+    search_fields = ("order__user__email",)
+    autocomplete_fields = ("flight", "order")
 
-admin.site.register(Ticket)
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == "flight":
+            kwargs["queryset"] = flights_with_routes()
+        elif db_field.name == "order":
+            kwargs["queryset"] = Order.objects.select_related("user")
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
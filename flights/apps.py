@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class FlightsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'flights'
+
+    def ready(self):
+        from flights import checks, signals  # noqa: F401
@@ -0,0 +1,299 @@
+"""Cold storage of departed flights with their tickets and orders.
+
+Each month goes to ``FLIGHT_ARCHIVE_ROOT/flights-YYYY-MM.jsonl.gz``,
+written as a series of independently compressed gzip members of at
+most ``ARCHIVE_CHUNK_SIZE`` records. The file stays a valid gzip stream,
+and :class:`~flights.models.ArchivedOrder` remembers the offset of the
+member holding each order, so reading one order back decompresses a
+single chunk instead of the whole month.
+
+With sharding on, tickets and orders are read and deleted on every order
+database. Order and ticket ids are only unique per database, but a
+user's orders all live on one shard, so records are told apart by user
+and id.
+
+A run writes the month file anew next to the old one and renames it
+into place together with the index entries, and it leaves out the
+flights and tickets the file already holds. Rerunning after a failure,
+for example when deleting the archived rows was interrupted, therefore
+neither leaves a torn file nor writes records twice.
+"""
+import gzip
+import json
+import os
+import shutil
+import zlib
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from itertools import groupby, islice
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Max
+
+from flights import rollups
+from flights.models import ArchivedOrder, Flight, Order, Ticket
+from flights.sharding import order_database, order_databases
+
+ARCHIVE_CHUNK_SIZE = 500
+READ_BLOCK_SIZE = 64 * 1024
+
+
+def month_bounds(month: date) -> tuple[datetime, datetime]:
+    start = datetime.combine(month, time.min, tzinfo=dt_timezone.utc)
+    next_month = (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+    end = datetime.combine(next_month, time.min, tzinfo=dt_timezone.utc)
+    return start, end
+
+
+def archive_name(month: date) -> str:
+    return f"flights-{month:%Y-%m}.jsonl.gz"
+
+
+def archive_path(name: str) -> Path:
+    return Path(settings.FLIGHT_ARCHIVE_ROOT) / name
+
+
+def route_label(source_iata, source_city, destination_iata, destination_city) -> str:
+    return (
+        f"{source_iata} ({source_city}) Airport to "
+        f"{destination_iata} ({destination_city}) Airport"
+    )
+
+
+def _chunks(iterable, size: int):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _write_member(file, records) -> int:
+    """Append records as one gzip member and return the member offset."""
+    offset = file.tell()
+    lines = "".join(json.dumps(record, cls=DjangoJSONEncoder) + "\n" for record in records)
+    file.write(gzip.compress(lines.encode()))
+    return offset
+
+
+def read_member(path: Path, offset: int) -> list[dict]:
+    """Decompress the single gzip member starting at ``offset``."""
+    decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+    data = bytearray()
+    with open(path, "rb") as file:
+        file.seek(offset)
+        while not decompressor.eof:
+            block = file.read(READ_BLOCK_SIZE)
+            if not block:
+                break
+            data += decompressor.decompress(block)
+    return [json.loads(line) for line in data.decode().splitlines()]
+
+
+def archived_ids(path: Path) -> tuple[set[int], dict[str, set[int]]]:
+    """Ids of the flights, and of the tickets per order database, already in the archive file."""
+    flight_ids, ticket_ids = set(), defaultdict(set)
+    if not path.exists():
+        return flight_ids, ticket_ids
+    with gzip.open(path, "rt") as file:
+        for line in file:
+            record = json.loads(line)
+            if record["type"] == "flight":
+                flight_ids.add(record["id"])
+            else:
+                ticket_ids[order_database(record["user"])].update(
+                    ticket["id"] for ticket in record["tickets"]
+                )
+    return flight_ids, ticket_ids
+
+
+def _flight_records(flights):
+    rows = flights.order_by("id").values_list(
+        "id",
+        "airplane_id",
+        "route_id",
+        "route__source__iata_code",
+        "route__source__closest_big_city",
+        "route__destination__iata_code",
+        "route__destination__closest_big_city",
+        "departure_time",
+        "arrival_time",
+    )
+    for flight_id, airplane_id, route_id, *route, departure, arrival in rows.iterator():
+        yield {
+            "type": "flight",
+            "id": flight_id,
+            "airplane": airplane_id,
+            "route_id": route_id,
+            "route": route_label(*route),
+            "departure_time": departure,
+            "arrival_time": arrival,
+        }
+
+
+def _order_records(tickets):
+    rows = tickets.order_by("order_id", "id").values_list(
+        "order_id",
+        "order__user_id",
+        "order__created_at",
+        "id",
+        "row",
+        "seat",
+        "flight_id",
+        "flight__route__source__iata_code",
+        "flight__route__source__closest_big_city",
+        "flight__route__destination__iata_code",
+        "flight__route__destination__closest_big_city",
+        "flight__departure_time",
+        "flight__arrival_time",
+    )
+    for (order_id, user_id, created_at), order_rows in groupby(
+        rows.iterator(), key=lambda row: row[:3]
+    ):
+        yield {
+            "type": "order",
+            "id": order_id,
+            "user": user_id,
+            "created_at": created_at,
+            "tickets": [
+                {
+                    "id": ticket_id,
+                    "row": row,
+                    "seat": seat,
+                    "flight": {
+                        "id": flight_id,
+                        "route": route_label(*route),
+                        "departure_time": departure,
+                        "arrival_time": arrival,
+                    },
+                }
+                for _, _, _, ticket_id, row, seat, flight_id, *route, departure, arrival
+                in order_rows
+            ],
+        }
+
+
+def delete_in_batches(queryset, batch_size: int) -> int:
+    """Delete the rows of ``queryset`` a batch at a time, one transaction each."""
+    deleted = 0
+    while ids := list(queryset.values_list("id", flat=True)[:batch_size]):
+        with transaction.atomic(using=queryset.db):
+            queryset.model.objects.using(queryset.db).filter(id__in=ids).delete()
+        deleted += len(ids)
+    return deleted
+
+
+def archive_month(month: date, before: datetime, batch_size: int) -> dict:
+    """Archive and delete the flights of ``month`` that arrived before ``before``."""
+    start, end = month_bounds(month)
+    flights = Flight.objects.filter(
+        departure_time__gte=start, departure_time__lt=end, arrival_time__lt=before
+    )
+    max_flight = flights.aggregate(max_flight=Max("id"))["max_flight"]
+    if max_flight is None:
+        return {"flights": 0, "orders": 0, "tickets": 0}
+    flights = flights.filter(id__lte=max_flight)
+    # Order databases carry a copy of the flights to join tickets with.
+    tickets = {}
+    for database in order_databases():
+        on_database = Ticket.objects.using(database).filter(
+            flight__departure_time__gte=start,
+            flight__departure_time__lt=end,
+            flight__arrival_time__lt=before,
+            flight_id__lte=max_flight,
+        )
+        max_ticket = on_database.aggregate(max_ticket=Max("id"))["max_ticket"]
+        tickets[database] = on_database.filter(id__lte=max_ticket or 0)
+
+    name = archive_name(month)
+    path = archive_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    written_flights, written_tickets = archived_ids(path)
+    partial = path.with_name(f"{name}.partial")
+    entries = []
+    with open(partial, "wb") as file:
+        if path.exists():
+            with open(path, "rb") as existing:
+                shutil.copyfileobj(existing, file)
+        for records in _chunks(
+            _flight_records(flights.exclude(id__in=written_flights)), ARCHIVE_CHUNK_SIZE
+        ):
+            _write_member(file, records)
+        for database, on_database in tickets.items():
+            for records in _chunks(
+                _order_records(on_database.exclude(id__in=written_tickets[database])),
+                ARCHIVE_CHUNK_SIZE,
+            ):
+                offset = _write_member(file, records)
+                entries.extend(
+                    ArchivedOrder(
+                        order_id=record["id"],
+                        user_id=record["user"],
+                        created_at=record["created_at"],
+                        archive=name,
+                        offset=offset,
+                    )
+                    for record in records
+                )
+        file.flush()
+        os.fsync(file.fileno())
+
+    # The file is replaced last, so a failed index insert leaves the old file in place.
+    with transaction.atomic():
+        ArchivedOrder.objects.bulk_create(
+            entries, ignore_conflicts=True, batch_size=ARCHIVE_CHUNK_SIZE
+        )
+        os.replace(partial, path)
+    orders = len(entries)
+
+    # Archived days keep their seats in the route load rollups.
+    with rollups.suspended():
+        stats = {
+            "tickets": sum(
+                delete_in_batches(on_database, batch_size) for on_database in tickets.values()
+            ),
+            "flights": delete_in_batches(flights, batch_size),
+            "orders": orders,
+        }
+    archived_orders = defaultdict(list)
+    for order_id, user_id in ArchivedOrder.objects.filter(archive=name).values_list(
+        "order_id", "user_id"
+    ):
+        archived_orders[order_database(user_id)].append(order_id)
+    for database, order_ids in archived_orders.items():
+        for ids in _chunks(order_ids, batch_size):
+            delete_in_batches(
+                Order.objects.using(database).filter(id__in=ids, tickets__isnull=True),
+                batch_size,
+            )
+    return stats
+
+
+def load_archived_orders(entries) -> list[dict]:
+    """Read the archived orders for ``entries`` back, one chunk per distinct offset."""
+    chunks = {}
+    for entry in entries:
+        key = (entry.archive, entry.offset)
+        if key not in chunks:
+            chunks[key] = {
+                (record["user"], record["id"]): record
+                for record in read_member(archive_path(entry.archive), entry.offset)
+                if record["type"] == "order"
+            }
+
+    orders = {}
+    for entry in entries:
+        record = chunks[(entry.archive, entry.offset)].get((entry.user_id, entry.order_id))
+        if record is None:
+            continue
+        order = orders.setdefault(
+            entry.order_id,
+            {"id": entry.order_id, "created_at": record["created_at"], "tickets": {}},
+        )
+        for ticket in record["tickets"]:
+            order["tickets"][ticket["id"]] = ticket
+    return [
+        {**order, "tickets": list(order["tickets"].values())}
+        for order in orders.values()
+    ]
@@ -0,0 +1,108 @@
+"""Per-airport departure and arrival boards held in process memory.
+
+A board is the time-sorted list of ``(time, flight_id)`` pairs of the
+upcoming flights of one airport in one direction. It is read from the
+database the first time it is asked for and afterwards kept current by
+the ``Flight`` signal handlers in ``flights.signals``, one insertion or
+removal per change. Boards are reloaded after ``FLIGHT_BOARD_TTL``
+seconds, which bounds how long changes made by other processes stay
+invisible.
+"""
+import bisect
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+from flights.models import Flight
+
+BOARD_DIRECTIONS = {
+    "departures": ("route__source_id", "departure_time"),
+    "arrivals": ("route__destination_id", "arrival_time"),
+}
+
+BOARD_LIMIT = 50
+BOARD_MAX_LIMIT = 200
+
+_lock = threading.Lock()
+# (direction, airport_id) -> [loaded_at, sorted list of (time, flight_id)]
+_boards = {}
+# (direction, flight_id) -> (airport_id, time) for flights on a loaded board
+_positions = {}
+
+
+def _load(direction: str, airport_id: int, now) -> list:
+    airport_field, time_field = BOARD_DIRECTIONS[direction]
+    return list(
+        Flight.objects.filter(**{airport_field: airport_id, f"{time_field}__gte": now})
+        .order_by(time_field, "id")
+        .values_list(time_field, "id")
+    )
+
+
+def _remove(direction: str, flight_id: int) -> None:
+    position = _positions.pop((direction, flight_id), None)
+    if position is None:
+        return
+    airport_id, when = position
+    board = _boards.get((direction, airport_id))
+    if board is None:
+        return
+    entries = board[1]
+    index = bisect.bisect_left(entries, (when, flight_id))
+    if index < len(entries) and entries[index] == (when, flight_id):
+        del entries[index]
+
+
+def _insert(direction: str, airport_id: int, when, flight_id: int) -> None:
+    board = _boards.get((direction, airport_id))
+    if board is None or when < timezone.now():
+        return
+    bisect.insort(board[1], (when, flight_id))
+    _positions[(direction, flight_id)] = (airport_id, when)
+
+
+def upcoming(direction: str, airport_id: int, limit: int) -> list[int]:
+    """Ids of the next ``limit`` flights of the board, soonest first."""
+    now = timezone.now()
+    key = (direction, airport_id)
+    with _lock:
+        board = _boards.get(key)
+        if board is None or time.monotonic() - board[0] > settings.FLIGHT_BOARD_TTL:
+            if board is not None:
+                for _, flight_id in board[1]:
+                    _positions.pop((direction, flight_id), None)
+            board = _boards[key] = [time.monotonic(), _load(direction, airport_id, now)]
+            for when, flight_id in board[1]:
+                _positions[(direction, flight_id)] = (airport_id, when)
+
+        entries = board[1]
+        departed = bisect.bisect_left(entries, (now,))
+        for _, flight_id in entries[:departed]:
+            _positions.pop((direction, flight_id), None)
+        del entries[:departed]
+        return [flight_id for _, flight_id in entries[:limit]]
+
+
+def flight_saved(flight_id: int, source_id: int, destination_id: int, departure_time, arrival_time) -> None:
+    with _lock:
+        for direction, airport_id, when in (
+            ("departures", source_id, departure_time),
+            ("arrivals", destination_id, arrival_time),
+        ):
+            _remove(direction, flight_id)
+            _insert(direction, airport_id, when, flight_id)
+
+
+def flight_deleted(flight_id: int) -> None:
+    with _lock:
+        for direction in BOARD_DIRECTIONS:
+            _remove(direction, flight_id)
+
+
+def clear() -> None:
+    """Drop every board; they are read again from the database on next use."""
+    with _lock:
+        _boards.clear()
+        _positions.clear()
@@ -0,0 +1,271 @@
+"""Database-backed queue for orders accepted while ``ASYNC_ORDER_INTAKE`` is on.
+
+Each request is assigned to a worker by ``flight_key % workers``, so a
+flight is booked by one worker at a time. A worker takes the pending
+requests of a flight in arrival order, locks the flights they touch once
+and books the whole batch against a seat map held in memory, instead of
+every order locking the flight and reading its seats on its own.
+Requests for ``auto_seats`` get their seats from that same seat map.
+"""
+import logging
+import time
+from collections import defaultdict
+
+from django.db import (
+    IntegrityError,
+    InterfaceError,
+    OperationalError,
+    close_old_connections,
+    connections,
+    transaction,
+)
+from django.db.models.functions import Mod
+from django.utils import timezone
+
+from flights.models import BookingRequest, Flight, Order, Ticket
+from flights.seating import NotEnoughSeats, SeatMap
+from flights.sharding import PRIMARY_DATABASE, order_database, taken_seats
+
+BOOKING_BATCH_SIZE = 100
+# Lost or unreachable database: the requests stay queued and the worker retries.
+TRANSIENT_ERRORS = (OperationalError, InterfaceError)
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(user, tickets_data=None, flight=None, auto_seats=None) -> BookingRequest:
+    """Queue explicit ``tickets_data``, or ``auto_seats`` seats on ``flight`` picked by the worker."""
+    if auto_seats:
+        tickets = [{"flight": flight.id, "auto_seats": auto_seats}]
+    else:
+        tickets = [
+            {"flight": ticket["flight"].id, "row": ticket["row"], "seat": ticket["seat"]}
+            for ticket in tickets_data
+        ]
+    return BookingRequest.objects.create(
+        user=user,
+        flight_key=min(ticket["flight"] for ticket in tickets),
+        tickets=tickets,
+    )
+
+
+def pending_requests(worker: int, workers: int, batch_size: int) -> list[BookingRequest]:
+    return list(
+        BookingRequest.objects.annotate(slot=Mod("flight_key", workers))
+        .filter(status=BookingRequest.Status.PENDING, slot=worker)
+        .order_by("id")[:batch_size]
+    )
+
+
+def _seat_errors(tickets, flights, taken) -> dict | None:
+    seats = set()
+    for ticket in tickets:
+        flight_id, row, seat = ticket["flight"], ticket["row"], ticket["seat"]
+        if flight_id not in flights:
+            return {"tickets": f"Flight {flight_id} no longer exists"}
+        if (row, seat) in taken[flight_id] or (flight_id, row, seat) in seats:
+            return {
+                "tickets": f"Seat {seat} in row {row} "
+                           f"is already taken on flight {flight_id}"
+            }
+        seats.add((flight_id, row, seat))
+    return None
+
+
+def _assign_seats(tickets, flights, taken) -> list[dict]:
+    """Replace an ``auto_seats`` entry with seats picked from the in-memory seat map."""
+    if len(tickets) != 1 or "auto_seats" not in tickets[0]:
+        return tickets
+    flight = flights.get(tickets[0]["flight"])
+    if flight is None:
+        raise NotEnoughSeats(f"Flight {tickets[0]['flight']} no longer exists")
+    seats = SeatMap.for_flight(flight, taken[flight.id]).assign(tickets[0]["auto_seats"])
+    return [{"flight": flight.id, "row": row, "seat": seat} for row, seat in seats]
+
+
+def _finish(request: BookingRequest, status, order_id=None, errors=None) -> None:
+    request.status = status
+    request.order_id = order_id
+    request.errors = errors
+    request.processed_at = timezone.now()
+    request.save(update_fields=["status", "order_id", "errors", "processed_at", "tickets"])
+
+
+def _order_left_by_earlier_attempt(request: BookingRequest, database: str) -> int | None:
+    """Id of an order a previous attempt wrote for ``request`` on its shard before losing its status.
+
+    Such an order belongs to the request's user, was created after the
+    request was queued, is not the order of another request and holds
+    exactly the requested tickets (or ``auto_seats`` tickets on the flight).
+    """
+    flight_ids = {ticket["flight"] for ticket in request.tickets}
+    tickets = defaultdict(list)
+    for order_id, flight_id, row, seat in Ticket.objects.using(database).filter(
+        order__user_id=request.user_id,
+        order__created_at__gte=request.created_at,
+        flight_id__in=flight_ids,
+    ).values_list("order_id", "flight_id", "row", "seat"):
+        tickets[order_id].append((flight_id, row, seat))
+    if not tickets:
+        return None
+
+    wanted = request.tickets
+    if "auto_seats" in wanted[0]:
+        matches = [
+            order_id for order_id, seats in tickets.items()
+            if len(seats) == wanted[0]["auto_seats"]
+        ]
+    else:
+        wanted_seats = sorted((ticket["flight"], ticket["row"], ticket["seat"]) for ticket in wanted)
+        matches = [order_id for order_id, seats in tickets.items() if sorted(seats) == wanted_seats]
+    claimed = set(
+        BookingRequest.objects.filter(order_id__in=matches).values_list("order_id", flat=True)
+    )
+    return next((order_id for order_id in matches if order_id not in claimed), None)
+
+
+def _book(request: BookingRequest, flights: dict, taken: dict) -> None:
+    database = order_database(request.user_id)
+    if database != PRIMARY_DATABASE:
+        # The order shard commits on its own; if this request's status was
+        # rolled back after that, complete it with the order already written.
+        order_id = _order_left_by_earlier_attempt(request, database)
+        if order_id is not None:
+            for flight_id, row, seat in Ticket.objects.using(database).filter(
+                order_id=order_id
+            ).values_list("flight_id", "row", "seat"):
+                taken[flight_id].add((row, seat))
+            _finish(request, BookingRequest.Status.COMPLETED, order_id=order_id)
+            return
+
+    try:
+        request.tickets = _assign_seats(request.tickets, flights, taken)
+    except NotEnoughSeats as error:
+        _finish(request, BookingRequest.Status.FAILED, errors={"auto_seats": str(error)})
+        return
+    errors = _seat_errors(request.tickets, flights, taken)
+    if errors:
+        _finish(request, BookingRequest.Status.FAILED, errors=errors)
+        return
+
+    try:
+        with transaction.atomic(), transaction.atomic(using=database):
+            order = Order.objects.create(user_id=request.user_id)
+            for ticket in request.tickets:
+                Ticket.objects.create(
+                    order=order,
+                    flight=flights[ticket["flight"]],
+                    row=ticket["row"],
+                    seat=ticket["seat"],
+                )
+    except IntegrityError:
+        # Booked outside the queue, e.g. before async intake was switched on.
+        _finish(
+            request,
+            BookingRequest.Status.FAILED,
+            errors={"tickets": "One of the seats has already been taken"},
+        )
+        return
+
+    for ticket in request.tickets:
+        taken[ticket["flight"]].add((ticket["row"], ticket["seat"]))
+    _finish(request, BookingRequest.Status.COMPLETED, order_id=order.id)
+
+
+def book_flight_batch(requests: list[BookingRequest]) -> None:
+    """Book queued requests sharing a flight key, first come first served.
+
+    A request that breaks is marked failed on its own, so the batch
+    transaction never rolls back the status of requests whose orders an
+    order shard has already committed.
+    """
+    flight_ids = sorted({ticket["flight"] for request in requests for ticket in request.tickets})
+    with transaction.atomic():
+        flights = {
+            flight.id: flight
+            for flight in Flight.objects.select_for_update(of=("self",))
+            .select_related("airplane")
+            .filter(id__in=flight_ids)
+            .order_by("id")
+        }
+        # Another worker pool may have handled some of them before we got the locks.
+        pending = set(
+            BookingRequest.objects.filter(
+                id__in=[request.id for request in requests],
+                status=BookingRequest.Status.PENDING,
+            ).values_list("id", flat=True)
+        )
+        taken = {flight_id: set(taken_seats(flight_id)) for flight_id in flights}
+
+        for request in requests:
+            if request.id not in pending:
+                continue
+            try:
+                with transaction.atomic():
+                    _book(request, flights, taken)
+            except TRANSIENT_ERRORS:
+                raise
+            except Exception as error:
+                _fail(request, error)
+
+
+def _fail(request: BookingRequest, error: Exception) -> None:
+    logger.error("Booking request %s failed", request.id, exc_info=error)
+    BookingRequest.objects.filter(
+        id=request.id, status=BookingRequest.Status.PENDING
+    ).update(
+        status=BookingRequest.Status.FAILED,
+        errors={"detail": f"Booking failed: {type(error).__name__}: {error}"},
+        processed_at=timezone.now(),
+    )
+
+
+def process_batch(worker: int, workers: int, batch_size: int = BOOKING_BATCH_SIZE) -> int:
+    """Book up to ``batch_size`` pending requests of ``worker``; return how many were taken.
+
+    When a batch breaks unexpectedly its requests are booked one by one,
+    so only the request at fault is marked failed.
+    """
+    requests = pending_requests(worker, workers, batch_size)
+    by_flight = defaultdict(list)
+    for request in requests:
+        by_flight[request.flight_key].append(request)
+    for group in by_flight.values():
+        try:
+            book_flight_batch(group)
+        except TRANSIENT_ERRORS:
+            raise
+        except Exception:
+            for request in group:
+                try:
+                    book_flight_batch([request])
+                except TRANSIENT_ERRORS:
+                    raise
+                except Exception as error:
+                    _fail(request, error)
+    return len(requests)
+
+
+def run_worker(
+    worker: int,
+    workers: int,
+    batch_size: int = BOOKING_BATCH_SIZE,
+    poll_interval: float = 1.0,
+    once: bool = False,
+) -> None:
+    """Drain the queue slot of ``worker``; with ``once`` stop when it is empty."""
+    while True:
+        close_old_connections()
+        try:
+            taken = process_batch(worker, workers, batch_size)
+        except TRANSIENT_ERRORS:
+            if once:
+                raise
+            logger.exception("Booking worker %s lost the database, retrying", worker)
+            connections.close_all()
+            time.sleep(poll_interval)
+            continue
+        if not taken:
+            if once:
+                return
+            time.sleep(poll_interval)
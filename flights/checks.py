@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register("caches", deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Replica pins and cache-versioned lookups need one cache shared by all workers."""
+    if settings.CACHES["default"]["BACKEND"] not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Warning(
+            "The default cache is local to each process, so worker processes do not "
+            "see each other's replica pins and route map or airport changes.",
+            hint="Set REDIS_URL to use a cache shared by every worker.",
+            id="flights.W001",
+        )
+    ]
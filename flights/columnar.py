@@ -0,0 +1,219 @@
+"""Columnar snapshots of tickets, flights and routes for offline analytics.
+
+``manage.py snapshot_columns`` copies a few columns of each table into
+one ``.npy`` file per column under ``COLUMNAR_SNAPSHOT_ROOT``, reading
+the database in id-ordered chunks. ``manifest.json`` is written last and
+the snapshot directory is renamed into place, so readers never see a
+half-written snapshot.
+
+:class:`Snapshot` memory-maps those files: columns are NumPy arrays
+backed by the page cache, and aggregations over millions of tickets run
+without loading them into Python objects or touching the database::
+
+    snapshot = Snapshot.latest()
+    route_ids, tickets = tickets_per_route(snapshot)
+"""
+import json
+import os
+import shutil
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Max
+from numpy.lib.format import open_memmap
+
+from flights.models import Flight, Route, Ticket
+from flights.sharding import order_databases, sharding_enabled
+
+SNAPSHOT_CHUNK_SIZE = 50_000
+SNAPSHOT_PREFIX = "snapshot-"
+MANIFEST_NAME = "manifest.json"
+
+# table -> (model, {column: dtype}); the first column is the primary key.
+TABLES = {
+    "tickets": (
+        Ticket,
+        {
+            "id": "int64",
+            "flight_id": "int64",
+            "row": "int32",
+            "seat": "int32",
+            "departure_time": "datetime64[s]",
+        },
+    ),
+    "flights": (
+        Flight,
+        {
+            "id": "int64",
+            "route_id": "int64",
+            "airplane_id": "int64",
+            "departure_time": "datetime64[s]",
+        },
+    ),
+    "routes": (
+        Route,
+        {
+            "id": "int64",
+            "source_id": "int64",
+            "destination_id": "int64",
+            "distance": "int32",
+        },
+    ),
+}
+
+
+def _chunks(queryset, fields, chunk_size: int):
+    """Rows of ``queryset`` in id order, ``chunk_size`` at a time, without OFFSET scans."""
+    last_id = 0
+    while True:
+        rows = list(
+            queryset.filter(id__gt=last_id).order_by("id").values_list(*fields)[:chunk_size]
+        )
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def _column(values, dtype: str) -> np.ndarray:
+    if dtype.startswith("datetime64"):
+        return np.array([int(value.timestamp()) for value in values], dtype=np.int64).astype(dtype)
+    return np.array(values, dtype=dtype)
+
+
+def _table_sources(name: str, database: str) -> list[str]:
+    if name == "tickets" and sharding_enabled():
+        return order_databases()
+    return [database]
+
+
+def write_table(directory: Path, name: str, database: str, chunk_size: int) -> int:
+    """Write the columns of table ``name`` and return the number of rows written."""
+    model, columns = TABLES[name]
+    # Rows created while the snapshot runs have larger ids and are left out.
+    querysets = []
+    for alias in _table_sources(name, database):
+        queryset = model.objects.using(alias)
+        last_id = queryset.aggregate(last_id=Max("id"))["last_id"] or 0
+        querysets.append(queryset.filter(id__lte=last_id))
+    capacity = sum(queryset.count() for queryset in querysets)
+
+    table_directory = directory / name
+    table_directory.mkdir()
+    arrays = {
+        column: open_memmap(
+            table_directory / f"{column}.npy", mode="w+", dtype=dtype, shape=(capacity,)
+        )
+        for column, dtype in columns.items()
+    }
+
+    position = 0
+    for queryset in querysets:
+        for rows in _chunks(queryset, list(columns), chunk_size):
+            # Deleted rows can only shrink the table; anything beyond capacity is new.
+            rows = rows[: capacity - position]
+            for (column, dtype), values in zip(columns.items(), zip(*rows)):
+                arrays[column][position:position + len(rows)] = _column(values, dtype)
+            position += len(rows)
+
+    for array in arrays.values():
+        array.flush()
+    return position
+
+
+def write_snapshot(root=None, database: str = "default", chunk_size: int = SNAPSHOT_CHUNK_SIZE) -> Path:
+    root = Path(root or settings.COLUMNAR_SNAPSHOT_ROOT)
+    root.mkdir(parents=True, exist_ok=True)
+    created_at = datetime.now(dt_timezone.utc)
+    name = f"{SNAPSHOT_PREFIX}{created_at:%Y%m%dT%H%M%S%f}"
+    staging = root / f".{name}"
+    staging.mkdir()
+
+    try:
+        tables = {}
+        for table, (_, columns) in TABLES.items():
+            tables[table] = {
+                "rows": write_table(staging, table, database, chunk_size),
+                "columns": columns,
+            }
+        with open(staging / MANIFEST_NAME, "w") as file:
+            json.dump({"created_at": created_at.isoformat(), "tables": tables}, file, indent=2)
+        os.rename(staging, root / name)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return root / name
+
+
+def snapshot_paths(root=None) -> list[Path]:
+    """Complete snapshots under ``root``, oldest first."""
+    root = Path(root or settings.COLUMNAR_SNAPSHOT_ROOT)
+    if not root.is_dir():
+        return []
+    return sorted(
+        path
+        for path in root.iterdir()
+        if path.name.startswith(SNAPSHOT_PREFIX) and (path / MANIFEST_NAME).is_file()
+    )
+
+
+def prune_snapshots(keep: int, root=None) -> list[Path]:
+    removed = snapshot_paths(root)[:-keep] if keep > 0 else []
+    for path in removed:
+        shutil.rmtree(path)
+    return removed
+
+
+class Snapshot:
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / MANIFEST_NAME) as file:
+            self.manifest = json.load(file)
+        self._tables = {}
+
+    @classmethod
+    def latest(cls, root=None) -> "Snapshot":
+        paths = snapshot_paths(root)
+        if not paths:
+            raise FileNotFoundError("No columnar snapshot found; run manage.py snapshot_columns")
+        return cls(paths[-1])
+
+    @property
+    def created_at(self) -> datetime:
+        return datetime.fromisoformat(self.manifest["created_at"])
+
+    def table(self, name: str) -> dict[str, np.ndarray]:
+        """Read-only, memory-mapped columns of ``name``."""
+        if name not in self._tables:
+            table = self.manifest["tables"][name]
+            self._tables[name] = {
+                column: np.load(self.path / name / f"{column}.npy", mmap_mode="r")[: table["rows"]]
+                for column in table["columns"]
+            }
+        return self._tables[name]
+
+    def __getitem__(self, name: str) -> dict[str, np.ndarray]:
+        return self.table(name)
+
+
+def lookup(keys: np.ndarray, ids: np.ndarray, values: np.ndarray, missing=-1) -> np.ndarray:
+    """``values`` of the rows whose sorted ``ids`` equal ``keys``; ``missing`` elsewhere."""
+    positions = np.searchsorted(ids, keys)
+    positions = np.minimum(positions, max(len(ids) - 1, 0))
+    found = (ids[positions] == keys) if len(ids) else np.zeros(len(keys), dtype=bool)
+    result = np.full(len(keys), missing, dtype=values.dtype)
+    result[found] = values[positions[found]]
+    return result
+
+
+def ticket_route_ids(snapshot: Snapshot) -> np.ndarray:
+    flights = snapshot["flights"]
+    return lookup(snapshot["tickets"]["flight_id"], flights["id"], flights["route_id"])
+
+
+def tickets_per_route(snapshot: Snapshot) -> tuple[np.ndarray, np.ndarray]:
+    """Route ids and the number of tickets sold on each."""
+    route_ids = ticket_route_ids(snapshot)
+    return np.unique(route_ids[route_ids >= 0], return_counts=True)
@@ -0,0 +1,61 @@
+"""Fare quotes for whole pages of flights at once.
+
+A fare is the distance-based base fare, raised by a demand multiplier
+once the load factor passes ``load_factor_threshold`` and by an
+advance-purchase multiplier close to departure. Every step is a NumPy
+array operation, so pricing a page costs about the same as pricing one
+flight. The rules come from ``settings.FARE_RULES``.
+"""
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+
+def quote_fares(distance, seats_sold, capacity, days_to_departure, rules=None) -> np.ndarray:
+    """Fares for parallel arrays of flight attributes; ``nan`` for departed flights."""
+    rules = rules or settings.FARE_RULES
+    distance = np.asarray(distance, dtype=np.float64)
+    seats_sold = np.asarray(seats_sold, dtype=np.float64)
+    capacity = np.asarray(capacity, dtype=np.float64)
+    days = np.asarray(days_to_departure, dtype=np.float64)
+
+    fares = rules["base_fare"] + rules["per_km"] * distance
+
+    load_factor = np.divide(
+        seats_sold, capacity, out=np.ones_like(seats_sold), where=capacity > 0
+    )
+    threshold = rules["load_factor_threshold"]
+    demand = np.clip((load_factor - threshold) / (1 - threshold), 0, 1)
+    fares *= 1 + rules["load_factor_surcharge"] * demand
+
+    # Tiers are (days before departure, multiplier), e.g. [(3, 1.5), (14, 1.25)]:
+    # under 3 days costs 1.5x, under 14 days 1.25x, anything earlier 1x.
+    tiers = sorted(rules["advance_purchase"])
+    edges = np.array([days_before for days_before, _ in tiers], dtype=np.float64)
+    multipliers = np.array([multiplier for _, multiplier in tiers] + [1.0])
+    fares *= multipliers[np.searchsorted(edges, days, side="right")]
+
+    fares = np.round(np.maximum(fares, rules["minimum_fare"]), 2)
+    fares[days < 0] = np.nan
+    return fares
+
+
+def price_flights(flights, tickets_sold, now=None, rules=None) -> dict:
+    """Map flight id to fare for flights with ``route`` and ``airplane`` loaded.
+
+    ``tickets_sold`` is a callable returning the sold seats of a flight.
+    """
+    if not flights:
+        return {}
+    now = now or timezone.now()
+    fares = quote_fares(
+        [flight.route.distance for flight in flights],
+        [tickets_sold(flight) for flight in flights],
+        [flight.airplane.capacity for flight in flights],
+        [(flight.departure_time - now).total_seconds() / 86400 for flight in flights],
+        rules,
+    )
+    return {
+        flight.id: None if np.isnan(fare) else float(fare)
+        for flight, fare in zip(flights, fares)
+    }
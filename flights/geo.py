@@ -0,0 +1,313 @@
+"""Great-circle distances between airports.
+
+Each process keeps a matrix of the haversine distances between all
+airports with coordinates. It is built once with a single vectorized
+NumPy expression; adding or moving an airport afterwards only computes
+that airport's row and column. Distances are stored as ``float32``
+kilometres, so a few thousand airports take tens of megabytes.
+
+``AirportTree`` answers "airports near this point" queries. It is a
+KD-tree over airport positions as 3D unit vectors, where the straight
+chord between two points grows with their great-circle distance.
+
+Airport changes bump a version in the cache. Processes that did not make
+the change notice the new version on their next lookup and rebuild their
+matrix and tree. That needs the cache shared by all processes (Redis,
+see ``REDIS_URL``); with the local-memory fallback only the process that
+made the change sees it.
+"""
+import heapq
+import threading
+import uuid
+
+import numpy as np
+from django.core.cache import cache
+
+from flights.models import Airport
+
+EARTH_RADIUS_KM = 6371.0088
+DISTANCE_PAIRS_LIMIT = 1000
+NEARBY_RADIUS_KM = 150
+NEARBY_LIMIT = 10
+NEARBY_MAX_LIMIT = 100
+# A route may be longer than the great circle between its airports, but not shorter.
+ROUTE_DISTANCE_TOLERANCE = 0.05
+
+_VERSION_KEY = "airport-distance-matrix-version"
+
+_lock = threading.Lock()
+_matrix = None
+_tree = None
+
+
+def haversine_km(latitude1, longitude1, latitude2, longitude2):
+    """Great-circle distance in km; arguments are degrees and broadcast like NumPy arrays."""
+    latitude1, longitude1, latitude2, longitude2 = (
+        np.radians(np.asarray(value, dtype=np.float64))
+        for value in (latitude1, longitude1, latitude2, longitude2)
+    )
+    a = (
+        np.sin((latitude2 - latitude1) / 2) ** 2
+        + np.cos(latitude1) * np.cos(latitude2) * np.sin((longitude2 - longitude1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class DistanceMatrix:
+    def __init__(self, version=None):
+        self.version = version
+        self.index = {}
+        self.size = 0
+        self.coordinates = np.empty((0, 2))
+        self.matrix = np.empty((0, 0), dtype=np.float32)
+
+    @classmethod
+    def build(cls, version=None) -> "DistanceMatrix":
+        distance_matrix = cls(version)
+        rows = list(
+            Airport.objects.filter(latitude__isnull=False, longitude__isnull=False)
+            .order_by("id")
+            .values_list("id", "latitude", "longitude")
+        )
+        if not rows:
+            return distance_matrix
+
+        ids, latitudes, longitudes = (np.array(column) for column in zip(*rows))
+        size = len(ids)
+        distance_matrix._reserve(size)
+        distance_matrix.coordinates[:size] = np.column_stack((latitudes, longitudes))
+        distance_matrix.matrix[:size, :size] = haversine_km(
+            latitudes[:, None], longitudes[:, None], latitudes[None, :], longitudes[None, :]
+        )
+        distance_matrix.index = {int(airport_id): row for row, airport_id in enumerate(ids)}
+        distance_matrix.size = size
+        return distance_matrix
+
+    def _reserve(self, size: int) -> None:
+        capacity = len(self.coordinates)
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity, 16)
+        coordinates = np.full((capacity, 2), np.nan)
+        coordinates[: self.size] = self.coordinates[: self.size]
+        matrix = np.full((capacity, capacity), np.nan, dtype=np.float32)
+        matrix[: self.size, : self.size] = self.matrix[: self.size, : self.size]
+        self.coordinates, self.matrix = coordinates, matrix
+
+    def set(self, airport_id: int, latitude: float, longitude: float) -> None:
+        """Add or move an airport, computing only its row and column."""
+        row = self.index.get(airport_id)
+        if row is None:
+            self._reserve(self.size + 1)
+            row = self.index[airport_id] = self.size
+            self.size += 1
+        self.coordinates[row] = (latitude, longitude)
+        distances = haversine_km(
+            latitude,
+            longitude,
+            self.coordinates[: self.size, 0],
+            self.coordinates[: self.size, 1],
+        )
+        self.matrix[row, : self.size] = distances
+        self.matrix[: self.size, row] = distances
+
+    def remove(self, airport_id: int) -> None:
+        # The row stays allocated until the next full build.
+        row = self.index.pop(airport_id, None)
+        if row is not None:
+            self.coordinates[row] = np.nan
+            self.matrix[row, :] = np.nan
+            self.matrix[:, row] = np.nan
+
+    def distances(self, pairs) -> np.ndarray:
+        """Distances for ``(source_id, destination_id)`` pairs; ``nan`` if unknown."""
+        rows = np.array([self.index.get(source, -1) for source, _ in pairs], dtype=np.intp)
+        columns = np.array(
+            [self.index.get(destination, -1) for _, destination in pairs], dtype=np.intp
+        )
+        result = np.full(len(pairs), np.nan)
+        known = (rows >= 0) & (columns >= 0)
+        result[known] = self.matrix[rows[known], columns[known]]
+        return result
+
+
+def unit_vectors(latitude, longitude) -> np.ndarray:
+    latitude = np.radians(np.asarray(latitude, dtype=np.float64))
+    longitude = np.radians(np.asarray(longitude, dtype=np.float64))
+    return np.stack(
+        (
+            np.cos(latitude) * np.cos(longitude),
+            np.cos(latitude) * np.sin(longitude),
+            np.sin(latitude),
+        ),
+        axis=-1,
+    )
+
+
+def km_to_chord(distance_km: float) -> float:
+    return 2 * np.sin(min(distance_km / EARTH_RADIUS_KM, np.pi) / 2)
+
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord) / 2, 0, 1))
+
+
+class AirportTree:
+    """KD-tree over airport unit vectors, split on the widest axis down to small leaves."""
+
+    LEAF_SIZE = 16
+
+    def __init__(self, ids, points, version=None):
+        self.version = version
+        self.ids = np.array(ids, dtype=np.int64)
+        self.points = np.array(points, dtype=np.float64).reshape(-1, 3)
+        # (start, end, axis, split, left, right); leaves have axis -1
+        self.nodes = []
+        self.root = self._build(0, len(self.ids)) if len(self.ids) else None
+
+    @classmethod
+    def build(cls, version=None) -> "AirportTree":
+        rows = list(
+            Airport.objects.filter(latitude__isnull=False, longitude__isnull=False)
+            .values_list("id", "latitude", "longitude")
+        )
+        if not rows:
+            return cls([], [], version)
+        ids, latitudes, longitudes = zip(*rows)
+        return cls(ids, unit_vectors(latitudes, longitudes), version)
+
+    def _build(self, start: int, end: int) -> int:
+        node = len(self.nodes)
+        self.nodes.append(None)
+        if end - start <= self.LEAF_SIZE:
+            self.nodes[node] = (start, end, -1, 0.0, -1, -1)
+            return node
+
+        points = self.points[start:end]
+        axis = int(np.argmax(points.max(axis=0) - points.min(axis=0)))
+        order = np.argsort(points[:, axis], kind="stable")
+        self.points[start:end] = points[order]
+        self.ids[start:end] = self.ids[start:end][order]
+        middle = (start + end) // 2
+        split = float(self.points[middle, axis])
+        left = self._build(start, middle)
+        right = self._build(middle, end)
+        self.nodes[node] = (start, end, axis, split, left, right)
+        return node
+
+    def query(self, latitude: float, longitude: float, radius_km=None, k=None) -> list[tuple[int, float]]:
+        """``(airport_id, km)`` pairs, nearest first, within ``radius_km`` and/or the ``k`` nearest."""
+        if self.root is None:
+            return []
+        point = unit_vectors(latitude, longitude)
+        limit = km_to_chord(radius_km) if radius_km is not None else np.inf
+        best = []  # max-heap of (-chord, airport_id) when k is set
+
+        def bound() -> float:
+            if k is not None and len(best) == k:
+                return -best[0][0]
+            return limit
+
+        # (node, lower bound on the chord to any point of the node)
+        stack = [(self.root, 0.0)]
+        while stack:
+            node, gap = stack.pop()
+            if gap > bound():
+                continue
+            start, end, axis, split, left, right = self.nodes[node]
+            if axis < 0:
+                chords = np.linalg.norm(self.points[start:end] - point, axis=1)
+                for chord, airport_id in zip(chords.tolist(), self.ids[start:end].tolist()):
+                    if chord > bound():
+                        continue
+                    if k is None:
+                        best.append((-chord, airport_id))
+                    elif len(best) < k:
+                        heapq.heappush(best, (-chord, airport_id))
+                    else:
+                        heapq.heappushpop(best, (-chord, airport_id))
+                continue
+            difference = float(point[axis] - split)
+            near, far = (left, right) if difference <= 0 else (right, left)
+            # The near side is searched first and tightens the bound before
+            # the far side is popped and checked against it.
+            stack.append((far, max(gap, abs(difference))))
+            stack.append((near, gap))
+
+        best.sort(reverse=True)
+        return [
+            (airport_id, round(float(chord_to_km(-negative_chord)), 1))
+            for negative_chord, airport_id in best
+        ]
+
+
+def get_matrix() -> DistanceMatrix:
+    global _matrix
+    version = cache.get(_VERSION_KEY)
+    with _lock:
+        if _matrix is None or _matrix.version != version:
+            _matrix = DistanceMatrix.build(version)
+        return _matrix
+
+
+def get_tree() -> AirportTree:
+    global _tree
+    version = cache.get(_VERSION_KEY)
+    with _lock:
+        if _tree is None or _tree.version != version:
+            _tree = AirportTree.build(version)
+        return _tree
+
+
+def airport_changed(airport_id: int, latitude: float | None, longitude: float | None) -> None:
+    """Apply an airport change to this process's matrix and tell the others to rebuild."""
+    global _matrix, _tree
+    version = uuid.uuid4().hex
+    with _lock:
+        _tree = None
+        if _matrix is not None and _matrix.version == cache.get(_VERSION_KEY):
+            if latitude is None or longitude is None:
+                _matrix.remove(airport_id)
+            else:
+                _matrix.set(airport_id, latitude, longitude)
+            _matrix.version = version
+        else:
+            _matrix = None
+        cache.set(_VERSION_KEY, version, None)
+
+
+def reset() -> None:
+    global _matrix, _tree
+    with _lock:
+        _matrix = None
+        _tree = None
+
+
+def airport_distances(pairs) -> list[float | None]:
+    return [
+        None if np.isnan(distance) else round(float(distance), 1)
+        for distance in get_matrix().distances(pairs)
+    ]
+
+
+def route_distance(source_id: int, destination_id: int) -> int | None:
+    """Great-circle distance in whole km, or ``None`` without coordinates."""
+    distance = get_matrix().distances([(source_id, destination_id)])[0]
+    return None if np.isnan(distance) else int(round(float(distance)))
+
+
+def nearby_airports(latitude: float, longitude: float, radius_km=None, k=None) -> list[tuple[int, float]]:
+    return get_tree().query(latitude, longitude, radius_km=radius_km, k=k)
+
+
+def airports_near(airport_id: int, radius_km: float) -> list[int]:
+    """Ids of the airport and of every airport within ``radius_km`` of it."""
+    airport = (
+        Airport.objects.filter(id=airport_id, latitude__isnull=False, longitude__isnull=False)
+        .values_list("latitude", "longitude")
+        .first()
+    )
+    if airport is None:
+        return [airport_id]
+    ids = [nearby_id for nearby_id, _ in nearby_airports(*airport, radius_km=radius_km)]
+    return ids if airport_id in ids else [airport_id, *ids]
@@ -0,0 +1,66 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from flights.models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+
+def request_fingerprint(data) -> str:
+    payload = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def claim_key(user, key: str, request_hash: str) -> tuple[IdempotencyKey, bool]:
+    """Insert the key, or return the existing record if another request owns it.
+
+    The unique ``(user, key)`` index makes exactly one of several
+    concurrent requests the winner; the others get the winner's record.
+    A claim without a response that is older than
+    ``IDEMPOTENCY_CLAIM_TIMEOUT`` belongs to a request that died; a retry
+    of the same request takes it over, again with a single winner.
+    """
+    try:
+        with transaction.atomic():
+            return (
+                IdempotencyKey.objects.create(
+                    user=user, key=key, request_hash=request_hash
+                ),
+                True,
+            )
+    except IntegrityError:
+        record = IdempotencyKey.objects.get(user=user, key=key)
+
+    now = timezone.now()
+    if (
+        record.response_status is None
+        and record.request_hash == request_hash
+        and record.claimed_at < now - settings.IDEMPOTENCY_CLAIM_TIMEOUT
+    ):
+        taken_over = IdempotencyKey.objects.filter(
+            pk=record.pk, response_status__isnull=True, claimed_at=record.claimed_at
+        ).update(claimed_at=now)
+        if taken_over:
+            record.claimed_at = now
+            return record, True
+    return record, False
+
+
+def complete_key(record: IdempotencyKey, response) -> None:
+    # An accepted (202) response carries the id of the queued request, not of an order.
+    record.order_id = response.data.get("id") if response.status_code == 201 else None
+    record.response_status = response.status_code
+    record.response_body = response.data
+    record.save(update_fields=["order_id", "response_status", "response_body"])
+
+
+def expire_keys() -> int:
+    """Delete keys older than ``IDEMPOTENCY_KEY_TTL`` with a single statement."""
+    cutoff = timezone.now() - settings.IDEMPOTENCY_KEY_TTL
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
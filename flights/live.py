@@ -0,0 +1,296 @@
+"""Live seat availability pushed to browsers over SSE or WebSocket.
+
+Ticket signals publish one small delta per booked or released seat after
+the transaction commits. ``broker`` fans each delta out to the queues of
+the connections subscribed to that flight, so a booking costs the same
+whether nobody or thousands of tabs are watching and subscribers never
+query the database after their initial snapshot.
+
+With ``REDIS_URL`` set, deltas go through Redis pub/sub, so bookings
+made by any web worker or booking worker reach the subscribers of every
+ASGI worker. Without it they only reach subscribers of the same process.
+
+Browsers cannot send headers with EventSource or WebSocket, so they
+first get a ``stream_ticket`` for the flight (a signed value valid for
+``LIVE_TICKET_SECONDS``) and put that in the URL instead of their JWT,
+which would otherwise end up in access logs.
+"""
+import asyncio
+import json
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from flights.models import Flight
+from flights.sharding import taken_seats
+
+LIVE_QUEUE_SIZE = 100
+LIVE_KEEPALIVE_SECONDS = 15
+LIVE_TICKET_SECONDS = 30
+LIVE_CHANNEL = "live-seats"
+LIVE_RECONNECT_SECONDS = 1
+
+WEBSOCKET_PATH = re.compile(r"^/ws/flights/(?P<pk>\d+)/seats/$")
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    def __init__(self, flight_id: int):
+        self.flight_id = flight_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=LIVE_QUEUE_SIZE)
+
+    def deliver(self, event) -> None:
+        """Queue ``event``; a subscriber that fell behind gets ``None`` and is dropped."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class LocalChannel:
+    """Delivers events to the subscribers of this process only."""
+
+    shared = False
+
+    def __init__(self):
+        self._deliver = None
+
+    def start(self, deliver, reset) -> None:
+        self._deliver = deliver
+
+    def publish(self, flight_id: int, event: dict) -> None:
+        if self._deliver is not None:
+            self._deliver(flight_id, event)
+
+
+class RedisChannel:
+    """Redis pub/sub: events published by any process reach every subscribed process."""
+
+    shared = True
+
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+
+    def start(self, deliver, reset) -> None:
+        threading.Thread(
+            target=self._listen, args=(deliver, reset), name="live-seats", daemon=True
+        ).start()
+
+    def _listen(self, deliver, reset) -> None:
+        while True:
+            try:
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(LIVE_CHANNEL)
+                for message in pubsub.listen():
+                    data = json.loads(message["data"])
+                    deliver(data["flight"], data["event"])
+            except Exception:
+                # A lost connection, a bad payload or a failing subscriber:
+                # keep the listener alive for the subscribers still to come.
+                logger.exception("Live seat listener failed, reconnecting")
+            # Events published meanwhile are lost; make the subscribers
+            # reconnect and start again from a fresh snapshot.
+            reset()
+            time.sleep(LIVE_RECONNECT_SECONDS)
+
+    def publish(self, flight_id: int, event: dict) -> None:
+        self._client.publish(LIVE_CHANNEL, json.dumps({"flight": flight_id, "event": event}))
+
+
+class SeatBroker:
+    def __init__(self, channel=None):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+        self._channel = channel
+        self._channel_lock = threading.Lock()
+        self._listening = False
+
+    @property
+    def channel(self):
+        with self._channel_lock:
+            if self._channel is None:
+                self._channel = (
+                    RedisChannel(settings.REDIS_URL) if settings.REDIS_URL else LocalChannel()
+                )
+            return self._channel
+
+    def subscribe(self, flight_id: int) -> Subscription:
+        subscription = Subscription(flight_id)
+        channel = self.channel
+        with self._lock:
+            if not self._listening:
+                channel.start(self._fan_out, self.drop_all)
+                self._listening = True
+            self._subscriptions[flight_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.flight_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.flight_id]
+
+    def has_subscribers(self, flight_id: int) -> bool:
+        """Whether publishing for the flight may reach anyone (always, over a shared channel)."""
+        return self.channel.shared or flight_id in self._subscriptions
+
+    def publish(self, flight_id: int, event: dict) -> None:
+        """Send ``event`` to the subscribers of the flight; safe to call from any thread."""
+        self.channel.publish(flight_id, event)
+
+    def _fan_out(self, flight_id: int, event) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(flight_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # The event loop of a connection that went away without unsubscribing.
+                self.unsubscribe(subscription)
+
+    def drop_all(self) -> None:
+        """End every subscription; their clients reconnect for a new snapshot."""
+        with self._lock:
+            flight_ids = list(self._subscriptions)
+        for flight_id in flight_ids:
+            self._fan_out(flight_id, None)
+
+
+broker = SeatBroker()
+
+
+def seat_event(flight_id: int, taken=(), released=()) -> dict:
+    return {
+        "flight": flight_id,
+        "taken": [{"row": row, "seat": seat} for row, seat in taken],
+        "released": [{"row": row, "seat": seat} for row, seat in released],
+    }
+
+
+def seat_snapshot(flight_id: int) -> dict | None:
+    flight = Flight.objects.select_related("airplane").filter(id=flight_id).first()
+    if flight is None:
+        return None
+    seats = taken_seats(flight_id)
+    return {
+        "flight": flight_id,
+        "tickets_available": flight.airplane.capacity - len(seats),
+        "taken_places": [{"row": row, "seat": seat} for row, seat in seats],
+    }
+
+
+def stream_ticket(user, flight_id: int) -> str:
+    return signing.dumps({"user": user.pk, "flight": flight_id}, salt="flights.live")
+
+
+def user_for_ticket(ticket: str, flight_id: int):
+    """User of a ticket issued for this flight less than ``LIVE_TICKET_SECONDS`` ago."""
+    try:
+        data = signing.loads(ticket, salt="flights.live", max_age=LIVE_TICKET_SECONDS)
+    except signing.BadSignature:
+        return None
+    if data["flight"] != flight_id:
+        return None
+    return get_user_model().objects.filter(pk=data["user"], is_active=True).first()
+
+
+def authenticate(request, flight_id: int):
+    """User of the JWT in the Authorization header or, for EventSource, of ``?ticket=``."""
+    ticket = request.GET.get("ticket")
+    if ticket:
+        return user_for_ticket(ticket, flight_id)
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    return result[0] if result else None
+
+
+async def subscription_events(subscription: Subscription):
+    """Yield the subscription's events, ``None`` on keep-alive ticks, until it is dropped."""
+    while True:
+        try:
+            event = await asyncio.wait_for(
+                subscription.queue.get(), timeout=LIVE_KEEPALIVE_SECONDS
+            )
+        except asyncio.TimeoutError:
+            yield None
+            continue
+        if event is None:
+            return
+        yield event
+
+
+def _sse(event_name: str, data: dict) -> str:
+    return f"event: {event_name}\ndata: {json.dumps(data)}\n\n"
+
+
+async def sse_stream(flight_id: int, snapshot: dict, subscription: Subscription):
+    try:
+        yield _sse("snapshot", snapshot)
+        async for event in subscription_events(subscription):
+            yield ": keep-alive\n\n" if event is None else _sse("seats", event)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def seat_websocket(scope, receive, send) -> None:
+    """Raw ASGI WebSocket endpoint at ``/ws/flights/<id>/seats/?ticket=<stream ticket>``."""
+    match = WEBSOCKET_PATH.match(scope["path"])
+    message = await receive()
+    if message["type"] != "websocket.connect":
+        return
+    if match is None:
+        await send({"type": "websocket.close", "code": 4404})
+        return
+
+    flight_id = int(match["pk"])
+    ticket = parse_qs(scope.get("query_string", b"").decode()).get("ticket", [None])[0]
+    user = await sync_to_async(user_for_ticket)(ticket, flight_id) if ticket else None
+    if user is None:
+        await send({"type": "websocket.close", "code": 4401})
+        return
+
+    subscription = broker.subscribe(flight_id)
+    try:
+        snapshot = await sync_to_async(seat_snapshot)(flight_id)
+        if snapshot is None:
+            await send({"type": "websocket.close", "code": 4404})
+            return
+        await send({"type": "websocket.accept"})
+        await send({"type": "websocket.send", "text": json.dumps({"snapshot": snapshot})})
+
+        async def forward():
+            async for event in subscription_events(subscription):
+                if event is not None:
+                    await send({"type": "websocket.send", "text": json.dumps({"seats": event})})
+            await send({"type": "websocket.close", "code": 1013})
+
+        async def wait_for_disconnect():
+            while (await receive())["type"] != "websocket.disconnect":
+                pass
+
+        tasks = [asyncio.ensure_future(forward()), asyncio.ensure_future(wait_for_disconnect())]
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,45 @@
+from datetime import datetime, time, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from flights.archive import archive_month
+from flights.models import Flight
+
+
+class Command(BaseCommand):
+    help = (
+        "Move flights that arrived before --before, with their tickets and "
+        "orders, to compressed monthly archive files."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--before",
+            required=True,
+            help="Archive flights that arrived before this date (YYYY-MM-DD).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of rows deleted per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            before = datetime.strptime(options["before"], "%Y-%m-%d")
+        except ValueError:
+            raise CommandError("--before must be in YYYY-MM-DD format.")
+        before = datetime.combine(before.date(), time.min, tzinfo=dt_timezone.utc)
+
+        months = Flight.objects.filter(arrival_time__lt=before).dates(
+            "departure_time", "month"
+        )
+        for month in months:
+            stats = archive_month(month, before, options["batch_size"])
+            self.stdout.write(
+                f"{month:%Y-%m}: archived {stats['flights']} flights, "
+                f"{stats['orders']} orders, {stats['tickets']} tickets"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Archiving finished"))
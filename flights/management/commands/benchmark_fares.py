@@ -0,0 +1,36 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from flights.fares import quote_fares
+
+
+class Command(BaseCommand):
+    help = "Time the fare engine on randomly generated flights."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--flights", type=int, default=10_000, help="Flights priced per run.")
+        parser.add_argument("--repeat", type=int, default=20, help="Number of timed runs.")
+
+    def handle(self, *args, **options):
+        count = options["flights"]
+        rng = np.random.default_rng(0)
+        capacity = rng.integers(50, 500, count)
+        arrays = (
+            rng.integers(200, 12_000, count),
+            rng.integers(0, capacity + 1),
+            capacity,
+            rng.uniform(-1, 180, count),
+        )
+
+        timings = []
+        for _ in range(options["repeat"]):
+            started = time.perf_counter()
+            quote_fares(*arrays)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        self.stdout.write(
+            f"Priced {count} flights: best {min(timings):.2f} ms, "
+            f"median {float(np.median(timings)):.2f} ms over {len(timings)} runs"
+        )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from Airport_API_Service.schema import code_version, generate_schema, schema_path, write_schema
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the OpenAPI schema of the current code version so /api/schema/ "
+        "serves it without introspecting the API. Run at build or startup."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate even if the file for this version already exists.",
+        )
+
+    def handle(self, *args, **options):
+        path = schema_path()
+        if path.is_file() and not options["force"]:
+            self.stdout.write(f"Schema for version {code_version()} is up to date: {path}")
+            return
+
+        write_schema(generate_schema(), path)
+        self.stdout.write(self.style.SUCCESS(f"Wrote schema for version {code_version()} to {path}"))
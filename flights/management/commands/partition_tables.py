@@ -0,0 +1,67 @@
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from flights.partitioning import (
+    convert_to_partitioned,
+    create_partitions,
+    detach_partitions_before,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Maintain monthly departure partitions of flights and tickets: "
+        "optionally convert the tables, create upcoming partitions and "
+        "detach old ones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--convert",
+            action="store_true",
+            help="Convert the existing tables to partitioned ones (takes an exclusive lock).",
+        )
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=3,
+            help="Number of monthly partitions to keep ready from the current month.",
+        )
+        parser.add_argument(
+            "--detach-before",
+            help="Detach partitions of months ending on or before this date (YYYY-MM-DD).",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.FLIGHT_PARTITIONING:
+            raise CommandError(
+                "Partitioning is disabled, set FLIGHT_PARTITIONING=true to enable it."
+            )
+        if connection.vendor != "postgresql":
+            raise CommandError("Partitioning requires a PostgreSQL database.")
+
+        cutoff = None
+        if options["detach_before"]:
+            try:
+                cutoff = datetime.strptime(options["detach_before"], "%Y-%m-%d").date()
+            except ValueError:
+                raise CommandError("--detach-before must be in YYYY-MM-DD format.")
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            if options["convert"]:
+                for table in convert_to_partitioned(cursor):
+                    self.stdout.write(f"Converted {table} to a partitioned table")
+
+            current_month = timezone.now().date().replace(day=1)
+            for name in create_partitions(cursor, current_month, options["months_ahead"]):
+                self.stdout.write(f"Created partition {name}")
+
+            if cutoff:
+                for name in detach_partitions_before(cursor, cutoff):
+                    self.stdout.write(f"Detached partition {name}")
+
+        self.stdout.write(self.style.SUCCESS("Partitions are up to date"))
@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from flights.rollups import last_departure_day, reconcile
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute route load rollups from flights and tickets. Meant to run "
+        "nightly; do not include days that have been archived."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start",
+            help="First departure day to recompute (YYYY-MM-DD, default: yesterday).",
+        )
+        parser.add_argument(
+            "--end",
+            help="Last departure day to recompute (YYYY-MM-DD, default: the last scheduled flight).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            start = (
+                datetime.strptime(options["start"], "%Y-%m-%d").date()
+                if options["start"]
+                else timezone.localdate() - timedelta(days=1)
+            )
+            end = (
+                datetime.strptime(options["end"], "%Y-%m-%d").date()
+                if options["end"]
+                else last_departure_day()
+            )
+        except ValueError:
+            raise CommandError("--start and --end must be in YYYY-MM-DD format.")
+
+        if end is None or end < start:
+            self.stdout.write("No departure days to reconcile")
+            return
+
+        stats = reconcile(start, end)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Reconciled {start} to {end}: {stats['updated']} rows updated, "
+                f"{stats['deleted']} empty rows deleted"
+            )
+        )
@@ -0,0 +1,67 @@
+import multiprocessing
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from flights.booking_queue import BOOKING_BATCH_SIZE, run_worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Book queued order requests. Each worker process owns the flights "
+        "whose id modulo --workers equals its number."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=1, help="Number of worker processes.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BOOKING_BATCH_SIZE,
+            help="Number of requests a worker takes from the queue at once.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the queue is drained instead of polling.",
+        )
+
+    def handle(self, *args, **options):
+        workers = options["workers"]
+        if workers < 1:
+            raise CommandError("--workers must be at least 1.")
+        worker_options = {
+            "workers": workers,
+            "batch_size": options["batch_size"],
+            "poll_interval": options["poll_interval"],
+            "once": options["once"],
+        }
+
+        if workers == 1:
+            run_worker(0, **worker_options)
+        else:
+            # Forked children inherit the configured Django but must open
+            # their own database connections instead of sharing ours.
+            connections.close_all()
+            context = multiprocessing.get_context("fork")
+            processes = [
+                context.Process(
+                    target=run_worker,
+                    args=(worker,),
+                    kwargs=worker_options,
+                    name=f"booking-worker-{worker}",
+                )
+                for worker in range(workers)
+            ]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+
+        self.stdout.write(self.style.SUCCESS("Booking workers stopped"))
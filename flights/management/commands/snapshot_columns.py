@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from flights.columnar import SNAPSHOT_CHUNK_SIZE, prune_snapshots, write_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Write ticket, flight and route columns to memory-mappable .npy files "
+        "for analytics (see flights.columnar)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            help="Snapshot root directory (default: COLUMNAR_SNAPSHOT_ROOT).",
+        )
+        parser.add_argument(
+            "--database",
+            default="default",
+            help="Database alias to read from, e.g. a read replica.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=SNAPSHOT_CHUNK_SIZE,
+            help="Number of rows read per query.",
+        )
+        parser.add_argument(
+            "--keep",
+            type=int,
+            default=3,
+            help="Number of snapshots to keep, including the new one (0 keeps all).",
+        )
+
+    def handle(self, *args, **options):
+        if options["database"] not in connections:
+            raise CommandError(f"Unknown database {options['database']!r}.")
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive.")
+
+        path = write_snapshot(options["output"], options["database"], options["chunk_size"])
+        removed = prune_snapshots(options["keep"], options["output"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Wrote {path}, removed {len(removed)} old snapshots")
+        )
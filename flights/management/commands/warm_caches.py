@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from flights.checks import PROCESS_LOCAL_CACHES
+from flights.warming import WARMUP_THREADS, warm_caches
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the IATA route map, the only warm-up cache shared between processes "
+        "(see flights.warming). The boards of the busiest routes of the next "
+        "CACHE_WARMUP_DAYS days and the airport distances live in each worker's "
+        "memory; gunicorn.conf.py warms them in every worker at start "
+        "(WARM_CACHES_ON_START), which this command cannot do."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--budget",
+            type=float,
+            help="Seconds to spend before skipping the remaining tasks (default: CACHE_WARMUP_BUDGET).",
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=WARMUP_THREADS,
+            help="Number of tasks run in parallel.",
+        )
+
+    def handle(self, *args, **options):
+        if options["threads"] < 1:
+            raise CommandError("--threads must be positive.")
+        if options["budget"] is not None and options["budget"] <= 0:
+            raise CommandError("--budget must be positive.")
+        if settings.CACHES["default"]["BACKEND"] in PROCESS_LOCAL_CACHES:
+            raise CommandError(
+                "The default cache is local to this process, so warming it would not "
+                "reach the workers. Set REDIS_URL to use the shared cache."
+            )
+
+        results = warm_caches(budget=options["budget"], threads=options["threads"], local=False)
+
+        for name, error in results["failed"].items():
+            self.stderr.write(f"{name} failed: {error}")
+        if results["skipped"]:
+            self.stdout.write(f"Out of time, skipped: {', '.join(results['skipped'])}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Warmed {len(results['warmed'])} caches in "
+                f"{sum(results['warmed'].values()):.2f} s of task time"
+            )
+        )
@@ -0,0 +1,65 @@
+import csv
+import json
+
+from flights.models import Ticket
+from flights.sharding import merge_sorted
+
+MANIFEST_FIELDS = (
+    "row",
+    "seat",
+    "ticket_id",
+    "order_id",
+    "email",
+    "first_name",
+    "last_name",
+)
+
+MANIFEST_CHUNK_SIZE = 2000
+
+
+def manifest_rows(flight_id: int):
+    """Yield manifest rows for a flight ordered by row and seat.
+
+    A single query joins Ticket -> Order -> User and is consumed with a
+    server-side iterator, so memory use does not grow with the airframe.
+    With order shards, the per-shard streams are merged on (row, seat).
+    """
+    queryset = (
+        Ticket.objects.filter(flight_id=flight_id)
+        .order_by("row", "seat")
+        .values_list(
+            "row",
+            "seat",
+            "id",
+            "order_id",
+            "order__user__email",
+            "order__user__first_name",
+            "order__user__last_name",
+        )
+    )
+    return merge_sorted(
+        queryset, key=lambda row: row[:2], chunk_size=MANIFEST_CHUNK_SIZE
+    )
+
+
+def stream_manifest_json(flight_id: int):
+    yield f'{{"flight": {flight_id}, "passengers": ['
+    separator = ""
+    for row in manifest_rows(flight_id):
+        yield separator + json.dumps(dict(zip(MANIFEST_FIELDS, row)))
+        separator = ","
+    yield "]}"
+
+
+class _Echo:
+    """File-like object that hands back what the csv writer writes."""
+
+    def write(self, value):
+        return value
+
+
+def stream_manifest_csv(flight_id: int):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(MANIFEST_FIELDS)
+    for row in manifest_rows(flight_id):
+        yield writer.writerow(row)
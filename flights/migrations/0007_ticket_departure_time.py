@@ -0,0 +1,35 @@
+# Generated by Django 5.0.7 on 2026-10-19 09:12
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_flight_departure_time(apps, schema_editor):
+    Flight = apps.get_model("flights", "Flight")
+    Ticket = apps.get_model("flights", "Ticket")
+    Ticket.objects.update(
+        departure_time=Subquery(
+            Flight.objects.filter(id=OuterRef("flight_id")).values("departure_time")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0006_airport_iata_code'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='departure_time',
+            field=models.DateTimeField(editable=False, null=True, help_text='Copy of the flight departure time, used as the partition key.'),
+        ),
+        migrations.RunPython(copy_flight_departure_time, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='ticket',
+            name='departure_time',
+            field=models.DateTimeField(editable=False, help_text='Copy of the flight departure time, used as the partition key.'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.7 on 2026-10-19 09:47
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0010_bookingrequest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='airport',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-90), django.core.validators.MaxValueValidator(90)]),
+        ),
+        migrations.AddField(
+            model_name='airport',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-180), django.core.validators.MaxValueValidator(180)]),
+        ),
+        migrations.AlterField(
+            model_name='route',
+            name='distance',
+            field=models.IntegerField(blank=True, help_text='Kilometres; filled in from airport coordinates when left empty.'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.0.7 on 2026-10-19 09:51
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def merge_duplicate_routes(apps, schema_editor):
+    """Keep the oldest route of each airport pair and move the flights of the others to it."""
+    Route = apps.get_model("flights", "Route")
+    Flight = apps.get_model("flights", "Flight")
+
+    duplicates = (
+        Route.objects.values("source_id", "destination_id")
+        .annotate(count=Count("id"), keep=Min("id"))
+        .filter(count__gt=1)
+    )
+    for pair in duplicates:
+        others = Route.objects.filter(
+            source_id=pair["source_id"], destination_id=pair["destination_id"]
+        ).exclude(id=pair["keep"])
+        for flight in Flight.objects.filter(route__in=others):
+            clash = Flight.objects.filter(
+                route_id=pair["keep"],
+                airplane_id=flight.airplane_id,
+                departure_time=flight.departure_time,
+                arrival_time=flight.arrival_time,
+            ).first()
+            if clash is not None:
+                raise RuntimeError(
+                    f"Flights {clash.id} and {flight.id} are the same flight on duplicate "
+                    f"routes {pair['keep']} and {flight.route_id}; merge them before migrating."
+                )
+        Flight.objects.filter(route__in=others).update(route_id=pair["keep"])
+        others.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0011_airport_coordinates'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_routes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.7 on 2026-10-19 09:51
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0012_merge_duplicate_routes'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='route',
+            unique_together={('source', 'destination')},
+        ),
+    ]
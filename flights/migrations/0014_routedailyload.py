@@ -0,0 +1,28 @@
+# Generated by Django 5.0.7 on 2026-10-19 09:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0013_unique_route_airports'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RouteDailyLoad',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('seats_offered', models.IntegerField(default=0)),
+                ('seats_sold', models.IntegerField(default=0)),
+                ('route', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_loads', to='flights.route')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date', 'route'], name='flights_rou_date_d26264_idx')],
+                'unique_together': {('route', 'date')},
+            },
+        ),
+    ]
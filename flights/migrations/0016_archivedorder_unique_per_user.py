@@ -0,0 +1,19 @@
+# Generated by Django 5.0.7 on 2026-10-19 10:52
+
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0015_idempotencykey_claimed_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='archivedorder',
+            unique_together={('order_id', 'user', 'archive')},
+        ),
+    ]
@@ -0,0 +1,169 @@
+from django.core.exceptions import FieldDoesNotExist
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from Airport_API_Service.db_routers import is_pinned_to_primary, replica_reads
+
+
+class ReplicaReadMixin:
+    """Serve safe requests from a read replica.
+
+    Users pinned to the primary after a write keep reading from it so
+    they see their own changes.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and not is_pinned_to_primary(request.user):
+            self._replica_reads_token = replica_reads.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, "_replica_reads_token", None)
+        if token is not None:
+            replica_reads.reset(token)
+            self._replica_reads_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+IDS_PARAMETER = OpenApiParameter(
+    name="ids",
+    type={"type": "array", "items": {"type": "number"}},
+    description="Return only these objects, in this order (ex. ?ids=3,1,2)",
+    style="form",
+    explode=False,
+)
+
+
+class MultiGetMixin:
+    """Let ``list`` return the objects named in ``?ids=`` from a single query.
+
+    Objects are rendered with the ``retrieve`` serializer and in the
+    requested order; ids that do not exist are left out.
+    """
+
+    multi_get_max_ids = 100
+
+    @staticmethod
+    def _params_to_ints(qs):
+        return [int(str_id) for str_id in qs.split(",")]
+
+    @extend_schema(parameters=[IDS_PARAMETER])
+    def list(self, request, *args, **kwargs):
+        ids = request.query_params.get("ids")
+        if ids is None:
+            return super().list(request, *args, **kwargs)
+
+        try:
+            ids = list(dict.fromkeys(self._params_to_ints(ids)))
+        except ValueError:
+            return Response(
+                {"ids": "ids must be a comma-separated list of integers"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(ids) > self.multi_get_max_ids:
+            return Response(
+                {"ids": f"At most {self.multi_get_max_ids} ids can be requested at once"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        self.action = "retrieve"
+        objects = self.filter_queryset(self.get_queryset()).in_bulk(ids)
+        serializer = self.get_serializer(
+            [objects[pk] for pk in ids if pk in objects], many=True
+        )
+        return Response(serializer.data)
+
+
+FIELDS_PARAMETER = OpenApiParameter(
+    name="fields",
+    type={"type": "array", "items": {"type": "string"}},
+    description="Return only these fields (ex. ?fields=id,departure_time)",
+    style="form",
+    explode=False,
+)
+
+EXPAND_PARAMETER = OpenApiParameter(
+    name="expand",
+    type={"type": "array", "items": {"type": "string"}},
+    description="Render these relations as nested objects (ex. ?expand=route)",
+    style="form",
+    explode=False,
+)
+
+
+class SparseFieldsMixin:
+    """Serve ``?fields=`` and ``?expand=`` and load only what they need.
+
+    ``field_queries`` maps a serializer field to the columns (``only``),
+    joins (``select_related``), prefetches and annotations it reads; model
+    fields missing from it are plain columns. ``expand_queries`` adds what
+    an expanded relation needs on top. Without ``?fields=`` every field of
+    the serializer is loaded, but no columns are deferred.
+    """
+
+    field_queries = {}
+    expand_queries = {}
+
+    def _query_param_set(self, name: str) -> set[str] | None:
+        if self.request.method not in SAFE_METHODS:
+            return None
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        return {item.strip() for item in value.split(",") if item.strip()}
+
+    @property
+    def requested_fields(self) -> set[str] | None:
+        return self._query_param_set("fields")
+
+    @property
+    def requested_expand(self) -> set[str]:
+        return self._query_param_set("expand") or set()
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"] = self.requested_fields
+        context["expand"] = self.requested_expand
+        return context
+
+    def shape_queryset(self, queryset):
+        requested = self.requested_fields
+        names = requested or set(self.get_serializer_class().Meta.fields)
+        queries = [self.field_queries.get(name, {}) for name in names]
+        queries += [
+            self.expand_queries[name]
+            for name in self.requested_expand & names
+            if name in self.expand_queries
+        ]
+
+        only = {queryset.model._meta.pk.name}
+        for name in names:
+            if name in self.field_queries:
+                continue
+            try:
+                field = queryset.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if field.concrete and not field.many_to_many:
+                only.add(field.name)
+
+        select_related = []
+        prefetch_related = []
+        annotations = {}
+        for query in queries:
+            only.update(query.get("only", ()))
+            select_related += query.get("select_related", [])
+            prefetch_related += query.get("prefetch_related", [])
+            annotations.update(query.get("annotate", {}))
+
+        if select_related:
+            queryset = queryset.select_related(*dict.fromkeys(select_related))
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+        if requested:
+            queryset = queryset.only(*only)
+        return queryset
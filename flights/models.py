@@ -2,9 +2,12 @@ import os
 import uuid
 
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
 from django.conf import settings
+from django.utils import timezone
 from django.utils.text import slugify
 
 
@@ -12,6 +15,16 @@ class Airport(models.Model):
     name = models.CharField(max_length=255, unique=True)
     closest_big_city = models.CharField(max_length=255)
     iata_code = models.CharField(max_length=3, unique=True, null=True, blank=True)
+    latitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)],
+    )
+    longitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)],
+    )
 
     def __str__(self):
         return f"{self.name} ({self.iata_code})"
@@ -56,7 +69,13 @@ class Airplane(models.Model):
 class Route(models.Model):
     source = models.ForeignKey(Airport, on_delete=models.CASCADE, related_name="routes_from")
     destination = models.ForeignKey(Airport, on_delete=models.CASCADE, related_name="routes_to")
-    distance = models.IntegerField()
+    distance = models.IntegerField(
+        blank=True,
+        help_text="Kilometres; filled in from airport coordinates when left empty.",
+    )
+
+    class Meta:
+        unique_together = ("source", "destination")
 
     def __str__(self):
         source_airport = f"{self.source.iata_code} ({self.source.closest_big_city})"
@@ -68,12 +87,20 @@ class Route(models.Model):
             raise ValidationError(
                 "The city of departure and arrival cannot be the same"
             )
+        if self.distance is None:
+            raise ValidationError(
+                "The distance is required unless both airports have coordinates"
+            )
         if self.distance < 0:
             raise ValidationError(
                 "The distance cannot be negative"
             )
 
     def save(self, *args, **kwargs):
+        if self.distance is None:
+            from flights.geo import route_distance
+
+            self.distance = route_distance(self.source_id, self.destination_id)
         self.full_clean()
         super().save(*args, **kwargs)
 
@@ -94,7 +121,16 @@ class Flight(models.Model):
 
     def save(self, *args, **kwargs):
         self.full_clean()
+        adding = self._state.adding
         super().save(*args, **kwargs)
+        if not adding:
+            from flights.sharding import order_databases
+
+            # Tickets live on the order shards when sharding is on.
+            for database in order_databases():
+                Ticket.objects.using(database).filter(flight_id=self.id).exclude(
+                    departure_time=self.departure_time
+                ).update(departure_time=self.departure_time)
 
     def __str__(self):
         return f"Flight {self.route} on {self.departure_time}"
@@ -113,6 +149,10 @@ class Ticket(models.Model):
     seat = models.IntegerField()
     flight = models.ForeignKey(Flight, on_delete=models.CASCADE, related_name="tickets")
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="tickets")
+    departure_time = models.DateTimeField(
+        editable=False,
+        help_text="Copy of the flight departure time, used as the partition key.",
+    )
 
     @staticmethod
     def validate_seats(row: int, seat: int, error_to_raise, flight: Flight):
@@ -139,8 +179,98 @@ class Ticket(models.Model):
             self.flight,
         )
 
+    def save(self, *args, **kwargs):
+        self.departure_time = self.flight.departure_time
+        super().save(*args, **kwargs)
+
     class Meta:
         unique_together = ("flight", "row", "seat")
 
     def __str__(self):
         return f"{str(self.flight)} (row: {self.row}, seat: {self.seat})"
+
+
+class ArchivedOrder(models.Model):
+    """Index entry pointing to an order moved to cold storage by ``archive_flights``."""
+
+    order_id = models.BigIntegerField()
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="archived_orders")
+    created_at = models.DateTimeField()
+    archive = models.CharField(max_length=64)
+    offset = models.BigIntegerField()
+
+    class Meta:
+        # Order ids are only unique per order database, which is picked by user.
+        unique_together = ("order_id", "user", "archive")
+        indexes = [models.Index(fields=["user", "-created_at"])]
+
+    def __str__(self):
+        return f"Order #{self.order_id} ({self.archive})"
+
+
+class IdempotencyKey(models.Model):
+    """Outcome of an order request, replayed for retries carrying the same key."""
+
+    key = models.CharField(max_length=255)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="idempotency_keys")
+    request_hash = models.CharField(max_length=64)
+    order_id = models.BigIntegerField(null=True)
+    response_status = models.PositiveSmallIntegerField(null=True)
+    response_body = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    # When the request now in charge of the key started; see IDEMPOTENCY_CLAIM_TIMEOUT
+    claimed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ("user", "key")
+
+    def __str__(self):
+        return f"{self.user} ({self.key})"
+
+
+class BookingRequest(models.Model):
+    """Order request queued by ``POST /orders/`` when ``ASYNC_ORDER_INTAKE`` is on."""
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        COMPLETED = "completed"
+        FAILED = "failed"
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="booking_requests")
+    flight_key = models.PositiveIntegerField(
+        help_text="Flight used to assign the request to a booking worker.",
+    )
+    tickets = models.JSONField()
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
+    order_id = models.BigIntegerField(null=True)
+    errors = models.JSONField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "flight_key", "id"])]
+
+    def __str__(self):
+        return f"Booking request #{self.id} ({self.status})"
+
+
+class RouteDailyLoad(models.Model):
+    """Seats offered and sold per route and departure day, kept up to date by ``flights.rollups``."""
+
+    route = models.ForeignKey(Route, on_delete=models.CASCADE, related_name="daily_loads")
+    date = models.DateField()
+    seats_offered = models.IntegerField(default=0)
+    seats_sold = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("route", "date")
+        indexes = [models.Index(fields=["date", "route"])]
+
+    def __str__(self):
+        return f"Route #{self.route_id} on {self.date}"
+
+    @property
+    def load_factor(self) -> float | None:
+        if not self.seats_offered:
+            return None
+        return round(self.seats_sold / self.seats_offered, 4)
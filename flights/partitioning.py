@@ -0,0 +1,227 @@
+"""Monthly range partitioning of flights and tickets (PostgreSQL only).
+
+``flights_flight`` is partitioned on ``departure_time`` and
+``flights_ticket`` on its copy of the flight departure time, so a month
+of flights and its tickets always live in partitions with the same
+bounds. Primary keys and unique constraints gain the partition key, the
+ticket -> flight foreign key becomes ``(flight_id, departure_time)``,
+and the crew through table loses its database-level foreign key to
+flights (Django still cascades deletes itself).
+"""
+from datetime import date
+
+from flights.models import Flight, Ticket
+
+PARTITION_KEY = "departure_time"
+PARTITIONED_MODELS = (Flight, Ticket)
+TICKET_FLIGHT_FK = "flights_ticket_flight_departure_fk"
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def partition_month(table: str, partition: str) -> date | None:
+    """Parse the month back from a partition name, ``None`` for the default one."""
+    prefix = f"{table}_p"
+    if not partition.startswith(prefix):
+        return None
+    try:
+        year, month = partition[len(prefix):].split("_")
+        return date(int(year), int(month), 1)
+    except ValueError:
+        return None
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def _bounds(month: date) -> tuple[str, str]:
+    return f"'{month.isoformat()} 00:00:00+00'", f"'{add_months(month, 1).isoformat()} 00:00:00+00'"
+
+
+def create_partition_sql(table: str, month: date) -> str:
+    start, end = _bounds(month)
+    return (
+        f'CREATE TABLE IF NOT EXISTS "{partition_name(table, month)}" '
+        f'PARTITION OF "{table}" '
+        f"FOR VALUES FROM ({start}) TO ({end})"
+    )
+
+
+def park_default_rows_sql(table: str, month: date) -> list[str]:
+    """Move the month's rows out of the default partition into a temporary table.
+
+    PostgreSQL refuses to create a partition while the default one holds
+    rows in its range.
+    """
+    start, end = _bounds(month)
+    parked = f"{partition_name(table, month)}_parked"
+    return [
+        f'CREATE TEMP TABLE "{parked}" (LIKE "{table}")',
+        f'WITH moved AS (DELETE FROM "{default_partition_name(table)}" '
+        f'WHERE "{PARTITION_KEY}" >= {start} AND "{PARTITION_KEY}" < {end} RETURNING *) '
+        f'INSERT INTO "{parked}" SELECT * FROM moved',
+    ]
+
+
+def restore_parked_rows_sql(table: str, month: date) -> list[str]:
+    parked = f"{partition_name(table, month)}_parked"
+    return [
+        f'INSERT INTO "{table}" SELECT * FROM "{parked}"',
+        f'DROP TABLE "{parked}"',
+    ]
+
+
+def is_partitioned(cursor, table: str) -> bool:
+    cursor.execute(
+        "SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = %s",
+        [table],
+    )
+    return cursor.fetchone() is not None
+
+
+def list_partitions(cursor, table: str) -> list[str]:
+    cursor.execute(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = %s ORDER BY child.relname",
+        [table],
+    )
+    return [name for name, in cursor.fetchall()]
+
+
+def conversion_sql(model, months) -> list[str]:
+    """Statements that swap an existing table for a partitioned copy of it."""
+    table = model._meta.db_table
+    legacy = f"{table}_unpartitioned"
+    sequence = f"{table}_partitioned_id_seq"
+    statements = [
+        f'LOCK TABLE "{table}" IN ACCESS EXCLUSIVE MODE',
+        f'ALTER TABLE "{table}" RENAME TO "{legacy}"',
+        f'CREATE TABLE "{table}" (LIKE "{legacy}" INCLUDING DEFAULTS, '
+        f'PRIMARY KEY ("id", "{PARTITION_KEY}")) PARTITION BY RANGE ("{PARTITION_KEY}")',
+        f'CREATE SEQUENCE "{sequence}" OWNED BY "{table}"."id"',
+        f'ALTER TABLE "{table}" ALTER COLUMN "id" SET DEFAULT nextval(\'"{sequence}"\')',
+    ]
+    for fields in model._meta.unique_together:
+        columns = [model._meta.get_field(name).column for name in fields]
+        if PARTITION_KEY not in columns:
+            columns.append(PARTITION_KEY)
+        columns = ", ".join(f'"{column}"' for column in columns)
+        statements.append(f'ALTER TABLE "{table}" ADD UNIQUE ({columns})')
+    for field in model._meta.concrete_fields:
+        if field.db_index and not field.primary_key:
+            statements.append(f'CREATE INDEX ON "{table}" ("{field.column}")')
+
+    statements.extend(create_partition_sql(table, month) for month in months)
+    statements += [
+        f'CREATE TABLE IF NOT EXISTS "{default_partition_name(table)}" '
+        f'PARTITION OF "{table}" DEFAULT',
+        f'INSERT INTO "{table}" SELECT * FROM "{legacy}"',
+        f"SELECT setval('\"{sequence}\"', "
+        f'COALESCE((SELECT MAX("id") FROM "{table}"), 0) + 1, false)',
+        f'DROP TABLE "{legacy}" CASCADE',
+    ]
+
+    for field in model._meta.concrete_fields:
+        if not field.is_relation or field.related_model in PARTITIONED_MODELS:
+            continue
+        statements.append(
+            f'ALTER TABLE "{table}" ADD FOREIGN KEY ("{field.column}") '
+            f'REFERENCES "{field.related_model._meta.db_table}" '
+            f'("{field.target_field.column}") DEFERRABLE INITIALLY DEFERRED'
+        )
+    if model is Ticket:
+        statements.append(
+            f'ALTER TABLE "{table}" ADD CONSTRAINT "{TICKET_FLIGHT_FK}" '
+            f'FOREIGN KEY ("flight_id", "{PARTITION_KEY}") '
+            f'REFERENCES "{Flight._meta.db_table}" ("id", "{PARTITION_KEY}") '
+            f"ON UPDATE CASCADE ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED"
+        )
+    return statements
+
+
+def convert_to_partitioned(cursor) -> list[str]:
+    """Convert the flight and ticket tables, returning the converted table names."""
+    converted = []
+    for model in PARTITIONED_MODELS:
+        table = model._meta.db_table
+        if is_partitioned(cursor, table):
+            continue
+        cursor.execute(
+            f"SELECT DISTINCT date_trunc('month', \"{PARTITION_KEY}\" AT TIME ZONE 'UTC')::date "
+            f'FROM "{table}"'
+        )
+        months = sorted(month for month, in cursor.fetchall())
+        for statement in conversion_sql(model, months):
+            cursor.execute(statement)
+        converted.append(table)
+    return converted
+
+
+def create_partitions(cursor, first_month: date, count: int) -> list[str]:
+    """Create ``count`` monthly partitions per table starting at ``first_month``.
+
+    Flights and tickets booked beyond the prepared months sit in the
+    default partitions. They are parked in temporary tables while their
+    month's partitions are created, then inserted back, which routes them
+    to the new partitions. Tickets are parked first and flights restored
+    first, so no flight row goes missing under its tickets.
+    """
+    existing = {
+        model: set(list_partitions(cursor, model._meta.db_table))
+        for model in PARTITIONED_MODELS
+    }
+    created = []
+    for offset in range(count):
+        month = add_months(first_month, offset)
+        missing = [
+            (model._meta.db_table, existing[model])
+            for model in PARTITIONED_MODELS
+            if partition_name(model._meta.db_table, month) not in existing[model]
+        ]
+        parked = [
+            table for table, partitions in missing
+            if default_partition_name(table) in partitions
+        ]
+        for table in reversed(parked):
+            for statement in park_default_rows_sql(table, month):
+                cursor.execute(statement)
+        for table, _ in missing:
+            cursor.execute(create_partition_sql(table, month))
+            created.append(partition_name(table, month))
+        for table in parked:
+            for statement in restore_parked_rows_sql(table, month):
+                cursor.execute(statement)
+    return created
+
+
+def detach_partitions_before(cursor, cutoff: date) -> list[str]:
+    """Detach monthly partitions that end on or before ``cutoff``.
+
+    Ticket partitions go first and drop their copy of the flight foreign
+    key, otherwise the matching flight partition could not be detached.
+    """
+    detached = []
+    for model in reversed(PARTITIONED_MODELS):
+        table = model._meta.db_table
+        for name in list_partitions(cursor, table):
+            month = partition_month(table, name)
+            if month is None or add_months(month, 1) > cutoff:
+                continue
+            cursor.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"')
+            if model is Ticket:
+                cursor.execute(
+                    f'ALTER TABLE "{name}" DROP CONSTRAINT IF EXISTS "{TICKET_FLIGHT_FK}"'
+                )
+            detached.append(name)
+    return detached
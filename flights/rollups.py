@@ -0,0 +1,193 @@
+"""Seats offered and sold per route and departure day.
+
+``RouteDailyLoad`` rows are kept current by the flight and ticket signals:
+a booked ticket adds one sold seat to its route and day, a new flight adds
+its airplane capacity. Changes that bypass signals (bulk updates, edited
+airplanes) are repaired by ``reconcile``, run nightly by the
+``reconcile_route_loads`` command, which recomputes a range of days from
+the flights and tickets themselves.
+
+Archiving deletes flights and tickets without touching the rollups, so
+the load of archived days stays available. For the same reason
+``reconcile`` keeps rows of days that no longer have any flights.
+"""
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from flights.models import Flight, RouteDailyLoad, Ticket
+from flights.sharding import PRIMARY_DATABASE, scatter_gather, ticket_counts
+
+_suspended = ContextVar("route_load_hooks_suspended", default=False)
+
+
+@contextmanager
+def suspended():
+    """Let flights and tickets be deleted without taking them off the rollups."""
+    token = _suspended.set(True)
+    try:
+        yield
+    finally:
+        _suspended.reset(token)
+
+
+def hooks_enabled() -> bool:
+    return not _suspended.get()
+
+
+def departure_day(departure_time: datetime) -> date:
+    return timezone.localdate(departure_time)
+
+
+def add(route_id: int, day: date, offered: int = 0, sold: int = 0) -> None:
+    rows = RouteDailyLoad.objects.filter(route_id=route_id, date=day)
+    changes = {
+        "seats_offered": F("seats_offered") + offered,
+        "seats_sold": F("seats_sold") + sold,
+    }
+    # Removals never create rows: the route may be on its way out with them.
+    if not rows.update(**changes) and (offered > 0 or sold > 0):
+        RouteDailyLoad.objects.bulk_create(
+            [RouteDailyLoad(route_id=route_id, date=day)], ignore_conflicts=True
+        )
+        rows.update(**changes)
+
+
+def flight_added(flight: Flight) -> None:
+    add(flight.route_id, departure_day(flight.departure_time), offered=flight.airplane.capacity)
+
+
+def deleted_with_flight(origin) -> bool:
+    """Whether a delete started at ``origin`` (a model instance or queryset) is a flight's."""
+    return isinstance(origin, Flight) or getattr(origin, "model", None) is Flight
+
+
+def flight_deleting(flight: Flight) -> None:
+    """Count the seats sold on ``flight``, on every order database, before it is deleted."""
+    flight._sold_seats = ticket_counts([flight.id]).get(flight.id, 0)
+
+
+def flight_removed(flight: Flight) -> None:
+    # One update for the flight and its tickets, which skip their own hooks.
+    add(
+        flight.route_id,
+        departure_day(flight.departure_time),
+        offered=-flight.airplane.capacity,
+        sold=-getattr(flight, "_sold_seats", 0),
+    )
+
+
+def flight_changed(previous, flight: Flight) -> None:
+    """Move a flight's seats between days; ``previous`` is ``(route_id, departure_time, airplane_id, capacity)``."""
+    route_id, departure_time, airplane_id, capacity = previous
+    if (route_id, departure_time, airplane_id) == (
+        flight.route_id, flight.departure_time, flight.airplane_id
+    ):
+        return
+    sold = ticket_counts([flight.id]).get(flight.id, 0)
+    add(route_id, departure_day(departure_time), offered=-capacity, sold=-sold)
+    add(
+        flight.route_id,
+        departure_day(flight.departure_time),
+        offered=flight.airplane.capacity,
+        sold=sold,
+    )
+
+
+def ticket_changed(ticket: Ticket, sold: int, using: str) -> None:
+    route_id = ticket.flight.route_id
+    day = departure_day(ticket.departure_time)
+    if using == PRIMARY_DATABASE:
+        add(route_id, day, sold=sold)
+    else:
+        # The ticket lives on an order shard; count it once its transaction commits.
+        transaction.on_commit(lambda: add(route_id, day, sold=sold), using=using)
+
+
+def day_bounds(start: date, end: date) -> tuple[datetime, datetime]:
+    """Datetimes from the start of ``start`` up to the end of ``end``."""
+    tz = timezone.get_current_timezone()
+    return (
+        datetime.combine(start, time.min, tzinfo=tz),
+        datetime.combine(end + timedelta(days=1), time.min, tzinfo=tz),
+    )
+
+
+def reconcile(start: date, end: date) -> dict:
+    """Recompute the rollups of the days ``start`` to ``end`` from flights and tickets."""
+    lower, upper = day_bounds(start, end)
+
+    flights = Flight.objects.filter(departure_time__gte=lower, departure_time__lt=upper)
+    offered = {
+        (route_id, day): seats
+        for route_id, day, seats in flights.annotate(day=TruncDate("departure_time"))
+        .values("route_id", "day")
+        .annotate(seats=Sum(F("airplane__rows") * F("airplane__seats_in_row")))
+        .values_list("route_id", "day", "seats")
+    }
+
+    def count_sold(alias):
+        # Grouped on the flight's departure, which the tickets' copy follows
+        # only after the flight's post_save has run.
+        tickets = Ticket.objects.using(alias).filter(
+            flight__departure_time__gte=lower, flight__departure_time__lt=upper
+        )
+        return {
+            (route_id, day): sold
+            for route_id, day, sold in tickets.annotate(day=TruncDate("flight__departure_time"))
+            .values("flight__route_id", "day")
+            .annotate(sold=Count("id"))
+            .values_list("flight__route_id", "day", "sold")
+        }
+
+    sold = Counter()
+    for counts in scatter_gather(count_sold):
+        sold.update(counts)
+
+    rows = RouteDailyLoad.objects.filter(date__gte=start, date__lte=end)
+    existing = {
+        (route_id, day): (seats_offered, seats_sold)
+        for route_id, day, seats_offered, seats_sold in rows.values_list(
+            "route_id", "date", "seats_offered", "seats_sold"
+        )
+    }
+
+    changed = [
+        RouteDailyLoad(
+            route_id=route_id,
+            date=day,
+            seats_offered=offered.get((route_id, day), 0),
+            seats_sold=sold[(route_id, day)],
+        )
+        for route_id, day in offered.keys() | sold.keys()
+        if existing.get((route_id, day))
+        != (offered.get((route_id, day), 0), sold[(route_id, day)])
+    ]
+    RouteDailyLoad.objects.bulk_create(
+        changed,
+        update_conflicts=True,
+        unique_fields=["route", "date"],
+        update_fields=["seats_offered", "seats_sold"],
+    )
+
+    # Empty rows left behind by deleted flights; rows of archived days still hold seats.
+    empty = [
+        key
+        for key, counts in existing.items()
+        if counts == (0, 0) and key not in offered and key not in sold
+    ]
+    for route_id, day in empty:
+        rows.filter(route_id=route_id, date=day).delete()
+
+    return {"updated": len(changed), "deleted": len(empty)}
+
+
+def last_departure_day() -> date | None:
+    last = Flight.objects.aggregate(last=Max("departure_time"))["last"]
+    return departure_day(last) if last else None
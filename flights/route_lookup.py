@@ -0,0 +1,50 @@
+"""Resolve ``(source IATA, destination IATA)`` pairs to route ids.
+
+The whole pair -> route id map is read with one query and cached under
+a versioned key. Route and airport writes bump the version, so every
+process sees the new map on its next lookup and stale maps expire.
+
+Both the version and the map live in the default cache, which must be
+shared by all worker processes (Redis, see ``REDIS_URL``). With the
+local-memory fallback each process keeps its own map, and only the
+process that made a change sees it.
+"""
+import uuid
+
+from django.core.cache import cache
+
+from flights.models import Route
+
+ROUTE_MAP_TIMEOUT = 60 * 60
+_VERSION_KEY = "route-iata-map-version"
+
+
+def _map_key(version: str) -> str:
+    return f"route-iata-map:{version}"
+
+
+def route_map() -> dict[str, int]:
+    version = cache.get(_VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.add(_VERSION_KEY, version, None)
+        version = cache.get(_VERSION_KEY, version)
+
+    routes = cache.get(_map_key(version))
+    if routes is None:
+        routes = {
+            f"{source}-{destination}": route_id
+            for route_id, source, destination in Route.objects.filter(
+                source__iata_code__isnull=False, destination__iata_code__isnull=False
+            ).values_list("id", "source__iata_code", "destination__iata_code")
+        }
+        cache.set(_map_key(version), routes, ROUTE_MAP_TIMEOUT)
+    return routes
+
+
+def resolve_route(source_iata: str, destination_iata: str) -> int | None:
+    return route_map().get(f"{source_iata.upper()}-{destination_iata.upper()}")
+
+
+def invalidate() -> None:
+    cache.set(_VERSION_KEY, uuid.uuid4().hex, None)
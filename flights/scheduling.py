@@ -0,0 +1,200 @@
+import heapq
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Sum, Window
+from django.db.models.functions import Lag, TruncDate
+
+from flights.models import Flight
+
+
+class IntervalIndex:
+    """Per-key sorted half-open ``[start, end)`` intervals.
+
+    Intervals are kept sorted by start, so an overlap lookup is two
+    bisects plus a scan of the intervals that can actually reach the
+    query window (bounded by the longest interval stored for the key).
+    """
+
+    def __init__(self):
+        self._starts = defaultdict(list)
+        self._intervals = defaultdict(list)
+        self._longest = defaultdict(timedelta)
+
+    def add(self, key, start: datetime, end: datetime, value) -> None:
+        starts = self._starts[key]
+        position = bisect_right(starts, start)
+        starts.insert(position, start)
+        self._intervals[key].insert(position, (start, end, value))
+        self._longest[key] = max(self._longest[key], end - start)
+
+    def overlapping(
+        self, key, start: datetime, end: datetime, margin: timedelta = timedelta(0)
+    ) -> list:
+        """Return values of intervals closer than ``margin`` to ``[start, end)``."""
+        starts = self._starts.get(key)
+        if not starts:
+            return []
+
+        low = bisect_right(starts, start - margin - self._longest[key])
+        high = bisect_left(starts, end + margin)
+        return [
+            value
+            for interval_start, interval_end, value in self._intervals[key][low:high]
+            if interval_end + margin > start and interval_start < end + margin
+        ]
+
+
+class CrewSchedule:
+    """Flight intervals of crew members, loaded once and checked per assignment."""
+
+    def __init__(self):
+        self.index = IntervalIndex()
+
+    @classmethod
+    def load(
+        cls, crew_ids, start: datetime, end: datetime, exclude_flight_ids=()
+    ) -> "CrewSchedule":
+        """Load the flights of ``crew_ids`` that touch ``[start, end)`` in one query."""
+        schedule = cls()
+        assignments = (
+            Flight.crew.through.objects.filter(
+                crew_id__in=crew_ids,
+                flight__departure_time__lt=end,
+                flight__arrival_time__gt=start,
+            )
+            .exclude(flight_id__in=exclude_flight_ids)
+            .values_list(
+                "crew_id",
+                "flight_id",
+                "flight__departure_time",
+                "flight__arrival_time",
+            )
+        )
+        for crew_id, flight_id, departure_time, arrival_time in assignments:
+            schedule.index.add(crew_id, departure_time, arrival_time, flight_id)
+        return schedule
+
+    def conflicts(self, crew_ids, departure_time, arrival_time) -> dict:
+        """Map each busy crew id to the flights it is already assigned to."""
+        conflicts = {}
+        for crew_id in crew_ids:
+            flights = self.index.overlapping(crew_id, departure_time, arrival_time)
+            if flights:
+                conflicts[crew_id] = flights
+        return conflicts
+
+    def assign(self, flight_id, crew_ids, departure_time, arrival_time) -> None:
+        for crew_id in crew_ids:
+            self.index.add(crew_id, departure_time, arrival_time, flight_id)
+
+
+class AirplaneSchedule:
+    """Flight intervals of airplanes, padded by the minimum turnaround."""
+
+    def __init__(self, turnaround: timedelta):
+        self.index = IntervalIndex()
+        self.turnaround = turnaround
+
+    @classmethod
+    def load(
+        cls, airplane_ids, start: datetime, end: datetime, exclude_flight_ids=()
+    ) -> "AirplaneSchedule":
+        """Load the flights of ``airplane_ids`` within a turnaround of ``[start, end)``."""
+        schedule = cls(settings.FLIGHT_MIN_TURNAROUND)
+        flights = (
+            Flight.objects.filter(
+                airplane_id__in=airplane_ids,
+                departure_time__lt=end + schedule.turnaround,
+                arrival_time__gt=start - schedule.turnaround,
+            )
+            .exclude(id__in=exclude_flight_ids)
+            .values_list("airplane_id", "id", "departure_time", "arrival_time")
+        )
+        for airplane_id, flight_id, departure_time, arrival_time in flights:
+            schedule.index.add(airplane_id, departure_time, arrival_time, flight_id)
+        return schedule
+
+    def conflicts(self, airplane_id, departure_time, arrival_time) -> list:
+        return self.index.overlapping(
+            airplane_id, departure_time, arrival_time, margin=self.turnaround
+        )
+
+    def assign(self, flight_id, airplane_id, departure_time, arrival_time) -> None:
+        self.index.add(airplane_id, departure_time, arrival_time, flight_id)
+
+
+def airplane_timeline(airplane_id: int, start: date, end: date):
+    """Return the airplane's flights between two dates and its daily utilization.
+
+    Each flight is annotated with the previous arrival through a ``LAG``
+    window, and block hours are summed per departure day in the database.
+    """
+    flights = Flight.objects.filter(
+        airplane_id=airplane_id,
+        departure_time__date__gte=start,
+        departure_time__date__lte=end,
+    )
+    block_time = ExpressionWrapper(
+        F("arrival_time") - F("departure_time"), output_field=DurationField()
+    )
+    timeline = flights.annotate(
+        previous_arrival_time=Window(
+            Lag("arrival_time"), order_by=[F("departure_time").asc(), F("id").asc()]
+        )
+    ).order_by("departure_time", "id")
+    utilization = (
+        flights.annotate(day=TruncDate("departure_time"))
+        .values("day")
+        .annotate(flights=Count("id"), block_time=Sum(block_time))
+        .order_by("day")
+    )
+    return timeline, utilization
+
+
+def find_crew_conflicts(since: datetime) -> list[dict]:
+    """Sweep every crew member's flights arriving after ``since`` for overlaps.
+
+    Assignments are read in one query ordered by crew and departure time.
+    The crew member's flights still in the air are kept in a heap ordered
+    by arrival, and each flight is reported against every one of them
+    when it departs, so every overlapping pair is listed once.
+    """
+    assignments = (
+        Flight.crew.through.objects.filter(flight__arrival_time__gt=since)
+        .order_by("crew_id", "flight__departure_time", "flight_id")
+        .values_list(
+            "crew_id",
+            "crew__first_name",
+            "crew__last_name",
+            "flight_id",
+            "flight__departure_time",
+            "flight__arrival_time",
+        )
+        .iterator()
+    )
+    conflicts = []
+    current_crew_id = None
+    # (arrival, departure order, flight id) of the crew member's flights in the air
+    in_air = []
+    for order, (crew_id, first_name, last_name, flight_id, departure, arrival) in enumerate(
+        assignments
+    ):
+        if crew_id != current_crew_id:
+            current_crew_id = crew_id
+            in_air.clear()
+        while in_air and in_air[0][0] <= departure:
+            heapq.heappop(in_air)
+        for _, _, busy_flight_id in sorted(in_air, key=lambda flight: flight[1]):
+            conflicts.append(
+                {
+                    "crew": crew_id,
+                    "crew_name": f"{first_name} {last_name}",
+                    "flight": flight_id,
+                    "conflicts_with": busy_flight_id,
+                }
+            )
+        heapq.heappush(in_air, (arrival, order, flight_id))
+    return conflicts
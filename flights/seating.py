@@ -0,0 +1,82 @@
+"""Automatic seat assignment for group bookings.
+
+:class:`SeatMap` holds the occupancy of one flight as a ``rows x
+seats_in_row`` boolean grid. A group gets the best run of adjacent free
+seats in one row: found for every row at once from the cumulative count
+of free seats, preferring runs that do not strand a single seat and then
+the front of the cabin. Without such a run the group is split over the
+free seats closest to one row.
+"""
+import numpy as np
+
+AUTO_SEATS_MAX = 9
+
+
+class NotEnoughSeats(Exception):
+    pass
+
+
+class SeatMap:
+    def __init__(self, rows: int, seats_in_row: int, taken=()):
+        self.occupied = np.zeros((rows, seats_in_row), dtype=bool)
+        self.reserve(taken)
+
+    @classmethod
+    def for_flight(cls, flight, taken) -> "SeatMap":
+        return cls(flight.airplane.rows, flight.airplane.seats_in_row, taken)
+
+    @property
+    def free_count(self) -> int:
+        return int(self.occupied.size - self.occupied.sum())
+
+    def reserve(self, seats) -> None:
+        """Mark 1-based ``(row, seat)`` pairs as taken."""
+        for row, seat in seats:
+            self.occupied[row - 1, seat - 1] = True
+
+    def find_block(self, count: int) -> list[tuple[int, int]] | None:
+        rows, width = self.occupied.shape
+        if not 0 < count <= width:
+            return None
+
+        free = np.pad((~self.occupied).astype(np.int32), ((0, 0), (1, 0))).cumsum(axis=1)
+        # runs[row, start]: the ``count`` seats from ``start`` are all free
+        runs = free[:, count:] - free[:, :-count] == count
+        if not runs.any():
+            return None
+
+        # A run strands a seat when exactly one free seat is left between it
+        # and the next taken seat or the side of the cabin.
+        closed = np.pad(self.occupied, ((0, 0), (2, 2)), constant_values=True)
+        starts = np.arange(width - count + 1)
+        left_stranded = ~closed[:, starts + 1] & closed[:, starts]
+        right_stranded = ~closed[:, starts + count + 2] & closed[:, starts + count + 3]
+        stranded = left_stranded.astype(np.int32) + right_stranded
+
+        row_index, start_index = np.nonzero(runs)
+        best = np.lexsort((start_index, row_index, stranded[row_index, start_index]))[0]
+        row, start = int(row_index[best]), int(start_index[best])
+        return [(row + 1, seat + 1) for seat in range(start, start + count)]
+
+    def find_split(self, count: int) -> list[tuple[int, int]] | None:
+        """The ``count`` free seats closest to a single row, front of the cabin first."""
+        free_rows, free_seats = np.nonzero(~self.occupied)
+        if len(free_rows) < count or count < 1:
+            return None
+
+        best, best_cost = None, None
+        for anchor in np.unique(free_rows):
+            distance = np.abs(free_rows - anchor)
+            chosen = np.lexsort((free_seats, free_rows, distance))[:count]
+            cost = int(distance[chosen].sum())
+            if best_cost is None or cost < best_cost:
+                best, best_cost = chosen, cost
+        return sorted((int(free_rows[i]) + 1, int(free_seats[i]) + 1) for i in best)
+
+    def assign(self, count: int) -> list[tuple[int, int]]:
+        """Pick and reserve seats for a group of ``count`` passengers."""
+        seats = self.find_block(count) or self.find_split(count)
+        if seats is None:
+            raise NotEnoughSeats(f"Only {self.free_count} seats are left on this flight")
+        self.reserve(seats)
+        return seats
@@ -1,4 +1,4 @@
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 
 from flights.models import (
@@ -10,13 +10,53 @@ from flights.models import (
     Ticket,
     Flight,
     Order,
+    BookingRequest,
+    RouteDailyLoad,
 )
+from flights.fares import price_flights
+from flights.geo import ROUTE_DISTANCE_TOLERANCE, route_distance
+from flights.scheduling import AirplaneSchedule, CrewSchedule
+from flights.seating import AUTO_SEATS_MAX, NotEnoughSeats, SeatMap
+from flights.sharding import order_database, sharding_enabled, taken_seats, ticket_counts
+
+
+class DynamicFieldsMixin:
+    """Apply ``?fields=`` and ``?expand=`` (passed in the context) to the top-level serializer.
+
+    ``expandable_fields`` maps a relation to the serializer rendering it in
+    full instead of its id or name.
+    """
+
+    expandable_fields = {}
+
+    def _is_top_level(self) -> bool:
+        parent = self.parent
+        return parent is None or (
+            isinstance(parent, serializers.ListSerializer) and parent.parent is None
+        )
+
+    def field_requested(self, name: str) -> bool:
+        requested = self.context.get("fields")
+        return not requested or name in requested or not self._is_top_level()
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self._is_top_level():
+            return fields
+
+        for name in self.context.get("expand") or ():
+            if name in fields and name in self.expandable_fields:
+                fields[name] = self.expandable_fields[name](read_only=True)
+        requested = self.context.get("fields")
+        if requested:
+            fields = {name: field for name, field in fields.items() if name in requested}
+        return fields
 
 
 class AirportSerializer(serializers.ModelSerializer):
     class Meta:
         model = Airport
-        fields = ("id", "name", "closest_big_city", "iata_code")
+        fields = ("id", "name", "closest_big_city", "iata_code", "latitude", "longitude")
 
 
 class AirplaneTypeSerializer(serializers.ModelSerializer):
@@ -31,7 +71,7 @@ class CrewSerializer(serializers.ModelSerializer):
         fields = ("id", "first_name", "last_name")
 
 
-class AirplaneSerializer(serializers.ModelSerializer):
+class AirplaneSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Airplane
         fields = ("id", "name", "rows", "seats_in_row", "airplane_type", "capacity")
@@ -45,34 +85,61 @@ class AirplaneImageSerializer(serializers.ModelSerializer):
 
 class AirplaneListSerializer(AirplaneSerializer):
     airplane_type = serializers.StringRelatedField(many=False)
+    expandable_fields = {"airplane_type": AirplaneTypeSerializer}
 
     def to_representation(self, instance):
         representation = super().to_representation(instance)
-        image_serializer = AirplaneImageSerializer(instance)
-        representation["image_url"] = image_serializer.data.get("image", "")
+        if self.field_requested("image_url"):
+            image_serializer = AirplaneImageSerializer(instance)
+            representation["image_url"] = image_serializer.data.get("image", "")
         return representation
 
 
-class RouteSerializer(serializers.ModelSerializer):
+class RouteSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Route
         fields = ("id", "source", "destination", "distance")
+        extra_kwargs = {"distance": {"required": False}}
 
     def validate(self, data):
-        if data["source"] == data["destination"]:
+        source = data.get("source", getattr(self.instance, "source", None))
+        destination = data.get("destination", getattr(self.instance, "destination", None))
+        if source == destination:
             raise serializers.ValidationError(
                 "The city of departure and arrival cannot be the same"
             )
-        if data["distance"] < 0:
+
+        great_circle = route_distance(source.id, destination.id)
+        distance = data.get("distance")
+        if distance is None:
+            airports_changed = self.instance is None or {"source", "destination"} & set(data)
+            if great_circle is not None and airports_changed:
+                distance = great_circle
+            else:
+                distance = getattr(self.instance, "distance", None)
+            if distance is None:
+                raise serializers.ValidationError(
+                    {"distance": "The distance is required unless both airports have coordinates"}
+                )
+            data["distance"] = distance
+        if distance < 0:
             raise serializers.ValidationError(
                 "The distance cannot be negative"
             )
+        if great_circle is not None and distance < great_circle * (1 - ROUTE_DISTANCE_TOLERANCE):
+            raise serializers.ValidationError(
+                {
+                    "distance": f"The distance cannot be shorter than the "
+                                f"great-circle distance of {great_circle} km"
+                }
+            )
         return data
 
 
 class RouteListSerializer(RouteSerializer):
     source = serializers.StringRelatedField(many=False)
     destination = serializers.StringRelatedField(many=False)
+    expandable_fields = {"source": AirportSerializer, "destination": AirportSerializer}
 
 
 class TicketSerializer(serializers.ModelSerializer):
@@ -97,19 +164,130 @@ class TicketSeatsSerializer(TicketSerializer):
         fields = ("row", "seat")
 
 
-class FlightSerializer(serializers.ModelSerializer):
+def crew_conflict_message(crew, flights) -> str:
+    flights = ", ".join(str(flight) for flight in flights)
+    return f"Crew member {crew} is already assigned to overlapping flight(s): {flights}"
+
+
+def airplane_conflict_message(airplane, flights) -> str:
+    flights = ", ".join(str(flight) for flight in flights)
+    return (
+        f"Airplane {airplane} is already scheduled within the minimum "
+        f"turnaround of flight(s): {flights}"
+    )
+
+
+class FlightBatchSerializer(serializers.ListSerializer):
+    """Bulk flight import checked against shared crew and airplane schedules."""
+
+    def validate(self, attrs):
+        if not attrs:
+            return attrs
+
+        start = min(item["departure_time"] for item in attrs)
+        end = max(item["arrival_time"] for item in attrs)
+        crew = {member.id: member for item in attrs for member in item.get("crew", [])}
+        airplanes = {item["airplane"].id: item["airplane"] for item in attrs}
+        crew_schedule = CrewSchedule.load(list(crew), start, end)
+        airplane_schedule = AirplaneSchedule.load(list(airplanes), start, end)
+
+        errors = []
+        for position, item in enumerate(attrs):
+            label = f"item {position}"
+            departure_time, arrival_time = item["departure_time"], item["arrival_time"]
+            crew_ids = [member.id for member in item.get("crew", [])]
+            airplane_id = item["airplane"].id
+
+            conflicts = crew_schedule.conflicts(crew_ids, departure_time, arrival_time)
+            errors.extend(
+                f"Item {position}: {crew_conflict_message(crew[crew_id], flights)}"
+                for crew_id, flights in conflicts.items()
+            )
+            flights = airplane_schedule.conflicts(airplane_id, departure_time, arrival_time)
+            if flights:
+                errors.append(
+                    f"Item {position}: "
+                    f"{airplane_conflict_message(airplanes[airplane_id], flights)}"
+                )
+
+            crew_schedule.assign(label, crew_ids, departure_time, arrival_time)
+            airplane_schedule.assign(label, airplane_id, departure_time, arrival_time)
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
+
+    def create(self, validated_data):
+        with transaction.atomic():
+            return super().create(validated_data)
+
+
+class FlightSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     departure_time = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S")
     arrival_time = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S")
 
     class Meta:
         model = Flight
         fields = ("id", "route", "airplane", "departure_time", "arrival_time", "crew",)
+        list_serializer_class = FlightBatchSerializer
 
     def validate(self, data):
         if data["departure_time"] > data["arrival_time"]:
             raise serializers.ValidationError("Departure time must be before arrival time.")
+        if not isinstance(self.parent, serializers.ListSerializer):
+            self.validate_crew_availability(data)
+            self.validate_airplane_availability(data)
         return data
 
+    def validate_airplane_availability(self, data) -> None:
+        airplane = data.get("airplane") or self.instance.airplane
+        departure_time = data["departure_time"]
+        arrival_time = data["arrival_time"]
+        exclude = [self.instance.id] if self.instance else []
+
+        schedule = AirplaneSchedule.load(
+            [airplane.id], departure_time, arrival_time, exclude_flight_ids=exclude
+        )
+        flights = schedule.conflicts(airplane.id, departure_time, arrival_time)
+        if flights:
+            raise serializers.ValidationError(
+                {"airplane": [airplane_conflict_message(airplane, flights)]}
+            )
+
+    def validate_crew_availability(self, data) -> None:
+        crew = data.get("crew")
+        if crew is None:
+            crew = list(self.instance.crew.all()) if self.instance else []
+        if not crew:
+            return
+
+        departure_time = data["departure_time"]
+        arrival_time = data["arrival_time"]
+        exclude = [self.instance.id] if self.instance else []
+        crew_by_id = {member.id: member for member in crew}
+        schedule = CrewSchedule.load(
+            list(crew_by_id), departure_time, arrival_time, exclude_flight_ids=exclude
+        )
+        conflicts = schedule.conflicts(list(crew_by_id), departure_time, arrival_time)
+        if conflicts:
+            raise serializers.ValidationError(
+                {
+                    "crew": [
+                        crew_conflict_message(crew_by_id[crew_id], flights)
+                        for crew_id, flights in conflicts.items()
+                    ]
+                }
+            )
+
+
+class PricedFlightListSerializer(serializers.ListSerializer):
+    """Price all flights of the page in one fare engine call."""
+
+    def to_representation(self, data):
+        flights = list(data.all() if hasattr(data, "all") else data)
+        if self.child.field_requested("price"):
+            self.context["fares"] = price_flights(flights, self.child.tickets_sold)
+        return super().to_representation(flights)
+
 
 class FlightListSerializer(FlightSerializer):
     route = serializers.StringRelatedField(many=False)
@@ -118,6 +296,8 @@ class FlightListSerializer(FlightSerializer):
         source="airplane.capacity", read_only=True
     )
     tickets_available = serializers.IntegerField(read_only=True)
+    price = serializers.SerializerMethodField()
+    expandable_fields = {"route": RouteListSerializer, "airplane": AirplaneListSerializer}
 
     class Meta:
         model = Flight
@@ -129,15 +309,34 @@ class FlightListSerializer(FlightSerializer):
             "arrival_time",
             "tickets_available",
             "airplane_num_seats",
+            "price",
         )
+        list_serializer_class = PricedFlightListSerializer
+
+    def get_price(self, instance) -> float | None:
+        fares = self.context.get("fares")
+        if fares is None or instance.id not in fares:
+            fares = price_flights([instance], self.tickets_sold)
+        return fares[instance.id]
 
     def to_representation(self, instance):
         representation = super().to_representation(instance)
-        representation["tickets_available"] = (
-                instance.airplane.rows * instance.airplane.seats_in_row - instance.tickets.count()
-        )
+        if self.field_requested("tickets_available"):
+            representation["tickets_available"] = (
+                    instance.airplane.rows * instance.airplane.seats_in_row - self.tickets_sold(instance)
+            )
         return representation
 
+    def tickets_sold(self, instance) -> int:
+        tickets_sold = self.context.get("tickets_sold")
+        if tickets_sold is not None:
+            return tickets_sold.get(instance.id, 0)
+        if sharding_enabled():
+            return ticket_counts([instance.id]).get(instance.id, 0)
+        if hasattr(instance, "tickets_available"):
+            return instance.airplane.capacity - instance.tickets_available
+        return instance.tickets.count()
+
 
 class FlightDetailSerializer(FlightListSerializer):
     crew = serializers.StringRelatedField(many=True)
@@ -154,29 +353,236 @@ class FlightDetailSerializer(FlightListSerializer):
             "taken_places",
             "tickets_available",
             "crew",
+            "price",
+        )
+        list_serializer_class = PricedFlightListSerializer
+
+    def to_representation(self, instance):
+        representation = super().to_representation(instance)
+        if sharding_enabled() and self.field_requested("taken_places"):
+            representation["taken_places"] = [
+                {"row": row, "seat": seat} for row, seat in taken_seats(instance.id)
+            ]
+        return representation
+
+
+class FlightBoardSerializer(serializers.ModelSerializer):
+    route = serializers.StringRelatedField(many=False)
+    airplane = serializers.StringRelatedField(many=False)
+    departure_time = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S")
+    arrival_time = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S")
+
+    class Meta:
+        model = Flight
+        fields = ("id", "route", "airplane", "departure_time", "arrival_time")
+
+
+class AirplaneTimelineFlightSerializer(serializers.ModelSerializer):
+    departure_time = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S")
+    arrival_time = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S")
+    previous_arrival_time = serializers.DateTimeField(
+        format="%Y-%m-%d %H:%M:%S", read_only=True, allow_null=True
+    )
+    ground_time_minutes = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Flight
+        fields = (
+            "id",
+            "route",
+            "departure_time",
+            "arrival_time",
+            "previous_arrival_time",
+            "ground_time_minutes",
+        )
+
+    def get_ground_time_minutes(self, flight) -> int | None:
+        if flight.previous_arrival_time is None:
+            return None
+        ground_time = flight.departure_time - flight.previous_arrival_time
+        return int(ground_time.total_seconds() // 60)
+
+
+class AirplaneUtilizationSerializer(serializers.Serializer):
+    day = serializers.DateField()
+    flights = serializers.IntegerField()
+    block_hours = serializers.SerializerMethodField()
+
+    def get_block_hours(self, utilization) -> float:
+        return round(utilization["block_time"].total_seconds() / 3600, 2)
+
+
+class RouteDailyLoadSerializer(serializers.ModelSerializer):
+    source = serializers.CharField(source="route.source.iata_code", read_only=True)
+    destination = serializers.CharField(source="route.destination.iata_code", read_only=True)
+    load_factor = serializers.FloatField(read_only=True, allow_null=True)
+
+    class Meta:
+        model = RouteDailyLoad
+        fields = (
+            "route",
+            "source",
+            "destination",
+            "date",
+            "seats_offered",
+            "seats_sold",
+            "load_factor",
         )
 
 
-class OrderSerializer(serializers.ModelSerializer):
-    tickets = TicketSerializer(many=True, read_only=False, allow_empty=False)
+class RouteLoadTotalSerializer(serializers.Serializer):
+    route = serializers.IntegerField()
+    source = serializers.CharField()
+    destination = serializers.CharField()
+    days = serializers.IntegerField()
+    seats_offered = serializers.IntegerField()
+    seats_sold = serializers.IntegerField()
+    load_factor = serializers.SerializerMethodField()
+
+    def get_load_factor(self, total) -> float | None:
+        if not total["seats_offered"]:
+            return None
+        return round(total["seats_sold"] / total["seats_offered"], 4)
+
+
+class OrderSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    tickets = TicketSerializer(many=True, read_only=False, allow_empty=False, required=False)
+    flight = serializers.PrimaryKeyRelatedField(
+        queryset=Flight.objects.all(),
+        write_only=True,
+        required=False,
+        help_text="Flight of the auto-assigned seats.",
+    )
+    auto_seats = serializers.IntegerField(
+        write_only=True,
+        required=False,
+        min_value=1,
+        max_value=AUTO_SEATS_MAX,
+        help_text="Number of seats to assign automatically, side by side when possible.",
+    )
     created_at = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S", read_only=True)
 
     class Meta:
         model = Order
-        fields = ("id", "created_at", "tickets",)
+        fields = ("id", "created_at", "tickets", "flight", "auto_seats",)
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if "auto_seats" in attrs:
+            if "tickets" in attrs:
+                raise serializers.ValidationError(
+                    "Send either tickets or auto_seats, not both."
+                )
+            if "flight" not in attrs:
+                raise serializers.ValidationError({"flight": "Required with auto_seats."})
+        elif "tickets" not in attrs:
+            raise serializers.ValidationError({"tickets": "This field is required."})
+        return attrs
 
     def create(self, validated_data):
-        with transaction.atomic():
-            tickets_data = validated_data.pop("tickets")
-            order = Order.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(order=order, **ticket_data)
-            return order
+        database = order_database(validated_data["user"].id)
+        flight = validated_data.pop("flight", None)
+        auto_seats = validated_data.pop("auto_seats", None)
+        try:
+            with transaction.atomic(), transaction.atomic(using=database):
+                if auto_seats:
+                    tickets_data = self.assign_seats(flight, auto_seats)
+                else:
+                    tickets_data = validated_data.pop("tickets")
+                    if sharding_enabled():
+                        self.check_seats_across_shards(tickets_data)
+                order = Order.objects.create(**validated_data)
+                for ticket_data in tickets_data:
+                    Ticket.objects.create(order=order, **ticket_data)
+                return order
+        except IntegrityError:
+            if not auto_seats:
+                raise
+            # A booking that picked its own seats got there between our read and insert.
+            raise serializers.ValidationError(
+                {"auto_seats": "The assigned seats were just taken, please try again."}
+            )
+
+    @staticmethod
+    def assign_seats(flight: Flight, count: int) -> list[dict]:
+        """Lock the flight and pick ``count`` seats from its current seat map."""
+        flight = (
+            Flight.objects.select_for_update(of=("self",))
+            .select_related("airplane")
+            .get(id=flight.id)
+        )
+        seat_map = SeatMap.for_flight(flight, taken_seats(flight.id))
+        try:
+            seats = seat_map.assign(count)
+        except NotEnoughSeats as error:
+            raise serializers.ValidationError({"auto_seats": str(error)})
+        return [{"flight": flight, "row": row, "seat": seat} for row, seat in seats]
+
+    @staticmethod
+    def check_seats_across_shards(tickets_data) -> None:
+        """Lock the flights on the primary and check their seats on every shard.
+
+        Seat uniqueness is only enforced by each shard's own table, so
+        bookings of the same flight are serialized by the flight row lock.
+        """
+        flight_ids = sorted({ticket["flight"].id for ticket in tickets_data})
+        list(
+            Flight.objects.select_for_update()
+            .filter(id__in=flight_ids)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        taken = {
+            flight_id: set(taken_seats(flight_id)) for flight_id in flight_ids
+        }
+        for ticket in tickets_data:
+            if (ticket["row"], ticket["seat"]) in taken[ticket["flight"].id]:
+                raise serializers.ValidationError(
+                    {
+                        "tickets": f"Seat {ticket['seat']} in row {ticket['row']} "
+                                   f"is already taken on flight {ticket['flight'].id}"
+                    }
+                )
 
 
 class TicketListSerializer(TicketSerializer):
     flight = FlightListSerializer(read_only=True)
 
 
+class PricedOrderListSerializer(serializers.ListSerializer):
+    """Count the sold seats of, and price, the flights of every ticket on the page at once."""
+
+    def to_representation(self, data):
+        orders = list(data.all() if hasattr(data, "all") else data)
+        if self.child.field_requested("tickets"):
+            flights = list(
+                {
+                    ticket.flight_id: ticket.flight
+                    for order in orders
+                    for ticket in order.tickets.all()
+                }.values()
+            )
+            tickets_sold = ticket_counts([flight.id for flight in flights]) if flights else {}
+            self.context["tickets_sold"] = tickets_sold
+            self.context["fares"] = price_flights(
+                flights, lambda flight: tickets_sold.get(flight.id, 0)
+            )
+        return super().to_representation(orders)
+
+
 class OrderListSerializer(OrderSerializer):
     tickets = TicketListSerializer(many=True, read_only=True)
+
+    class Meta(OrderSerializer.Meta):
+        list_serializer_class = PricedOrderListSerializer
+
+
+class BookingRequestSerializer(serializers.ModelSerializer):
+    url = serializers.HyperlinkedIdentityField(view_name="flights:bookingrequest-detail")
+    order = serializers.IntegerField(source="order_id", read_only=True)
+    created_at = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S", read_only=True)
+    processed_at = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S", read_only=True)
+
+    class Meta:
+        model = BookingRequest
+        fields = ("id", "url", "status", "order", "errors", "created_at", "processed_at")
@@ -0,0 +1,102 @@
+"""Opt-in sharding of orders and tickets by user.
+
+With ``ORDER_SHARDS`` configured, each user's orders and tickets live on
+one shard picked by a stable hash of the user id. Shards are migrated
+like the primary and carry a replicated copy of the catalog and user
+tables, so tickets still join to flights and users locally. Questions
+about a flight span every user and are answered by querying all shards
+in parallel (scatter-gather).
+"""
+import hashlib
+import heapq
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db.models import Count
+
+from flights.models import Ticket
+
+PRIMARY_DATABASE = "default"
+SHARDED_MODELS = {"flights.order", "flights.ticket"}
+
+_executor = None
+
+
+def sharding_enabled() -> bool:
+    return bool(settings.ORDER_SHARDS)
+
+
+def shard_for_user(user_id) -> str:
+    digest = hashlib.sha1(str(user_id).encode()).digest()
+    shards = settings.ORDER_SHARDS
+    return shards[int.from_bytes(digest[:8], "big") % len(shards)]
+
+
+def order_database(user_id) -> str:
+    """Database alias holding the orders of ``user_id``."""
+    return shard_for_user(user_id) if sharding_enabled() else PRIMARY_DATABASE
+
+
+def order_databases() -> list[str]:
+    return list(settings.ORDER_SHARDS) or [PRIMARY_DATABASE]
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=len(order_databases()), thread_name_prefix="order-shards"
+        )
+    return _executor
+
+
+def scatter_gather(query) -> list:
+    """Run ``query(alias)`` on every order database, in parallel when sharded."""
+    databases = order_databases()
+    if len(databases) == 1:
+        return [query(databases[0])]
+    return list(_get_executor().map(query, databases))
+
+
+def ticket_counts(flight_ids) -> dict:
+    """Number of sold tickets per flight across all shards."""
+
+    def count(alias):
+        return dict(
+            Ticket.objects.using(alias)
+            .filter(flight_id__in=flight_ids)
+            .values("flight_id")
+            .annotate(count=Count("id"))
+            .values_list("flight_id", "count")
+        )
+
+    totals = Counter()
+    for counts in scatter_gather(count):
+        totals.update(counts)
+    return dict(totals)
+
+
+def taken_seats(flight_id) -> list[tuple[int, int]]:
+    """Seat map of a flight as sorted ``(row, seat)`` pairs from all shards."""
+
+    def seats(alias):
+        return list(
+            Ticket.objects.using(alias)
+            .filter(flight_id=flight_id)
+            .order_by("row", "seat")
+            .values_list("row", "seat")
+        )
+
+    return list(heapq.merge(*scatter_gather(seats)))
+
+
+def merge_sorted(queryset, key, chunk_size: int = 2000):
+    """Lazily merge an ordered queryset evaluated on every order database."""
+    iterators = [
+        queryset.using(alias).iterator(chunk_size=chunk_size)
+        for alias in order_databases()
+    ]
+    if len(iterators) == 1:
+        return iterators[0]
+    return heapq.merge(*iterators, key=key)
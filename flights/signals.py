@@ -0,0 +1,128 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from flights import boards, geo, rollups, route_lookup
+from flights.live import broker, seat_event
+from flights.models import Airport, Flight, Route, Ticket
+
+
+@receiver(post_save, sender=Flight)
+def update_boards_on_flight_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    arguments = (
+        instance.id,
+        instance.route.source_id,
+        instance.route.destination_id,
+        instance.departure_time,
+        instance.arrival_time,
+    )
+    transaction.on_commit(lambda: boards.flight_saved(*arguments))
+
+
+@receiver(post_delete, sender=Flight)
+def update_boards_on_flight_delete(sender, instance, **kwargs):
+    flight_id = instance.id
+    transaction.on_commit(lambda: boards.flight_deleted(flight_id))
+
+
+@receiver(post_save, sender=Route)
+def reset_boards_on_route_save(sender, instance, created=False, raw=False, **kwargs):
+    # Moving a route between airports affects boards of airports we no longer know.
+    if not created and not raw:
+        transaction.on_commit(boards.clear)
+
+
+@receiver(post_save, sender=Ticket)
+def publish_taken_seat(sender, instance, created=False, raw=False, using=None, **kwargs):
+    if not created or raw or not broker.has_subscribers(instance.flight_id):
+        return
+    event = seat_event(instance.flight_id, taken=[(instance.row, instance.seat)])
+    transaction.on_commit(
+        lambda: broker.publish(event["flight"], event), using=using, robust=True
+    )
+
+
+@receiver(post_delete, sender=Ticket)
+def publish_released_seat(sender, instance, using=None, **kwargs):
+    if not broker.has_subscribers(instance.flight_id):
+        return
+    event = seat_event(instance.flight_id, released=[(instance.row, instance.seat)])
+    transaction.on_commit(
+        lambda: broker.publish(event["flight"], event), using=using, robust=True
+    )
+
+
+@receiver(post_save, sender=Airport)
+def update_distances_on_airport_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    arguments = (instance.id, instance.latitude, instance.longitude)
+    transaction.on_commit(lambda: geo.airport_changed(*arguments), robust=True)
+
+
+@receiver(post_delete, sender=Airport)
+def update_distances_on_airport_delete(sender, instance, **kwargs):
+    airport_id = instance.id
+    transaction.on_commit(lambda: geo.airport_changed(airport_id, None, None), robust=True)
+
+
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+@receiver(post_save, sender=Airport)
+@receiver(post_delete, sender=Airport)
+def invalidate_route_lookup(sender, **kwargs):
+    transaction.on_commit(route_lookup.invalidate, robust=True)
+
+
+@receiver(pre_save, sender=Flight)
+def remember_flight_load_key(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding or not rollups.hooks_enabled():
+        return
+    instance._previous_load_key = (
+        Flight.objects.filter(pk=instance.pk)
+        .values_list(
+            "route_id",
+            "departure_time",
+            "airplane_id",
+            F("airplane__rows") * F("airplane__seats_in_row"),
+        )
+        .first()
+    )
+
+
+@receiver(post_save, sender=Flight)
+def update_route_load_on_flight_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw or not rollups.hooks_enabled():
+        return
+    if created:
+        rollups.flight_added(instance)
+    elif getattr(instance, "_previous_load_key", None) is not None:
+        rollups.flight_changed(instance._previous_load_key, instance)
+
+
+@receiver(pre_delete, sender=Flight)
+def remember_flight_sold_seats(sender, instance, **kwargs):
+    if rollups.hooks_enabled():
+        rollups.flight_deleting(instance)
+
+
+@receiver(post_delete, sender=Flight)
+def update_route_load_on_flight_delete(sender, instance, **kwargs):
+    if rollups.hooks_enabled():
+        rollups.flight_removed(instance)
+
+
+@receiver(post_save, sender=Ticket)
+def update_route_load_on_ticket_save(sender, instance, created=False, raw=False, using=None, **kwargs):
+    if created and not raw and rollups.hooks_enabled():
+        rollups.ticket_changed(instance, 1, using)
+
+
+@receiver(post_delete, sender=Ticket)
+def update_route_load_on_ticket_delete(sender, instance, using=None, origin=None, **kwargs):
+    # Tickets deleted with their flight come off the rollup with it.
+    if rollups.hooks_enabled() and not rollups.deleted_with_flight(origin):
+        rollups.ticket_changed(instance, -1, using)
@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from flights.admin import EstimatedCountPaginator
+from flights.models import Flight, Order, Ticket
+from flights.tests.test_flight_api import sample_flight1, sample_flight2
+
+
+class AdminScalabilityTests(TestCase):
+    def setUp(self):
+        self.admin_user = get_user_model().objects.create_superuser(
+            email="admin@admin.com", password="1qazxcde3"
+        )
+        self.client.force_login(self.admin_user)
+        self.flight = sample_flight1()
+        self.order = Order.objects.create(user=self.admin_user)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=self.order)
+
+    def changelist_queries(self, model_name):
+        url = reverse(f"admin:flights_{model_name}_changelist")
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        baseline = {
+            model_name: self.changelist_queries(model_name)
+            for model_name in ("flight", "route", "ticket", "order")
+        }
+
+        other = sample_flight2()
+        order = Order.objects.create(user=self.admin_user)
+        for seat in range(1, 3):
+            Ticket.objects.create(row=1, seat=seat, flight=other, order=order)
+
+        for model_name, queries in baseline.items():
+            self.assertEqual(self.changelist_queries(model_name), queries, model_name)
+
+    def test_change_forms_use_autocomplete(self):
+        for url in (
+            reverse("admin:flights_flight_change", args=[self.flight.id]),
+            reverse("admin:flights_order_change", args=[self.order.id]),
+            reverse("admin:flights_ticket_add"),
+        ):
+            res = self.client.get(url)
+
+            self.assertEqual(res.status_code, 200)
+            self.assertContains(res, "admin-autocomplete")
+
+    def test_route_autocomplete_by_iata_code(self):
+        res = self.client.get(
+            reverse("admin:autocomplete"),
+            {
+                "term": "RTY",
+                "app_label": "flights",
+                "model_name": "flight",
+                "field_name": "route",
+            },
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            [result["id"] for result in res.json()["results"]], [str(self.flight.route_id)]
+        )
+
+    def test_paginator_counts_exactly_outside_postgresql(self):
+        paginator = EstimatedCountPaginator(Flight.objects.order_by("id"), 10)
+
+        self.assertEqual(paginator.count, 1)
@@ -2,7 +2,7 @@ import os
 import tempfile
 from PIL import Image
 from django.urls import reverse
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from rest_framework import status
 from rest_framework.test import APIClient
 from django.contrib.auth import get_user_model
@@ -135,6 +135,12 @@ class AdminAirplaneApiTests(TestCase):
 
 class AirplaneImageUploadTests(TestCase):
     def setUp(self):
+        # Keep uploaded images out of the project's media directory
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        media_override = override_settings(MEDIA_ROOT=media_root.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
         self.client = APIClient()
         self.user = get_user_model().objects.create_superuser(
             "admin@myproject.com", "password"
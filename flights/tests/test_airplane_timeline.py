@@ -0,0 +1,115 @@
+from datetime import date, datetime, timedelta, timezone
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from flights.models import Airplane, AirplaneType, Airport, Crew, Flight, Route
+
+FLIGHT_URL = reverse("flights:flight-list")
+
+
+def timeline_url(airplane_id: int):
+    return reverse("flights:airplane-timeline", args=[airplane_id])
+
+
+def at(hour: int, minute: int = 0, day: int = 1) -> datetime:
+    return datetime(2030, 1, day, hour, minute, tzinfo=timezone.utc)
+
+
+class AirplaneRotationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = get_user_model().objects.create_user(
+            email="admin@admin.com", password="1qazxcde3", is_staff=True
+        )
+        self.client.force_authenticate(self.admin_user)
+
+        source = Airport.objects.create(
+            name="Aberdeen", iata_code="ABZ", closest_big_city="Aberdeen"
+        )
+        destination = Airport.objects.create(
+            name="Valencia", iata_code="VLC", closest_big_city="Valencia"
+        )
+        self.route = Route.objects.create(
+            source=source, destination=destination, distance=500
+        )
+        airplane_type = AirplaneType.objects.create(name="Medium Jets")
+        self.airplane = Airplane.objects.create(
+            name="Airbus A320", rows=30, seats_in_row=6, airplane_type=airplane_type
+        )
+        self.pilot = Crew.objects.create(first_name="Jim", last_name="Beam")
+        self.flight = Flight.objects.create(
+            route=self.route,
+            airplane=self.airplane,
+            departure_time=at(8),
+            arrival_time=at(10),
+        )
+
+    def payload(self, departure: str, arrival: str) -> dict:
+        return {
+            "route": self.route.pk,
+            "airplane": self.airplane.pk,
+            "departure_time": departure,
+            "arrival_time": arrival,
+            "crew": [self.pilot.pk],
+        }
+
+    @override_settings(FLIGHT_MIN_TURNAROUND=timedelta(minutes=45))
+    def test_flight_within_turnaround_rejected(self):
+        res = self.client.post(
+            FLIGHT_URL, self.payload("2030-01-01 10:30:00", "2030-01-01 12:00:00")
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(str(self.flight.id), res.data["airplane"][0])
+
+    @override_settings(FLIGHT_MIN_TURNAROUND=timedelta(minutes=45))
+    def test_flight_after_turnaround_accepted(self):
+        res = self.client.post(
+            FLIGHT_URL, self.payload("2030-01-01 10:45:00", "2030-01-01 12:00:00")
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_timeline(self):
+        Flight.objects.create(
+            route=self.route,
+            airplane=self.airplane,
+            departure_time=at(11),
+            arrival_time=at(14, 30),
+        )
+        Flight.objects.create(
+            route=self.route,
+            airplane=self.airplane,
+            departure_time=at(9, day=2),
+            arrival_time=at(10, day=2),
+        )
+
+        res = self.client.get(
+            timeline_url(self.airplane.id), {"start": "2030-01-01", "end": "2030-01-03"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [flight["ground_time_minutes"] for flight in res.data["flights"]],
+            [None, 60, 1110],
+        )
+        self.assertEqual(
+            [
+                (day["day"], day["flights"], day["block_hours"])
+                for day in res.data["utilization"]
+            ],
+            [("2030-01-01", 2, 5.5), ("2030-01-02", 1, 1.0)],
+        )
+        self.assertEqual(res.data["start"], date(2030, 1, 1))
+
+    def test_timeline_invalid_date(self):
+        res = self.client.get(timeline_url(self.airplane.id), {"start": "01.01.2030"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_timeline_non_numeric_id(self):
+        res = self.client.get(timeline_url("abc"))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,134 @@
+import gzip
+import json
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from flights import archive
+from flights.models import ArchivedOrder, Flight, Order, Ticket
+from flights.sharding import shard_for_user
+from flights.tests.test_flight_api import sample_flight1, sample_flight2
+
+ARCHIVED_ORDERS_URL = reverse("flights:order-archived")
+
+
+class ArchiveFlightsTests(TestCase):
+    def setUp(self):
+        archive_root = tempfile.TemporaryDirectory()
+        self.addCleanup(archive_root.cleanup)
+        self.archive_root = Path(archive_root.name)
+        settings_override = override_settings(FLIGHT_ARCHIVE_ROOT=self.archive_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = get_user_model().objects.create_user(
+            "test@myproject.com",
+            "password",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.departed = sample_flight1()
+        self.upcoming = sample_flight2(
+            departure_time=datetime(2030, 1, 1, 10, tzinfo=timezone.utc),
+            arrival_time=datetime(2030, 1, 1, 12, tzinfo=timezone.utc),
+        )
+        self.old_order = Order.objects.create(user=self.user)
+        Ticket.objects.create(order=self.old_order, flight=self.departed, row=1, seat=1)
+        Ticket.objects.create(order=self.old_order, flight=self.departed, row=1, seat=2)
+        self.mixed_order = Order.objects.create(user=self.user)
+        Ticket.objects.create(order=self.mixed_order, flight=self.departed, row=2, seat=1)
+        Ticket.objects.create(order=self.mixed_order, flight=self.upcoming, row=2, seat=1)
+
+    def test_archive_moves_departed_flights_to_files(self):
+        call_command("archive_flights", before="2025-01-01", stdout=StringIO())
+
+        self.assertFalse(Flight.objects.filter(id=self.departed.id).exists())
+        self.assertTrue(Flight.objects.filter(id=self.upcoming.id).exists())
+        self.assertFalse(Order.objects.filter(id=self.old_order.id).exists())
+        self.assertEqual(
+            list(Ticket.objects.values_list("flight_id", flat=True)), [self.upcoming.id]
+        )
+        self.assertEqual(ArchivedOrder.objects.count(), 2)
+
+        with gzip.open(self.archive_root / "flights-2024-08.jsonl.gz", "rt") as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual(
+            [record["type"] for record in records], ["flight", "order", "order"]
+        )
+
+    def test_archived_orders_read_through(self):
+        call_command("archive_flights", before="2025-01-01", stdout=StringIO())
+
+        res = self.client.get(ARCHIVED_ORDERS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["count"], 2)
+        order = res.data["results"][0]
+        self.assertEqual(order["id"], self.mixed_order.id)
+        self.assertEqual(len(order["tickets"]), 1)
+        self.assertEqual(order["tickets"][0]["flight"]["id"], self.departed.id)
+        self.assertEqual(
+            order["tickets"][0]["flight"]["route"],
+            "GTR (Geneva) Airport to RTY (Washington) Airport",
+        )
+
+    def test_archived_orders_only_for_owner(self):
+        call_command("archive_flights", before="2025-01-01", stdout=StringIO())
+        other = get_user_model().objects.create_user("other@myproject.com", "password")
+        self.client.force_authenticate(other)
+
+        res = self.client.get(ARCHIVED_ORDERS_URL)
+
+        self.assertEqual(res.data["count"], 0)
+
+    def test_rerun_after_failed_delete_does_not_duplicate_records(self):
+        with mock.patch.object(archive, "delete_in_batches", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                call_command("archive_flights", before="2025-01-01", stdout=StringIO())
+        self.assertTrue(Flight.objects.filter(id=self.departed.id).exists())
+
+        call_command("archive_flights", before="2025-01-01", stdout=StringIO())
+
+        self.assertFalse(Flight.objects.filter(id=self.departed.id).exists())
+        self.assertEqual(ArchivedOrder.objects.count(), 2)
+        self.assertEqual(
+            [path.name for path in self.archive_root.iterdir()], ["flights-2024-08.jsonl.gz"]
+        )
+        with gzip.open(self.archive_root / "flights-2024-08.jsonl.gz", "rt") as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual(
+            [record["type"] for record in records], ["flight", "order", "order"]
+        )
+
+    @override_settings(ORDER_SHARDS=["orders_1", "orders_2"])
+    def test_archive_reads_and_deletes_on_every_order_shard(self):
+        shard = shard_for_user(self.user.id)
+        tickets, orders = Ticket.objects.all(), Order.objects.all()
+
+        def on(queryset):
+            # This test database stands in for the user's shard; the other is empty.
+            return lambda alias: queryset.all() if alias in (shard, "default") else queryset.none()
+
+        with mock.patch.object(
+            Ticket.objects, "using", side_effect=on(tickets)
+        ) as ticket_using, mock.patch.object(Order.objects, "using", side_effect=on(orders)):
+            call_command("archive_flights", before="2025-01-01", stdout=StringIO())
+
+        self.assertIn(mock.call("orders_1"), ticket_using.call_args_list)
+        self.assertIn(mock.call("orders_2"), ticket_using.call_args_list)
+        self.assertFalse(Order.objects.filter(id=self.old_order.id).exists())
+        self.assertEqual(Ticket.objects.count(), 1)
+        self.assertEqual(
+            set(ArchivedOrder.objects.values_list("order_id", flat=True)),
+            {self.old_order.id, self.mixed_order.id},
+        )
@@ -0,0 +1,100 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from flights import boards
+from flights.models import Flight
+from flights.tests.test_flight_api import sample_flight1
+
+
+def departures_url(airport_id: int):
+    return reverse("flights:airport-departures", args=[airport_id])
+
+
+def arrivals_url(airport_id: int):
+    return reverse("flights:airport-arrivals", args=[airport_id])
+
+
+class AirportBoardTests(TestCase):
+    def setUp(self):
+        boards.clear()
+        self.addCleanup(boards.clear)
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@myproject.com",
+            "password",
+        )
+        self.client.force_authenticate(self.user)
+        self.now = timezone.now()
+        self.flight = sample_flight1(
+            departure_time=self.now + timedelta(hours=5),
+            arrival_time=self.now + timedelta(hours=8),
+        )
+        self.route = self.flight.route
+
+    def add_flight(self, departure_hours, duration_hours=3):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Flight.objects.create(
+                route=self.route,
+                airplane=self.flight.airplane,
+                departure_time=self.now + timedelta(hours=departure_hours),
+                arrival_time=self.now + timedelta(hours=departure_hours + duration_hours),
+            )
+
+    def test_cold_board_is_read_from_database(self):
+        Flight.objects.create(
+            route=self.route,
+            airplane=self.flight.airplane,
+            departure_time=self.now - timedelta(hours=5),
+            arrival_time=self.now - timedelta(hours=2),
+        )
+        earlier = self.add_flight(2)
+
+        res = self.client.get(departures_url(self.route.source_id))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([flight["id"] for flight in res.data], [earlier.id, self.flight.id])
+        res = self.client.get(arrivals_url(self.route.destination_id), {"limit": 1})
+        self.assertEqual([flight["id"] for flight in res.data], [earlier.id])
+
+    def test_board_is_updated_incrementally(self):
+        boards.upcoming("departures", self.route.source_id, 10)
+        new = self.add_flight(1)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                boards.upcoming("departures", self.route.source_id, 10),
+                [new.id, self.flight.id],
+            )
+
+        new.departure_time = self.now + timedelta(hours=6)
+        new.arrival_time = self.now + timedelta(hours=9)
+        with self.captureOnCommitCallbacks(execute=True):
+            new.save()
+        self.assertEqual(
+            boards.upcoming("departures", self.route.source_id, 10),
+            [self.flight.id, new.id],
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.flight.delete()
+        self.assertEqual(boards.upcoming("departures", self.route.source_id, 10), [new.id])
+
+    @override_settings(FLIGHT_BOARD_TTL=0)
+    def test_expired_board_is_reloaded(self):
+        boards.upcoming("departures", self.route.source_id, 10)
+        Flight.objects.filter(id=self.flight.id).update(
+            departure_time=self.now - timedelta(hours=1)
+        )
+
+        self.assertEqual(boards.upcoming("departures", self.route.source_id, 10), [])
+
+    def test_unknown_airport(self):
+        res = self.client.get(departures_url(0))
+
+        self.assertEqual(res.status_code, 404)
+        self.assertEqual(self.client.get(arrivals_url("abc")).status_code, 404)
@@ -0,0 +1,155 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from flights.booking_queue import book_flight_batch, pending_requests, process_batch, run_worker
+from flights.models import BookingRequest, Order, Ticket
+from flights.tests.test_flight_api import sample_flight1, sample_flight2
+
+ORDER_URL = reverse("flights:order-list")
+
+
+@override_settings(ASYNC_ORDER_INTAKE=True)
+class AsyncOrderIntakeTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@myproject.com",
+            "password",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight1()
+
+    def order(self, *seats, flight=None):
+        flight = flight or self.flight
+        return self.client.post(
+            ORDER_URL,
+            {"tickets": [{"flight": flight.id, "row": row, "seat": seat} for row, seat in seats]},
+            format="json",
+        )
+
+    def test_order_is_queued(self):
+        res = self.order((3, 1))
+
+        self.assertEqual(res.status_code, 202)
+        self.assertEqual(res.data["status"], BookingRequest.Status.PENDING)
+        self.assertEqual(res["Location"], res.data["url"])
+        self.assertFalse(Order.objects.exists())
+
+        status_res = self.client.get(res.data["url"])
+        self.assertEqual(status_res.status_code, 200)
+        self.assertIsNone(status_res.data["order"])
+
+    def test_invalid_order_is_rejected_at_intake(self):
+        res = self.order((999, 1))
+
+        self.assertEqual(res.status_code, 400)
+        self.assertFalse(BookingRequest.objects.exists())
+
+    def test_worker_books_in_arrival_order(self):
+        first = self.order((3, 1)).data
+        second = self.order((3, 1), (3, 2)).data
+        third = self.order((4, 1)).data
+
+        self.assertEqual(process_batch(0, 1), 3)
+
+        first = self.client.get(first["url"]).data
+        second = self.client.get(second["url"]).data
+        third = self.client.get(third["url"]).data
+        self.assertEqual(first["status"], BookingRequest.Status.COMPLETED)
+        self.assertEqual(second["status"], BookingRequest.Status.FAILED)
+        self.assertIn("tickets", second["errors"])
+        self.assertEqual(third["status"], BookingRequest.Status.COMPLETED)
+        self.assertEqual(
+            set(Ticket.objects.values_list("order_id", "row", "seat")),
+            {(first["order"], 3, 1), (third["order"], 4, 1)},
+        )
+
+    def test_requests_are_split_between_workers_by_flight(self):
+        other_flight = sample_flight2()
+        self.order((3, 1))
+        self.order((3, 1), flight=other_flight)
+
+        keys = [
+            {request.flight_key for request in pending_requests(worker, 2, 10)}
+            for worker in range(2)
+        ]
+
+        self.assertEqual(keys[0] | keys[1], {self.flight.id, other_flight.id})
+        self.assertFalse(keys[0] & keys[1])
+
+    def test_status_of_other_users_requests_is_hidden(self):
+        url = self.order((3, 1)).data["url"]
+        other = get_user_model().objects.create_user("other@myproject.com", "password")
+        self.client.force_authenticate(other)
+
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_run_booking_workers_once(self):
+        self.order((3, 1))
+
+        call_command("run_booking_workers", "--once", stdout=StringIO())
+
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertFalse(pending_requests(0, 1, 10))
+
+    def test_broken_request_fails_without_stopping_the_worker(self):
+        broken = BookingRequest.objects.create(
+            user=self.user, flight_key=self.flight.id, tickets=[{"flight": self.flight.id}]
+        )
+        self.order((3, 1))
+
+        with self.assertLogs("flights.booking_queue", "ERROR"):
+            run_worker(0, 1, once=True)
+
+        broken.refresh_from_db()
+        self.assertEqual(broken.status, BookingRequest.Status.FAILED)
+        self.assertIn("KeyError", broken.errors["detail"])
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertFalse(pending_requests(0, 1, 10))
+
+    def test_broken_request_does_not_roll_back_the_batch(self):
+        self.order((3, 1))
+        broken = BookingRequest.objects.create(
+            user=self.user, flight_key=self.flight.id, tickets=[{"flight": self.flight.id}]
+        )
+
+        with self.assertLogs("flights.booking_queue", "ERROR"):
+            book_flight_batch(pending_requests(0, 1, 10))
+
+        booked = BookingRequest.objects.exclude(id=broken.id).get()
+        self.assertEqual(booked.status, BookingRequest.Status.COMPLETED)
+        self.assertEqual(booked.order_id, Order.objects.get().id)
+        broken.refresh_from_db()
+        self.assertEqual(broken.status, BookingRequest.Status.FAILED)
+
+    def test_retry_completes_with_the_order_a_shard_already_committed(self):
+        self.order((3, 1))
+        auto = self.client.post(
+            ORDER_URL, {"flight": self.flight.id, "auto_seats": 2}, format="json"
+        ).data
+        # Orders written by an attempt whose default-database transaction was lost.
+        explicit_order = Order.objects.create(user=self.user)
+        Ticket.objects.create(order=explicit_order, flight=self.flight, row=3, seat=1)
+        auto_order = Order.objects.create(user=self.user)
+        for seat in (1, 2):
+            Ticket.objects.create(order=auto_order, flight=self.flight, row=1, seat=seat)
+
+        # As if the orders lived on a shard rather than the primary.
+        with mock.patch("flights.booking_queue.PRIMARY_DATABASE", "primary"):
+            process_batch(0, 1)
+
+        self.assertEqual(
+            dict(BookingRequest.objects.values_list("order_id", "status")),
+            {
+                explicit_order.id: BookingRequest.Status.COMPLETED,
+                auto_order.id: BookingRequest.Status.COMPLETED,
+            },
+        )
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertEqual(self.client.get(auto["url"]).data["order"], auto_order.id)
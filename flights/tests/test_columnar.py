@@ -0,0 +1,66 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from flights import columnar
+from flights.models import Order, Ticket
+from flights.tests.test_flight_api import sample_flight1, sample_flight2
+
+
+class SnapshotColumnsTests(TestCase):
+    def setUp(self):
+        snapshot_root = tempfile.TemporaryDirectory()
+        self.addCleanup(snapshot_root.cleanup)
+        self.snapshot_root = Path(snapshot_root.name)
+        settings_override = override_settings(COLUMNAR_SNAPSHOT_ROOT=self.snapshot_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        user = get_user_model().objects.create_user("test@myproject.com", "password")
+        order = Order.objects.create(user=user)
+        self.flight = sample_flight1()
+        self.other = sample_flight2()
+        for seat in (1, 2, 3):
+            Ticket.objects.create(order=order, flight=self.flight, row=1, seat=seat)
+        Ticket.objects.create(order=order, flight=self.other, row=4, seat=2)
+
+    def test_snapshot_columns(self):
+        call_command("snapshot_columns", chunk_size=2, stdout=StringIO())
+
+        snapshot = columnar.Snapshot.latest()
+        tickets = snapshot["tickets"]
+        self.assertIsInstance(tickets["seat"], np.memmap)
+        self.assertEqual(tickets["seat"].tolist(), [1, 2, 3, 2])
+        self.assertEqual(
+            tickets["departure_time"][0],
+            np.datetime64(int(self.flight.departure_time.timestamp()), "s"),
+        )
+        self.assertEqual(snapshot["routes"]["distance"].tolist(), [1900, 900])
+
+        route_ids, counts = columnar.tickets_per_route(snapshot)
+        self.assertEqual(route_ids.tolist(), [self.flight.route_id, self.other.route_id])
+        self.assertEqual(counts.tolist(), [3, 1])
+
+    def test_old_snapshots_are_pruned(self):
+        for _ in range(3):
+            call_command("snapshot_columns", keep=2, stdout=StringIO())
+
+        self.assertEqual(len(columnar.snapshot_paths()), 2)
+
+
+class LookupTests(SimpleTestCase):
+    def test_lookup(self):
+        ids = np.array([2, 5, 9])
+        values = np.array([20, 50, 90])
+
+        self.assertEqual(
+            columnar.lookup(np.array([9, 1, 5, 10]), ids, values).tolist(), [90, -1, 50, -1]
+        )
+        self.assertEqual(
+            columnar.lookup(np.array([1]), ids[:0], values[:0]).tolist(), [-1]
+        )
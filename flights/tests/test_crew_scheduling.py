@@ -0,0 +1,195 @@
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from flights.models import Airplane, AirplaneType, Airport, Crew, Flight, Route
+from flights.scheduling import IntervalIndex
+
+FLIGHT_URL = reverse("flights:flight-list")
+CREW_CONFLICTS_URL = reverse("flights:crew-conflicts")
+
+
+def at(hour: int, day: int = 1) -> datetime:
+    return datetime(2030, 1, day, hour, tzinfo=timezone.utc)
+
+
+class IntervalIndexTests(TestCase):
+    def test_overlapping(self):
+        index = IntervalIndex()
+        index.add("crew", at(8), at(10), 1)
+        index.add("crew", at(12), at(14), 2)
+        index.add("crew", at(1), at(23), 3)
+
+        self.assertEqual(index.overlapping("crew", at(10), at(12)), [3])
+        self.assertEqual(sorted(index.overlapping("crew", at(9), at(13))), [1, 2, 3])
+        self.assertEqual(index.overlapping("crew", at(0), at(1)), [])
+        self.assertEqual(index.overlapping("other", at(8), at(10)), [])
+
+    def test_touching_intervals_do_not_overlap(self):
+        index = IntervalIndex()
+        index.add("crew", at(8), at(10), 1)
+
+        self.assertEqual(index.overlapping("crew", at(10), at(11)), [])
+        self.assertEqual(index.overlapping("crew", at(6), at(8)), [])
+
+    def test_margin(self):
+        index = IntervalIndex()
+        index.add("airplane", at(8), at(10), 1)
+
+        self.assertEqual(
+            index.overlapping("airplane", at(10), at(11), margin=timedelta(hours=1)),
+            [1],
+        )
+        self.assertEqual(
+            index.overlapping("airplane", at(11), at(12), margin=timedelta(hours=1)),
+            [],
+        )
+
+
+class AdminCrewSchedulingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = get_user_model().objects.create_user(
+            email="admin@admin.com", password="1qazxcde3", is_staff=True
+        )
+        self.client.force_authenticate(self.admin_user)
+
+        source = Airport.objects.create(
+            name="Aberdeen", iata_code="ABZ", closest_big_city="Aberdeen"
+        )
+        destination = Airport.objects.create(
+            name="Valencia", iata_code="VLC", closest_big_city="Valencia"
+        )
+        self.route = Route.objects.create(
+            source=source, destination=destination, distance=500
+        )
+        airplane_type = AirplaneType.objects.create(name="Medium Jets")
+        self.airplane = Airplane.objects.create(
+            name="Airbus A320", rows=30, seats_in_row=6, airplane_type=airplane_type
+        )
+        self.second_airplane = Airplane.objects.create(
+            name="Airbus A321", rows=30, seats_in_row=6, airplane_type=airplane_type
+        )
+        self.pilot = Crew.objects.create(first_name="Jim", last_name="Beam")
+        self.flight = Flight.objects.create(
+            route=self.route,
+            airplane=self.airplane,
+            departure_time=at(8),
+            arrival_time=at(12),
+        )
+        self.flight.crew.add(self.pilot)
+
+    def payload(self, departure: str, arrival: str) -> dict:
+        return {
+            "route": self.route.pk,
+            "airplane": self.second_airplane.pk,
+            "departure_time": departure,
+            "arrival_time": arrival,
+            "crew": [self.pilot.pk],
+        }
+
+    def test_create_flight_with_busy_crew_rejected(self):
+        res = self.client.post(
+            FLIGHT_URL, self.payload("2030-01-01 10:00:00", "2030-01-01 14:00:00")
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(str(self.flight.id), res.data["crew"][0])
+
+    def test_create_flight_after_crew_is_free(self):
+        res = self.client.post(
+            FLIGHT_URL, self.payload("2030-01-01 12:00:00", "2030-01-01 14:00:00")
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_update_flight_does_not_conflict_with_itself(self):
+        url = reverse("flights:flight-detail", args=[self.flight.id])
+        payload = self.payload("2030-01-01 09:00:00", "2030-01-01 13:00:00")
+        payload["airplane"] = self.airplane.pk
+
+        res = self.client.put(url, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_bulk_create_rejects_conflicts_within_batch(self):
+        payload = [
+            self.payload("2030-01-02 08:00:00", "2030-01-02 12:00:00"),
+            self.payload("2030-01-02 11:00:00", "2030-01-02 13:00:00"),
+        ]
+
+        res = self.client.post(FLIGHT_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Flight.objects.count(), 1)
+
+    def test_bulk_create(self):
+        payload = [
+            self.payload("2030-01-02 08:00:00", "2030-01-02 12:00:00"),
+            self.payload("2030-01-02 13:00:00", "2030-01-02 15:00:00"),
+        ]
+
+        res = self.client.post(FLIGHT_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 2)
+        self.assertEqual(self.pilot.flights.count(), 3)
+
+    def test_list_crew_conflicts(self):
+        overlapping = Flight.objects.create(
+            route=self.route,
+            airplane=self.second_airplane,
+            departure_time=at(11),
+            arrival_time=at(13),
+        )
+        overlapping.crew.add(self.pilot)
+
+        res = self.client.get(CREW_CONFLICTS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            [
+                {
+                    "crew": self.pilot.id,
+                    "crew_name": "Jim Beam",
+                    "flight": overlapping.id,
+                    "conflicts_with": self.flight.id,
+                }
+            ],
+        )
+
+    def test_crew_conflicts_list_every_overlapping_pair(self):
+        third_airplane = Airplane.objects.create(
+            name="Airbus A319", rows=30, seats_in_row=6, airplane_type=self.airplane.airplane_type
+        )
+        # Both fly within self.flight [8-12] and overlap each other.
+        second = Flight.objects.create(
+            route=self.route,
+            airplane=self.second_airplane,
+            departure_time=at(9),
+            arrival_time=at(10),
+        )
+        third = Flight.objects.create(
+            route=self.route,
+            airplane=third_airplane,
+            departure_time=at(9) + timedelta(minutes=30),
+            arrival_time=at(11),
+        )
+        second.crew.add(self.pilot)
+        third.crew.add(self.pilot)
+
+        res = self.client.get(CREW_CONFLICTS_URL)
+
+        self.assertEqual(
+            [(conflict["flight"], conflict["conflicts_with"]) for conflict in res.data],
+            [
+                (second.id, self.flight.id),
+                (third.id, self.flight.id),
+                (third.id, second.id),
+            ],
+        )
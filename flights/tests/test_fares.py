@@ -0,0 +1,107 @@
+from datetime import timedelta
+from io import StringIO
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from flights.fares import quote_fares
+from flights.models import Order, Ticket
+from flights.tests.test_flight_api import sample_flight1, sample_flight2
+
+FLIGHT_URL = reverse("flights:flight-list")
+ORDER_URL = reverse("flights:order-list")
+
+RULES = {
+    "base_fare": 25,
+    "per_km": 0.08,
+    "minimum_fare": 40,
+    "load_factor_threshold": 0.6,
+    "load_factor_surcharge": 0.8,
+    "advance_purchase": [(3, 1.5), (14, 1.25), (30, 1.1)],
+}
+
+
+class QuoteFaresTests(TestCase):
+    def test_rules(self):
+        fares = quote_fares(
+            distance=[1000, 1000, 1000, 1000, 10, 1000],
+            seats_sold=[0, 80, 80, 100, 0, 0],
+            capacity=[100, 100, 100, 100, 100, 100],
+            days_to_departure=[60, 60, 2, 20, 60, -1],
+            rules=RULES,
+        )
+
+        np.testing.assert_array_equal(
+            fares, [105.0, 147.0, 220.5, 207.9, 40.0, np.nan]
+        )
+
+    def test_empty_airplane_capacity(self):
+        fares = quote_fares([1000], [0], [0], [60], rules=RULES)
+
+        self.assertEqual(fares[0], 189.0)
+
+    def test_benchmark_command(self):
+        out = StringIO()
+
+        call_command("benchmark_fares", "--flights", "1000", "--repeat", "2", stdout=out)
+
+        self.assertIn("Priced 1000 flights", out.getvalue())
+
+
+@override_settings(FARE_RULES=RULES)
+class FlightPriceTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@myproject.com",
+            "password",
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_list_is_priced(self):
+        now = timezone.now()
+        soon = sample_flight1(
+            departure_time=now + timedelta(days=1),
+            arrival_time=now + timedelta(days=1, hours=3),
+        )
+        departed = sample_flight2()
+
+        res = self.client.get(FLIGHT_URL)
+        prices = {flight["id"]: flight["price"] for flight in res.data}
+
+        self.assertEqual(prices[departed.id], None)
+        # 1900 km, empty airplane, departing within three days.
+        self.assertEqual(prices[soon.id], round((25 + 0.08 * 1900) * 1.5, 2))
+
+        res = self.client.get(FLIGHT_URL, {"fields": "id,price"})
+        self.assertEqual({flight["id"]: flight["price"] for flight in res.data}, prices)
+
+    def test_order_list_prices_nested_flights_at_once(self):
+        now = timezone.now()
+        flight = sample_flight1(
+            departure_time=now + timedelta(days=1),
+            arrival_time=now + timedelta(days=1, hours=3),
+        )
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(order=order, flight=flight, row=1, seat=1)
+        with CaptureQueriesContext(connection) as one_ticket:
+            self.client.get(ORDER_URL)
+
+        for seat in range(2, 11):
+            Ticket.objects.create(order=order, flight=flight, row=1, seat=seat)
+        with CaptureQueriesContext(connection) as ten_tickets:
+            res = self.client.get(ORDER_URL)
+
+        self.assertEqual(len(ten_tickets), len(one_ticket))
+        nested = [ticket["flight"] for ticket in res.data["results"][0]["tickets"]]
+        self.assertEqual({flight["tickets_available"] for flight in nested}, {490})
+        self.assertEqual(
+            {flight["price"] for flight in nested}, {round((25 + 0.08 * 1900) * 1.5, 2)}
+        )
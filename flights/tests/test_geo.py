@@ -0,0 +1,139 @@
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from flights import geo
+from flights.models import Airport, Route
+from flights.tests.test_replica_routing import other_process, shared_cache
+
+AIRPORT_DISTANCES_URL = reverse("flights:airport-distances")
+ROUTE_URL = reverse("flights:route-list")
+
+
+class GeoTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        geo.reset()
+        self.addCleanup(geo.reset)
+        self.london = self.airport("Heathrow", "LHR", 51.4700, -0.4543)
+        self.new_york = self.airport("John F. Kennedy", "JFK", 40.6413, -73.7781)
+
+    def airport(self, name, iata_code, latitude, longitude):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Airport.objects.create(
+                name=name,
+                closest_big_city=name,
+                iata_code=iata_code,
+                latitude=latitude,
+                longitude=longitude,
+            )
+
+
+class DistanceMatrixTests(GeoTestCase):
+    def test_haversine(self):
+        distance = geo.haversine_km(51.4700, -0.4543, 40.6413, -73.7781)
+
+        self.assertAlmostEqual(float(distance), 5540, delta=5)
+
+    def test_incremental_updates_match_full_build(self):
+        geo.get_matrix()
+        tokyo = self.airport("Haneda", "HND", 35.5494, 139.7798)
+        self.london.latitude, self.london.longitude = 51.1537, -0.1821
+        with self.captureOnCommitCallbacks(execute=True):
+            self.london.save()
+
+        pairs = [
+            (a.id, b.id)
+            for a in (self.london, self.new_york, tokyo)
+            for b in (self.london, self.new_york, tokyo)
+        ]
+        incremental = geo.get_matrix().distances(pairs)
+        np.testing.assert_allclose(incremental, geo.DistanceMatrix.build().distances(pairs), rtol=1e-6)
+
+    def test_removed_airport_has_no_distance(self):
+        geo.get_matrix()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.new_york.delete()
+
+        self.assertEqual(geo.route_distance(self.london.id, self.new_york.id), None)
+
+    def test_other_process_changes_trigger_rebuild(self):
+        matrix = geo.get_matrix()
+        cache.set("airport-distance-matrix-version", "changed elsewhere")
+
+        self.assertIsNot(geo.get_matrix(), matrix)
+
+    def test_change_in_other_worker_process_triggers_rebuild(self):
+        shared_cache(self)
+        with other_process() as call:
+            matrix = geo.get_matrix()
+
+            call(geo.airport_changed, self.new_york.id, 40.0, -74.0)
+
+            self.assertIsNot(geo.get_matrix(), matrix)
+
+    def test_change_in_other_worker_process_rebuilds_tree(self):
+        shared_cache(self)
+        with other_process() as call:
+            geo.get_tree()
+            # The row is written here; the other process only announces the change.
+            Airport.objects.filter(id=self.new_york.id).update(latitude=48.85, longitude=2.35)
+
+            call(geo.airport_changed, self.new_york.id, 48.85, 2.35)
+
+            self.assertEqual(
+                [airport_id for airport_id, _ in geo.nearby_airports(48.85, 2.35, radius_km=10)],
+                [self.new_york.id],
+            )
+
+
+class RouteDistanceTests(GeoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            email="admin@admin.com", password="1qazxcde3", is_staff=True
+        )
+        self.client.force_authenticate(self.admin)
+
+    def test_route_distance_is_filled_in(self):
+        res = self.client.post(
+            ROUTE_URL, {"source": self.london.id, "destination": self.new_york.id}
+        )
+
+        self.assertEqual(res.status_code, 201)
+        self.assertAlmostEqual(res.data["distance"], 5540, delta=5)
+        route = Route.objects.create(source=self.new_york, destination=self.london)
+        self.assertEqual(route.distance, res.data["distance"])
+
+    def test_route_shorter_than_great_circle_is_rejected(self):
+        res = self.client.post(
+            ROUTE_URL,
+            {"source": self.london.id, "destination": self.new_york.id, "distance": 900},
+        )
+
+        self.assertEqual(res.status_code, 400)
+
+    def test_distance_required_without_coordinates(self):
+        bare = Airport.objects.create(name="Nowhere", closest_big_city="Nowhere")
+
+        res = self.client.post(ROUTE_URL, {"source": self.london.id, "destination": bare.id})
+
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("distance", res.data)
+
+    def test_distances_endpoint(self):
+        res = self.client.get(
+            AIRPORT_DISTANCES_URL,
+            {"pairs": f"{self.london.id}-{self.new_york.id},{self.london.id}-0"},
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertAlmostEqual(res.data[0]["distance"], 5540, delta=5)
+        self.assertEqual(res.data[1], {"source": self.london.id, "destination": 0, "distance": None})
+        self.assertEqual(
+            self.client.get(AIRPORT_DISTANCES_URL, {"pairs": "1-"}).status_code, 400
+        )
@@ -0,0 +1,108 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from flights.idempotency import request_fingerprint
+from flights.models import IdempotencyKey, Order
+from flights.tests.test_flight_api import sample_flight1
+
+ORDER_URL = reverse("flights:order-list")
+
+
+class IdempotentOrderTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@myproject.com",
+            "password",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight1()
+        self.payload = {"tickets": [{"flight": self.flight.id, "row": 3, "seat": 1}]}
+
+    def post(self, payload, key="order-1"):
+        return self.client.post(
+            ORDER_URL, payload, format="json", HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_retry_replays_first_response(self):
+        first = self.post(self.payload)
+        second = self.post(self.payload)
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second.data["id"], first.data["id"])
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_key_reused_with_other_payload(self):
+        self.post(self.payload)
+        payload = {"tickets": [{"flight": self.flight.id, "row": 4, "seat": 1}]}
+
+        res = self.post(payload)
+
+        self.assertEqual(res.status_code, 422)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_key_in_progress(self):
+        IdempotencyKey.objects.create(
+            user=self.user, key="order-1", request_hash=request_fingerprint(self.payload)
+        )
+
+        res = self.post(self.payload)
+
+        self.assertEqual(res.status_code, 409)
+        self.assertFalse(Order.objects.exists())
+
+    def test_stale_claim_is_taken_over_by_retry(self):
+        IdempotencyKey.objects.create(
+            user=self.user,
+            key="order-1",
+            request_hash=request_fingerprint(self.payload),
+            claimed_at=timezone.now() - timedelta(minutes=10),
+        )
+
+        res = self.post(self.payload)
+
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(IdempotencyKey.objects.get().order_id, res.data["id"])
+        self.assertEqual(self.post(self.payload)["Idempotent-Replayed"], "true")
+
+    def test_stale_claim_is_not_taken_over_by_other_request(self):
+        IdempotencyKey.objects.create(
+            user=self.user,
+            key="order-1",
+            request_hash=request_fingerprint({"tickets": []}),
+            claimed_at=timezone.now() - timedelta(minutes=10),
+        )
+
+        self.assertEqual(self.post(self.payload).status_code, 422)
+
+    def test_failed_request_releases_key(self):
+        payload = {"tickets": [{"flight": self.flight.id, "row": 999, "seat": 1}]}
+
+        res = self.post(payload)
+
+        self.assertEqual(res.status_code, 400)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_without_key_orders_are_not_deduplicated(self):
+        self.client.post(ORDER_URL, self.payload, format="json")
+        self.payload["tickets"][0]["seat"] = 2
+        self.client.post(ORDER_URL, self.payload, format="json")
+
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_expire_idempotency_keys(self):
+        self.post(self.payload)
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=2))
+
+        call_command("expire_idempotency_keys", stdout=StringIO())
+
+        self.assertFalse(IdempotencyKey.objects.exists())
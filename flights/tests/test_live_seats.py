@@ -0,0 +1,320 @@
+import asyncio
+import json
+import os
+import threading
+from unittest import mock, skipUnless
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from flights.live import (
+    LocalChannel,
+    RedisChannel,
+    SeatBroker,
+    broker,
+    seat_websocket,
+    stream_ticket,
+    user_for_ticket,
+)
+from flights import route_lookup
+from flights.models import Airport, Order, Route, Ticket
+from flights.tests.test_flight_api import sample_flight1
+
+
+def stream_url(flight_id: int):
+    return reverse("flights:flight-seat-stream", args=[flight_id])
+
+
+class BrokenChannel:
+    shared = True
+
+    def start(self, deliver, reset):
+        pass
+
+    def publish(self, flight_id, event):
+        raise ConnectionError("Redis is down")
+
+
+class FakePubSub:
+    """Replays one batch of messages per connection; the last one stays open until ``stop``."""
+
+    def __init__(self, batches, stop):
+        self.batches = batches
+        self.stop = stop
+
+    def subscribe(self, channel):
+        pass
+
+    def listen(self):
+        yield from self.batches.pop(0)
+        if not self.batches:
+            self.stop.wait()
+            raise SystemExit
+
+
+class BusChannel:
+    """Stands in for Redis: what any broker on the bus publishes reaches every broker."""
+
+    shared = True
+
+    def __init__(self, listeners: list):
+        self.listeners = listeners
+
+    def start(self, deliver, reset):
+        self.listeners.append(deliver)
+
+    def publish(self, flight_id, event):
+        for deliver in self.listeners:
+            deliver(flight_id, event)
+
+
+class LiveSeatTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@myproject.com",
+            "password",
+        )
+        self.flight = sample_flight1()
+        self.order = Order.objects.create(user=self.user)
+
+    def test_ticket_changes_reach_every_subscriber(self):
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+
+        async def subscribe():
+            return broker.subscribe(self.flight.id)
+
+        subscriptions = [loop.run_until_complete(subscribe()) for _ in range(3)]
+        for subscription in subscriptions:
+            self.addCleanup(broker.unsubscribe, subscription)
+
+        # The insert and the route load rollup; publishing adds no queries.
+        with self.assertNumQueries(2), self.captureOnCommitCallbacks(execute=True):
+            ticket = Ticket.objects.create(order=self.order, flight=self.flight, row=2, seat=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket.delete()
+
+        for subscription in subscriptions:
+            taken = loop.run_until_complete(subscription.queue.get())
+            released = loop.run_until_complete(subscription.queue.get())
+            self.assertEqual(taken["taken"], [{"row": 2, "seat": 1}])
+            self.assertEqual(released["released"], [{"row": 2, "seat": 1}])
+
+    def test_failed_publish_does_not_fail_a_committed_booking(self):
+        with mock.patch.object(broker, "_channel", BrokenChannel()), self.assertLogs(
+            level="ERROR"
+        ), self.captureOnCommitCallbacks(execute=True):
+            ticket = Ticket.objects.create(order=self.order, flight=self.flight, row=2, seat=1)
+
+        self.assertTrue(Ticket.objects.filter(id=ticket.id).exists())
+
+    def test_failed_cache_invalidation_does_not_fail_a_committed_route(self):
+        source = Airport.objects.create(name="Lyon", iata_code="LYS", closest_big_city="Lyon")
+        def invalidate():
+            raise ConnectionError("Redis is down")
+
+        with mock.patch.object(route_lookup, "invalidate", invalidate), self.assertLogs(level="ERROR"), self.captureOnCommitCallbacks(execute=True):
+            route = Route.objects.create(
+                source=source, destination=self.flight.route.source, distance=500
+            )
+
+        self.assertTrue(Route.objects.filter(id=route.id).exists())
+
+    def test_nothing_is_published_without_subscribers(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            Ticket.objects.create(order=self.order, flight=self.flight, row=2, seat=1)
+
+        self.assertEqual(callbacks, [])
+
+    async def test_stream_sends_snapshot_then_deltas(self):
+        await sync_to_async(Ticket.objects.create)(
+            order=self.order, flight=self.flight, row=1, seat=1
+        )
+        ticket = stream_ticket(self.user, self.flight.id)
+
+        response = await self.async_client.get(
+            stream_url(self.flight.id), {"ticket": ticket}
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = aiter(response.streaming_content)
+
+        snapshot = (await anext(events)).decode()
+        self.assertTrue(snapshot.startswith("event: snapshot\n"))
+        data = json.loads(snapshot.split("data: ")[1])
+        self.assertEqual(data["taken_places"], [{"row": 1, "seat": 1}])
+        self.assertEqual(data["tickets_available"], self.flight.airplane.capacity - 1)
+
+        broker.publish(self.flight.id, {"flight": self.flight.id, "taken": [], "released": []})
+        self.assertTrue((await anext(events)).decode().startswith("event: seats\n"))
+
+    async def test_stream_requires_authentication(self):
+        response = await self.async_client.get(stream_url(self.flight.id))
+
+        self.assertEqual(response.status_code, 401)
+
+    async def test_stream_rejects_ticket_of_other_flight(self):
+        ticket = stream_ticket(self.user, self.flight.id + 1)
+
+        response = await self.async_client.get(stream_url(self.flight.id), {"ticket": ticket})
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_stream_is_refused_under_wsgi(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(stream_url(self.flight.id))
+
+        self.assertEqual(response.status_code, 501)
+
+    def test_ticket_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        res = client.post(reverse("flights:flight-seat-stream-ticket", args=[self.flight.id]))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(user_for_ticket(res.data["ticket"], self.flight.id), self.user)
+        self.assertEqual(
+            APIClient().post(
+                reverse("flights:flight-seat-stream-ticket", args=[self.flight.id])
+            ).status_code,
+            401,
+        )
+        self.assertEqual(
+            client.post(reverse("flights:flight-seat-stream-ticket", args=["abc"])).status_code,
+            404,
+        )
+
+    def test_expired_ticket(self):
+        ticket = stream_ticket(self.user, self.flight.id)
+
+        with mock.patch("django.core.signing.time.time", return_value=10**10):
+            self.assertIsNone(user_for_ticket(ticket, self.flight.id))
+        self.assertIsNone(user_for_ticket(ticket + "x", self.flight.id))
+
+    async def test_websocket_feed(self):
+        ticket = stream_ticket(self.user, self.flight.id)
+        incoming = asyncio.Queue()
+        sent = asyncio.Queue()
+        scope = {
+            "type": "websocket",
+            "path": f"/ws/flights/{self.flight.id}/seats/",
+            "query_string": f"ticket={ticket}".encode(),
+        }
+        await incoming.put({"type": "websocket.connect"})
+        connection = asyncio.ensure_future(seat_websocket(scope, incoming.get, sent.put))
+
+        self.assertEqual((await sent.get())["type"], "websocket.accept")
+        snapshot = json.loads((await sent.get())["text"])["snapshot"]
+        self.assertEqual(snapshot["flight"], self.flight.id)
+
+        broker.publish(self.flight.id, {"flight": self.flight.id, "taken": [], "released": []})
+        self.assertIn("seats", json.loads((await sent.get())["text"]))
+
+        await incoming.put({"type": "websocket.disconnect"})
+        await connection
+        self.assertFalse(broker.has_subscribers(self.flight.id))
+
+    async def test_websocket_requires_ticket(self):
+        incoming = asyncio.Queue()
+        sent = asyncio.Queue()
+        await incoming.put({"type": "websocket.connect"})
+
+        await seat_websocket(
+            {"type": "websocket", "path": f"/ws/flights/{self.flight.id}/seats/"},
+            incoming.get,
+            sent.put,
+        )
+
+        self.assertEqual(await sent.get(), {"type": "websocket.close", "code": 4401})
+
+
+class SeatBrokerChannelTests(SimpleTestCase):
+    def test_events_published_by_one_process_reach_subscribers_of_another(self):
+        bus = []
+        web_worker, booking_worker = SeatBroker(BusChannel(bus)), SeatBroker(BusChannel(bus))
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+
+        async def subscribe():
+            return web_worker.subscribe(7)
+
+        subscription = loop.run_until_complete(subscribe())
+        self.addCleanup(web_worker.unsubscribe, subscription)
+        self.assertTrue(booking_worker.has_subscribers(7))
+
+        booking_worker.publish(7, {"flight": 7, "taken": [], "released": []})
+
+        self.assertEqual(loop.run_until_complete(subscription.queue.get())["flight"], 7)
+
+    def test_reset_ends_subscriptions(self):
+        process_broker = SeatBroker(LocalChannel())
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+
+        async def subscribe():
+            return process_broker.subscribe(7)
+
+        subscription = loop.run_until_complete(subscribe())
+        self.assertFalse(process_broker.has_subscribers(8))
+
+        process_broker.drop_all()
+
+        self.assertIsNone(loop.run_until_complete(subscription.queue.get()))
+
+
+class RedisChannelListenerTests(SimpleTestCase):
+    def test_listener_survives_bad_messages_and_failing_subscribers(self):
+        stop = threading.Event()
+        self.addCleanup(stop.set)
+        good = {"data": json.dumps({"flight": 7, "event": {"flight": 7}})}
+        batches = [[{"data": b"not json"}], [{"data": b"{}"}], [good], [good]]
+        channel = RedisChannel.__new__(RedisChannel)
+        channel._client = mock.Mock()
+        channel._client.pubsub.side_effect = lambda **kwargs: FakePubSub(batches, stop)
+        delivered, resets = [], []
+        done = threading.Event()
+
+        def deliver(flight_id, event):
+            if not delivered:
+                delivered.append(None)
+                raise RuntimeError("subscriber failed")
+            delivered.append(event)
+            done.set()
+
+        with mock.patch("flights.live.LIVE_RECONNECT_SECONDS", 0), self.assertLogs(
+            "flights.live", "ERROR"
+        ) as logs:
+            channel.start(deliver, lambda: resets.append(None))
+            self.assertTrue(done.wait(5))
+
+        self.assertEqual(delivered, [None, {"flight": 7}])
+        self.assertEqual(len(logs.records), 3)
+        self.assertEqual(len(resets), 3)
+
+
+@skipUnless(os.getenv("REDIS_URL"), "needs a Redis server in REDIS_URL")
+class RedisChannelTests(SimpleTestCase):
+    def test_publish_reaches_listener(self):
+        received = asyncio.Queue()
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        listener = RedisChannel(os.environ["REDIS_URL"])
+        publisher = RedisChannel(os.environ["REDIS_URL"])
+        listener.start(
+            lambda flight_id, event: loop.call_soon_threadsafe(received.put_nowait, event),
+            lambda: None,
+        )
+
+        async def first_event():
+            while received.empty():
+                publisher.publish(7, {"flight": 7})
+                await asyncio.sleep(0.05)
+            return await received.get()
+
+        self.assertEqual(
+            loop.run_until_complete(asyncio.wait_for(first_event(), 5)), {"flight": 7}
+        )
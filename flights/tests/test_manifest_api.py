@@ -0,0 +1,96 @@
+import csv
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from flights.models import Order, Ticket
+from flights.tests.test_flight_api import sample_flight1
+
+
+def manifest_url(flight_id: int):
+    return reverse("flights:flight-manifest", args=[flight_id])
+
+
+def read_stream(response) -> str:
+    return b"".join(response.streaming_content).decode()
+
+
+class AuthenticatedManifestApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@myproject.com",
+            "password",
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_manifest_forbidden(self):
+        flight = sample_flight1()
+        res = self.client.get(manifest_url(flight.id))
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class AdminManifestApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = get_user_model().objects.create_user(
+            email="admin@admin.com", password="1qazxcde3", is_staff=True
+        )
+        self.client.force_authenticate(self.admin_user)
+
+        self.flight = sample_flight1()
+        self.passenger = get_user_model().objects.create_user(
+            email="passenger@myproject.com",
+            password="password",
+            first_name="Anna",
+            last_name="Shevchenko",
+        )
+        order = Order.objects.create(user=self.passenger)
+        Ticket.objects.create(order=order, flight=self.flight, row=10, seat=2)
+        Ticket.objects.create(order=order, flight=self.flight, row=2, seat=1)
+        Ticket.objects.create(order=order, flight=self.flight, row=10, seat=1)
+
+    def test_manifest_json_sorted_by_row_and_seat(self):
+        res = self.client.get(manifest_url(self.flight.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        data = json.loads(read_stream(res))
+        self.assertEqual(data["flight"], self.flight.id)
+        self.assertEqual(
+            [(p["row"], p["seat"]) for p in data["passengers"]],
+            [(2, 1), (10, 1), (10, 2)],
+        )
+        self.assertEqual(data["passengers"][0]["email"], self.passenger.email)
+        self.assertEqual(data["passengers"][0]["last_name"], "Shevchenko")
+
+    def test_manifest_csv(self):
+        res = self.client.get(manifest_url(self.flight.id), {"output": "csv"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "text/csv")
+        rows = list(csv.reader(io.StringIO(read_stream(res))))
+        self.assertEqual(rows[0][:2], ["row", "seat"])
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[1][:2], ["2", "1"])
+
+    def test_manifest_single_query(self):
+        with self.assertNumQueries(2):
+            res = self.client.get(manifest_url(self.flight.id))
+            read_stream(res)
+
+    def test_manifest_unknown_output(self):
+        res = self.client.get(manifest_url(self.flight.id), {"output": "xml"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_manifest_missing_flight(self):
+        res = self.client.get(manifest_url(self.flight.id + 100))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_manifest_non_numeric_id(self):
+        res = self.client.get(manifest_url("abc"))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from flights.models import Order, Ticket
+from flights.tests.test_flight_api import (
+    detail_url,
+    sample_flight1,
+    sample_flight2,
+    sample_flight3,
+)
+
+FLIGHT_URL = reverse("flights:flight-list")
+AIRPORT_URL = reverse("flights:airport-list")
+
+
+class MultiGetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@myproject.com",
+            "password",
+        )
+        self.client.force_authenticate(self.user)
+        self.flights = [sample_flight1(), sample_flight2(), sample_flight3()]
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(order=order, flight=self.flights[0], row=1, seat=1)
+
+    def test_flights_in_requested_order_like_retrieve(self):
+        first, second, third = self.flights
+
+        with self.assertNumQueries(3):
+            res = self.client.get(FLIGHT_URL, {"ids": f"{third.id},{first.id},{third.id}"})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            res.data,
+            [
+                self.client.get(detail_url(third.id)).data,
+                self.client.get(detail_url(first.id)).data,
+            ],
+        )
+
+    def test_missing_ids_are_skipped(self):
+        res = self.client.get(FLIGHT_URL, {"ids": f"{self.flights[1].id},0"})
+
+        self.assertEqual([flight["id"] for flight in res.data], [self.flights[1].id])
+
+    def test_invalid_ids(self):
+        res = self.client.get(FLIGHT_URL, {"ids": "1,a"})
+
+        self.assertEqual(res.status_code, 400)
+
+    def test_ids_are_capped(self):
+        ids = ",".join(str(pk) for pk in range(1, 102))
+
+        res = self.client.get(FLIGHT_URL, {"ids": ids})
+
+        self.assertEqual(res.status_code, 400)
+
+    def test_airports(self):
+        airports = self.flights[0].route
+
+        res = self.client.get(
+            AIRPORT_URL,
+            {"ids": f"{airports.destination_id},{airports.source_id}"},
+        )
+
+        self.assertEqual(
+            [airport["name"] for airport in res.data], ["Washington", "Geneva"]
+        )
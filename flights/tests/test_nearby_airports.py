@@ -0,0 +1,116 @@
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from flights import geo
+from flights.models import Airport
+from flights.tests.test_flight_api import sample_flight1
+
+NEARBY_URL = reverse("flights:airport-nearby")
+FLIGHT_URL = reverse("flights:flight-list")
+
+
+class AirportTreeTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.latitudes = np.degrees(np.arcsin(rng.uniform(-1, 1, 2000)))
+        self.longitudes = rng.uniform(-180, 180, 2000)
+        self.tree = geo.AirportTree(
+            range(2000), geo.unit_vectors(self.latitudes, self.longitudes)
+        )
+
+    def brute_force(self, latitude, longitude):
+        distances = geo.haversine_km(latitude, longitude, self.latitudes, self.longitudes)
+        return distances, np.argsort(distances, kind="stable")
+
+    def test_radius_query_matches_brute_force(self):
+        for latitude, longitude in [(48.85, 2.35), (-33.9, 151.2), (89.9, 0), (0, 179.9)]:
+            distances, _ = self.brute_force(latitude, longitude)
+            found = self.tree.query(latitude, longitude, radius_km=800)
+
+            self.assertEqual(
+                {airport_id for airport_id, _ in found},
+                set(np.flatnonzero(distances <= 800).tolist()),
+            )
+            self.assertEqual([km for _, km in found], sorted(km for _, km in found))
+
+    def test_nearest_matches_brute_force(self):
+        distances, order = self.brute_force(10, 20)
+
+        found = self.tree.query(10, 20, k=5)
+
+        self.assertEqual([airport_id for airport_id, _ in found], order[:5].tolist())
+        np.testing.assert_allclose([km for _, km in found], distances[order[:5]], atol=0.1)
+
+    def test_empty_tree(self):
+        self.assertEqual(geo.AirportTree([], []).query(0, 0, radius_km=100), [])
+
+
+class NearbyAirportsApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        geo.reset()
+        self.addCleanup(geo.reset)
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@myproject.com",
+            "password",
+        )
+        self.client.force_authenticate(self.user)
+
+    def airport(self, name, iata_code, latitude, longitude):
+        return Airport.objects.create(
+            name=name,
+            closest_big_city=name,
+            iata_code=iata_code,
+            latitude=latitude,
+            longitude=longitude,
+        )
+
+    def test_nearby(self):
+        self.airport("Geneva", "GVA", 46.2381, 6.1089)
+        self.airport("Zurich", "ZRH", 47.4647, 8.5492)
+        self.airport("Lyon", "LYS", 45.7256, 5.0811)
+
+        res = self.client.get(NEARBY_URL, {"lat": 46.2, "lon": 6.15, "radius": 150})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([airport["iata_code"] for airport in res.data], ["GVA", "LYS"])
+        self.assertLess(res.data[0]["distance"], 10)
+
+        res = self.client.get(NEARBY_URL, {"lat": 46.2, "lon": 6.15, "radius": 1000, "k": 1})
+        self.assertEqual([airport["iata_code"] for airport in res.data], ["GVA"])
+
+    def test_nearby_requires_location(self):
+        self.assertEqual(self.client.get(NEARBY_URL, {"lat": 46.2}).status_code, 400)
+        self.assertEqual(
+            self.client.get(NEARBY_URL, {"lat": 146.2, "lon": 0}).status_code, 400
+        )
+
+    def test_flights_from_nearby_airports(self):
+        flight = sample_flight1()
+        source = flight.route.source
+        source.latitude, source.longitude = 46.2381, 6.1089
+        source.save()
+        lyon = self.airport("Lyon", "LYS", 45.7256, 5.0811)
+        zurich = self.airport("Zurich", "ZRH", 47.4647, 8.5492)
+
+        res = self.client.get(FLIGHT_URL, {"source_near": lyon.id, "near_radius": 150})
+
+        self.assertEqual([item["id"] for item in res.data], [flight.id])
+        res = self.client.get(FLIGHT_URL, {"source_near": zurich.id, "near_radius": 150})
+        self.assertEqual(res.data, [])
+
+    def test_flights_near_filters_must_be_numbers(self):
+        for params in (
+            {"source_near": "lyon"},
+            {"destination_near": "1.5"},
+            {"source_near": 1, "near_radius": "far"},
+            {"source_near": 1, "near_radius": -1},
+            {"source_near": 1, "near_radius": "nan"},
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(FLIGHT_URL, params).status_code, 400)
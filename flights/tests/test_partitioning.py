@@ -0,0 +1,192 @@
+from datetime import date, datetime, timedelta
+from unittest import mock, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from flights import rollups
+from flights.models import Flight, Order, Ticket
+from flights.partitioning import (
+    add_months,
+    conversion_sql,
+    convert_to_partitioned,
+    create_partition_sql,
+    create_partitions,
+    list_partitions,
+    partition_month,
+    partition_name,
+)
+from flights.tests.test_flight_api import sample_flight1
+
+
+class PartitionNamingTests(TestCase):
+    def test_add_months(self):
+        self.assertEqual(add_months(date(2026, 11, 1), 1), date(2026, 12, 1))
+        self.assertEqual(add_months(date(2026, 12, 1), 1), date(2027, 1, 1))
+        self.assertEqual(add_months(date(2026, 1, 1), -1), date(2025, 12, 1))
+
+    def test_partition_name_round_trip(self):
+        name = partition_name("flights_flight", date(2026, 3, 1))
+
+        self.assertEqual(name, "flights_flight_p2026_03")
+        self.assertEqual(partition_month("flights_flight", name), date(2026, 3, 1))
+        self.assertIsNone(partition_month("flights_flight", "flights_flight_default"))
+
+    def test_create_partition_sql(self):
+        self.assertEqual(
+            create_partition_sql("flights_ticket", date(2026, 12, 1)),
+            'CREATE TABLE IF NOT EXISTS "flights_ticket_p2026_12" '
+            'PARTITION OF "flights_ticket" '
+            "FOR VALUES FROM ('2026-12-01 00:00:00+00') TO ('2027-01-01 00:00:00+00')",
+        )
+
+    def test_ticket_conversion_keeps_seat_uniqueness_per_flight(self):
+        statements = conversion_sql(Ticket, [date(2026, 12, 1)])
+
+        self.assertIn(
+            'ALTER TABLE "flights_ticket" ADD UNIQUE '
+            '("flight_id", "row", "seat", "departure_time")',
+            statements,
+        )
+        self.assertTrue(
+            any('REFERENCES "flights_flight" ("id", "departure_time")' in s for s in statements)
+        )
+
+
+class TicketPartitionKeyTests(TestCase):
+    def test_ticket_follows_flight_departure_time(self):
+        flight = sample_flight1()
+        user = get_user_model().objects.create_user("test@myproject.com", "password")
+        order = Order.objects.create(user=user)
+        ticket = Ticket.objects.create(order=order, flight=flight, row=1, seat=1)
+        self.assertEqual(ticket.departure_time, flight.departure_time)
+
+        flight.departure_time += timedelta(hours=2)
+        flight.arrival_time += timedelta(hours=2)
+        flight.save()
+
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.departure_time, flight.departure_time)
+
+    @override_settings(ORDER_SHARDS=["orders_1", "orders_2"])
+    def test_tickets_on_every_order_shard_follow_the_flight(self):
+        flight = sample_flight1()
+        flight.departure_time += timedelta(hours=2)
+        flight.arrival_time += timedelta(hours=2)
+
+        # Route load rollups also read the shards; leave them out of this test.
+        with rollups.suspended(), mock.patch.object(
+            Ticket.objects, "using", return_value=Ticket.objects.all()
+        ) as using:
+            flight.save()
+
+        self.assertEqual(
+            [call.args[0] for call in using.call_args_list], ["orders_1", "orders_2"]
+        )
+
+
+class PartitionCommandTests(TestCase):
+    def test_disabled_by_default(self):
+        with self.assertRaisesMessage(CommandError, "FLIGHT_PARTITIONING"):
+            call_command("partition_tables")
+
+    @override_settings(FLIGHT_PARTITIONING=True)
+    def test_requires_postgresql(self):
+        with self.assertRaisesMessage(CommandError, "PostgreSQL"):
+            call_command("partition_tables")
+
+
+class RecordingCursor:
+    """Answers the partition listing and records every other statement."""
+
+    def __init__(self, partitions):
+        self.partitions = partitions
+        self.statements = []
+        self.result = []
+
+    def execute(self, sql, params=None):
+        if "pg_inherits" in sql:
+            self.result = [(name,) for name in self.partitions.get(params[0], [])]
+        else:
+            self.statements.append(sql)
+
+    def fetchall(self):
+        return self.result
+
+
+class CreatePartitionsTests(TestCase):
+    def test_rows_in_default_partition_are_moved_to_the_new_partition(self):
+        cursor = RecordingCursor(
+            {
+                "flights_flight": ["flights_flight_default"],
+                "flights_ticket": ["flights_ticket_default"],
+            }
+        )
+
+        created = create_partitions(cursor, date(2026, 12, 1), 1)
+
+        self.assertEqual(created, ["flights_flight_p2026_12", "flights_ticket_p2026_12"])
+        order = [
+            next(
+                index
+                for index, statement in enumerate(cursor.statements)
+                if statement.startswith(prefix)
+            )
+            for prefix in (
+                'WITH moved AS (DELETE FROM "flights_ticket_default"',
+                'WITH moved AS (DELETE FROM "flights_flight_default"',
+                'CREATE TABLE IF NOT EXISTS "flights_flight_p2026_12"',
+                'CREATE TABLE IF NOT EXISTS "flights_ticket_p2026_12"',
+                'INSERT INTO "flights_flight" SELECT * FROM "flights_flight_p2026_12_parked"',
+                'INSERT INTO "flights_ticket" SELECT * FROM "flights_ticket_p2026_12_parked"',
+            )
+        ]
+        self.assertEqual(order, sorted(order))
+
+    def test_existing_partitions_are_left_alone(self):
+        cursor = RecordingCursor(
+            {
+                "flights_flight": ["flights_flight_default", "flights_flight_p2026_12"],
+                "flights_ticket": ["flights_ticket_default", "flights_ticket_p2026_12"],
+            }
+        )
+
+        self.assertEqual(create_partitions(cursor, date(2026, 12, 1), 1), [])
+        self.assertEqual(cursor.statements, [])
+
+
+@skipUnless(connection.vendor == "postgresql", "partitioning requires PostgreSQL")
+@override_settings(FLIGHT_PARTITIONING=True)
+class PostgresPartitioningTests(TransactionTestCase):
+    def test_create_partitions_after_rows_landed_in_default(self):
+        month = timezone.now().date().replace(day=1)
+        far_month = add_months(month, 6)
+        departure = timezone.make_aware(
+            datetime(far_month.year, far_month.month, 10, 12)
+        )
+        with transaction.atomic(), connection.cursor() as cursor:
+            convert_to_partitioned(cursor)
+            create_partitions(cursor, month, 1)
+        flight = sample_flight1(
+            departure_time=departure, arrival_time=departure + timedelta(hours=3)
+        )
+        user = get_user_model().objects.create_user("test@myproject.com", "password")
+        Ticket.objects.create(order=Order.objects.create(user=user), flight=flight, row=1, seat=1)
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            create_partitions(cursor, far_month, 1)
+            self.assertIn(
+                partition_name("flights_flight", far_month),
+                list_partitions(cursor, "flights_flight"),
+            )
+            for table in ("flights_flight", "flights_ticket"):
+                cursor.execute(f'SELECT COUNT(*) FROM "{table}_default"')
+                self.assertEqual(cursor.fetchone()[0], 0)
+                cursor.execute(f'SELECT COUNT(*) FROM "{partition_name(table, far_month)}"')
+                self.assertEqual(cursor.fetchone()[0], 1)
+
+        self.assertEqual(Flight.objects.get().tickets.count(), 1)
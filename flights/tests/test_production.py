@@ -0,0 +1,45 @@
+import importlib
+import os
+import runpy
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from Airport_API_Service import schema
+from Airport_API_Service.warmup import warm_up
+
+
+class ProductionModeTests(TestCase):
+    def test_production_settings_drop_debug_tooling(self):
+        production = importlib.import_module("Airport_API_Service.settings_production")
+
+        self.assertFalse(production.DEBUG)
+        self.assertNotIn("debug_toolbar", production.INSTALLED_APPS)
+        self.assertFalse(
+            any(middleware.startswith("debug_toolbar.") for middleware in production.MIDDLEWARE)
+        )
+        self.assertEqual(
+            production.CACHES["default"]["BACKEND"], "django.core.cache.backends.redis.RedisCache"
+        )
+        self.assertEqual(production.CACHES["default"]["LOCATION"], production.REDIS_URL)
+
+    def test_gunicorn_serves_asgi_by_default(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop("GUNICORN_WORKER_CLASS", None)
+            config = runpy.run_path(str(Path(__file__).resolve().parents[2] / "gunicorn.conf.py"))
+
+        self.assertEqual(config["worker_class"], "uvicorn.workers.UvicornWorker")
+
+    def test_warm_up(self):
+        with tempfile.TemporaryDirectory() as schema_root, override_settings(
+            SCHEMA_ROOT=Path(schema_root)
+        ):
+            schema.reset()
+            self.addCleanup(schema.reset)
+
+            timings = warm_up()
+
+            self.assertEqual(list(timings), ["urls", "serializers", "schema", "database"])
+            self.assertTrue(schema.schema_path().is_file())
@@ -0,0 +1,180 @@
+import multiprocessing
+import tempfile
+from contextlib import contextmanager
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from Airport_API_Service import db_routers
+from Airport_API_Service.db_routers import (
+    ReplicaRouter,
+    is_pinned_to_primary,
+    pin_to_primary,
+    replica_reads,
+)
+from flights.checks import check_shared_cache
+from flights.models import Flight
+from flights.tests.test_flight_api import sample_flight1
+
+FLIGHT_URL = reverse("flights:flight-list")
+ORDER_URL = reverse("flights:order-list")
+
+
+def shared_cache(test):
+    """Run ``test`` against a cache that other processes can read, as Redis is."""
+    location = tempfile.TemporaryDirectory()
+    test.addCleanup(location.cleanup)
+    settings_override = override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": location.name,
+            }
+        }
+    )
+    settings_override.enable()
+    test.addCleanup(settings_override.disable)
+
+
+def _serve(connection):
+    while (request := connection.recv()) is not None:
+        function, args = request
+        connection.send(function(*args))
+
+
+@contextmanager
+def other_process():
+    """Fork a process now and yield ``call(function, *args)`` that runs in it.
+
+    Like another gunicorn worker, the process only shares what the test
+    does after the fork through the cache. It must not touch the database.
+    """
+    connection, child_connection = multiprocessing.Pipe()
+    process = multiprocessing.get_context("fork").Process(
+        target=_serve, args=(child_connection,)
+    )
+    process.start()
+
+    def call(function, *args):
+        connection.send((function, args))
+        return connection.recv()
+
+    try:
+        yield call
+    finally:
+        connection.send(None)
+        process.join()
+
+
+@override_settings(REPLICA_DATABASES=["replica_1"])
+class ReplicaRouterTests(TestCase):
+    def setUp(self):
+        db_routers._replica_health.clear()
+        self.router = ReplicaRouter()
+
+    def test_reads_use_primary_by_default(self):
+        self.assertIsNone(self.router.db_for_read(Flight))
+
+    @mock.patch("Airport_API_Service.db_routers.replica_lag", return_value=0.5)
+    def test_replica_reads(self, _):
+        token = replica_reads.set(True)
+        try:
+            self.assertEqual(self.router.db_for_read(Flight), "replica_1")
+        finally:
+            replica_reads.reset(token)
+        self.assertEqual(self.router.db_for_write(Flight), "default")
+
+    @mock.patch("Airport_API_Service.db_routers.replica_lag", return_value=60)
+    def test_lagging_replica_falls_back_to_primary(self, _):
+        token = replica_reads.set(True)
+        try:
+            self.assertEqual(self.router.db_for_read(Flight), "default")
+        finally:
+            replica_reads.reset(token)
+
+    @mock.patch(
+        "Airport_API_Service.db_routers.replica_lag", side_effect=OperationalError
+    )
+    def test_unreachable_replica_falls_back_to_primary(self, _):
+        token = replica_reads.set(True)
+        try:
+            self.assertEqual(self.router.db_for_read(Flight), "default")
+        finally:
+            replica_reads.reset(token)
+
+    def test_replicas_are_not_migrated(self):
+        self.assertFalse(self.router.allow_migrate("replica_1", "flights"))
+        self.assertIsNone(self.router.allow_migrate("default", "flights"))
+
+
+class ReplicaReadViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@myproject.com",
+            "password",
+        )
+        self.client.force_authenticate(self.user)
+
+    def read_flags_during_list(self) -> set:
+        flags = set()
+
+        def db_for_read(model, **hints):
+            flags.add(replica_reads.get())
+            return None
+
+        with mock.patch.object(ReplicaRouter, "db_for_read", side_effect=db_for_read):
+            self.client.get(FLIGHT_URL)
+        return flags
+
+    def test_safe_requests_read_from_replica(self):
+        self.assertEqual(self.read_flags_during_list(), {True})
+        self.assertFalse(replica_reads.get())
+
+    def test_pinned_user_reads_from_primary(self):
+        pin_to_primary(self.user)
+
+        self.assertTrue(is_pinned_to_primary(self.user))
+        self.assertEqual(self.read_flags_during_list(), {False})
+
+    def test_order_creation_pins_user_to_primary(self):
+        flight = sample_flight1()
+        payload = {"tickets": [{"flight": flight.id, "row": 1, "seat": 1}]}
+
+        res = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, 201)
+        self.assertTrue(is_pinned_to_primary(self.user))
+
+
+class SharedPinTests(TestCase):
+    def setUp(self):
+        shared_cache(self)
+        self.user = get_user_model().objects.create_user(
+            "test@myproject.com",
+            "password",
+        )
+
+    def test_pin_is_seen_by_other_worker_processes(self):
+        with other_process() as call:
+            self.assertFalse(call(is_pinned_to_primary, self.user))
+
+            pin_to_primary(self.user)
+
+            self.assertTrue(call(is_pinned_to_primary, self.user))
+
+
+class SharedCacheCheckTests(TestCase):
+    def test_process_local_cache_is_reported(self):
+        self.assertEqual(
+            [warning.id for warning in check_shared_cache(None)], ["flights.W001"]
+        )
+
+        shared_cache(self)
+        self.assertEqual(check_shared_cache(None), [])
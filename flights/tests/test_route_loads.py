@@ -0,0 +1,201 @@
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models.signals import post_delete
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from flights import rollups
+from flights.models import Flight, Order, RouteDailyLoad, Ticket
+from flights.tests.test_flight_api import sample_flight1, sample_flight2
+
+ROUTE_LOADS_URL = reverse("flights:routedailyload-list")
+ROUTE_LOAD_TOTALS_URL = reverse("flights:routedailyload-by-route")
+DAY = date(2024, 8, 8)
+
+
+class RouteLoadRollupTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("test@myproject.com", "password")
+        self.flight = sample_flight1()
+        self.order = Order.objects.create(user=self.user)
+
+    def load(self, route_id=None, day=DAY):
+        return RouteDailyLoad.objects.get(route_id=route_id or self.flight.route_id, date=day)
+
+    def test_flight_and_tickets_update_rollup(self):
+        self.assertEqual(self.load().seats_offered, 500)
+
+        ticket = Ticket.objects.create(order=self.order, flight=self.flight, row=1, seat=1)
+        Ticket.objects.create(order=self.order, flight=self.flight, row=1, seat=2)
+        self.assertEqual(self.load().seats_sold, 2)
+
+        ticket.delete()
+        self.assertEqual(self.load().seats_sold, 1)
+        self.assertEqual(self.load().load_factor, 0.002)
+
+    def test_moved_flight_moves_its_seats(self):
+        Ticket.objects.create(order=self.order, flight=self.flight, row=1, seat=1)
+
+        self.flight.departure_time += timedelta(days=1)
+        self.flight.arrival_time += timedelta(days=1)
+        self.flight.save()
+
+        left = self.load()
+        self.assertEqual((left.seats_offered, left.seats_sold), (0, 0))
+        moved = self.load(day=DAY + timedelta(days=1))
+        self.assertEqual((moved.seats_offered, moved.seats_sold), (500, 1))
+
+    def test_deleted_flight_row_is_removed_by_reconcile(self):
+        Ticket.objects.create(order=self.order, flight=self.flight, row=1, seat=1)
+
+        self.flight.delete()
+
+        self.assertEqual((self.load().seats_offered, self.load().seats_sold), (0, 0))
+        self.assertEqual(rollups.reconcile(DAY, DAY), {"updated": 0, "deleted": 1})
+        self.assertFalse(RouteDailyLoad.objects.exists())
+
+    def delete_queries(self, flight) -> int:
+        flight = type(flight).objects.get(pk=flight.pk)
+        with CaptureQueriesContext(connection) as queries:
+            flight.delete()
+        return len(queries)
+
+    def test_flight_delete_takes_tickets_off_in_one_update(self):
+        Ticket.objects.create(order=self.order, flight=self.flight, row=1, seat=1)
+        other = sample_flight2()
+        for seat in (1, 2):
+            for row in range(1, 11):
+                Ticket.objects.create(order=self.order, flight=other, row=row, seat=seat)
+
+        one_ticket = self.delete_queries(self.flight)
+
+        self.assertEqual(self.delete_queries(other), one_ticket)
+        self.assertEqual((self.load().seats_offered, self.load().seats_sold), (0, 0))
+        left = self.load(other.route_id, other.departure_time.date())
+        self.assertEqual((left.seats_offered, left.seats_sold), (0, 0))
+
+    def test_flight_delete_counts_tickets_on_every_order_database(self):
+        flight_id = self.flight.id
+        # Three seats sold on order shards, which the flight's cascade does not reach.
+        RouteDailyLoad.objects.update(seats_sold=3)
+
+        with mock.patch(
+            "flights.rollups.ticket_counts", return_value={flight_id: 3}
+        ) as ticket_counts:
+            self.flight.delete()
+
+        ticket_counts.assert_called_once_with([flight_id])
+        self.assertEqual((self.load().seats_offered, self.load().seats_sold), (0, 0))
+
+    def test_failed_flight_delete_leaves_ticket_hooks_on(self):
+        ticket = Ticket.objects.create(order=self.order, flight=self.flight, row=1, seat=1)
+        Ticket.objects.create(order=self.order, flight=self.flight, row=1, seat=2)
+
+        def fail(sender, **kwargs):
+            raise RuntimeError("delete interrupted")
+
+        post_delete.connect(fail, sender=Ticket)
+        try:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                Flight.objects.get(pk=self.flight.pk).delete()
+        finally:
+            post_delete.disconnect(fail, sender=Ticket)
+
+        ticket.delete()
+        self.assertEqual(self.load().seats_sold, 1)
+
+    def test_suspended_hooks_keep_archived_seats(self):
+        Ticket.objects.create(order=self.order, flight=self.flight, row=1, seat=1)
+
+        with rollups.suspended():
+            self.flight.delete()
+
+        self.assertEqual((self.load().seats_offered, self.load().seats_sold), (500, 1))
+        rollups.reconcile(DAY, DAY)
+        self.assertEqual((self.load().seats_offered, self.load().seats_sold), (500, 1))
+
+    def test_reconcile_repairs_drift(self):
+        Ticket.objects.create(order=self.order, flight=self.flight, row=1, seat=1)
+        RouteDailyLoad.objects.update(seats_offered=7, seats_sold=70)
+        airplane = self.flight.airplane
+        Ticket.objects.bulk_create(
+            [
+                Ticket(
+                    order=self.order,
+                    flight=self.flight,
+                    row=2,
+                    seat=1,
+                    departure_time=self.flight.departure_time,
+                )
+            ]
+        )
+
+        call_command(
+            "reconcile_route_loads", start="2024-08-01", end="2024-08-31", stdout=StringIO()
+        )
+
+        self.assertEqual((self.load().seats_offered, self.load().seats_sold), (airplane.capacity, 2))
+
+
+class RouteLoadApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = get_user_model().objects.create_user(
+            email="admin@admin.com", password="1qazxcde3", is_staff=True
+        )
+        self.client.force_authenticate(self.admin_user)
+        self.flight = sample_flight1()
+        self.other = sample_flight2()
+        order = Order.objects.create(user=self.admin_user)
+        for seat in (1, 2):
+            Ticket.objects.create(order=order, flight=self.flight, row=1, seat=seat)
+
+    def test_list_by_date_range(self):
+        with self.assertNumQueries(2):
+            res = self.client.get(ROUTE_LOADS_URL, {"start": "2024-08-08", "end": "2024-08-08"})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["count"], 1)
+        self.assertEqual(
+            res.data["results"][0],
+            {
+                "route": self.flight.route_id,
+                "source": "GTR",
+                "destination": "RTY",
+                "date": "2024-08-08",
+                "seats_offered": 500,
+                "seats_sold": 2,
+                "load_factor": 0.004,
+            },
+        )
+
+        res = self.client.get(ROUTE_LOADS_URL, {"from": "OTP", "to": "KVB"})
+        self.assertEqual([row["route"] for row in res.data["results"]], [self.other.route_id])
+
+    def test_totals_by_route(self):
+        res = self.client.get(ROUTE_LOAD_TOTALS_URL, {"start": "2024-08-01"})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            [(total["route"], total["seats_sold"]) for total in res.data["results"]],
+            [(self.flight.route_id, 2), (self.other.route_id, 0)],
+        )
+
+    def test_bad_date(self):
+        res = self.client.get(ROUTE_LOADS_URL, {"start": "08/08/2024"})
+
+        self.assertEqual(res.status_code, 400)
+
+    def test_admin_only(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("test@myproject.com", "password")
+        )
+
+        self.assertEqual(self.client.get(ROUTE_LOADS_URL).status_code, 403)
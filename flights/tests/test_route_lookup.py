@@ -0,0 +1,106 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from flights import route_lookup
+from flights.models import Airport, Route
+from flights.tests.test_flight_api import sample_flight1, sample_flight2
+from flights.tests.test_replica_routing import other_process, shared_cache
+
+ROUTE_URL = reverse("flights:route-list")
+FLIGHT_URL = reverse("flights:flight-list")
+
+
+class RouteLookupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.source = Airport.objects.create(
+            name="Boryspil", iata_code="KBP", closest_big_city="Kyiv"
+        )
+        self.destination = Airport.objects.create(
+            name="Heathrow", iata_code="LHR", closest_big_city="London"
+        )
+
+    def test_resolve_route(self):
+        route = Route.objects.create(
+            source=self.source, destination=self.destination, distance=2200
+        )
+
+        self.assertEqual(route_lookup.resolve_route("KBP", "LHR"), route.id)
+        self.assertEqual(route_lookup.resolve_route("kbp", "lhr"), route.id)
+        self.assertIsNone(route_lookup.resolve_route("LHR", "KBP"))
+
+    def test_lookup_is_cached(self):
+        route_lookup.resolve_route("KBP", "LHR")
+
+        with self.assertNumQueries(0):
+            route_lookup.resolve_route("KBP", "LHR")
+
+    def test_new_route_invalidates_map(self):
+        self.assertIsNone(route_lookup.resolve_route("KBP", "LHR"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            route = Route.objects.create(
+                source=self.source, destination=self.destination, distance=2200
+            )
+
+        self.assertEqual(route_lookup.resolve_route("KBP", "LHR"), route.id)
+
+    def test_change_in_other_worker_process_invalidates_map(self):
+        shared_cache(self)
+        with other_process() as call:
+            self.assertIsNone(route_lookup.resolve_route("KBP", "LHR"))
+            # Saved without running the commit hooks; the other process announces it.
+            route = Route.objects.create(
+                source=self.source, destination=self.destination, distance=2200
+            )
+
+            call(route_lookup.invalidate)
+
+            with self.assertNumQueries(1):
+                self.assertEqual(route_lookup.resolve_route("KBP", "LHR"), route.id)
+
+    def test_duplicate_route_rejected(self):
+        Route.objects.create(source=self.source, destination=self.destination, distance=2200)
+
+        with self.assertRaises(ValidationError):
+            Route.objects.create(
+                source=self.source, destination=self.destination, distance=2300
+            )
+
+
+class IataFilterApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@myproject.com",
+            "password",
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_filter_routes_by_iata_pair(self):
+        flight = sample_flight1()
+        sample_flight2()
+
+        res = self.client.get(ROUTE_URL, {"from": "gtr", "to": "RTY"})
+        self.assertEqual([route["id"] for route in res.data], [flight.route_id])
+
+        res = self.client.get(ROUTE_URL, {"from": "RTY", "to": "GTR"})
+        self.assertEqual(res.data, [])
+
+    def test_filter_flights_by_iata(self):
+        flight = sample_flight1()
+        other = sample_flight2()
+
+        res = self.client.get(FLIGHT_URL, {"from": "GTR", "to": "RTY"})
+        self.assertEqual([item["id"] for item in res.data], [flight.id])
+
+        res = self.client.get(FLIGHT_URL, {"from": "OTP"})
+        self.assertEqual([item["id"] for item in res.data], [other.id])
+
+        res = self.client.get(FLIGHT_URL, {"to": "RTY"})
+        self.assertEqual([item["id"] for item in res.data], [flight.id])
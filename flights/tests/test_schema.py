@@ -0,0 +1,66 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from Airport_API_Service import schema
+
+SCHEMA_URL = reverse("schema")
+
+
+class CachedSchemaTests(TestCase):
+    def setUp(self):
+        schema_root = tempfile.TemporaryDirectory()
+        self.addCleanup(schema_root.cleanup)
+        self.schema_root = Path(schema_root.name)
+        settings_override = override_settings(SCHEMA_ROOT=self.schema_root, APP_VERSION="1.2.3")
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        for cleanup in (schema.reset, schema.code_version.cache_clear):
+            cleanup()
+            self.addCleanup(cleanup)
+
+    def test_generate_schema_writes_versioned_file(self):
+        (self.schema_root / "openapi-1.2.2.json").write_text("{}")
+
+        call_command("generate_schema", stdout=StringIO())
+
+        files = [path.name for path in self.schema_root.iterdir()]
+        self.assertEqual(files, ["openapi-1.2.3.json"])
+        document = json.loads((self.schema_root / files[0]).read_text())
+        self.assertIn("/api/flights/flights/", document["paths"])
+
+    def test_schema_is_generated_once_and_served_with_etag(self):
+        with mock.patch.object(schema, "generate_schema", wraps=schema.generate_schema) as generate:
+            res = self.client.get(SCHEMA_URL)
+            self.client.get(SCHEMA_URL, {"format": "json"})
+            self.client.get(SCHEMA_URL)
+
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue((self.schema_root / "openapi-1.2.3.json").is_file())
+        self.assertIn(b"openapi:", res.content)
+
+        res = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=res["ETag"])
+        self.assertEqual(res.status_code, 304)
+
+    def test_json_format(self):
+        res = self.client.get(SCHEMA_URL, {"format": "json"})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res["Content-Type"], "application/vnd.oai.openapi+json")
+        self.assertEqual(json.loads(res.content)["info"]["title"], "Airport-API-Service")
+
+    def test_schema_file_is_reused(self):
+        (self.schema_root / "openapi-1.2.3.json").write_text(
+            json.dumps({"openapi": "3.0.3", "info": {"title": "From file"}, "paths": {}})
+        )
+
+        res = self.client.get(SCHEMA_URL, {"format": "json"})
+
+        self.assertEqual(json.loads(res.content)["info"]["title"], "From file")
@@ -0,0 +1,115 @@
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from flights.booking_queue import process_batch
+from flights.models import AirplaneType, Airplane, BookingRequest, Order, Ticket
+from flights.seating import NotEnoughSeats, SeatMap
+from flights.tests.test_flight_api import sample_flight1
+
+ORDER_URL = reverse("flights:order-list")
+
+
+class SeatMapTests(SimpleTestCase):
+    def test_block_in_one_row(self):
+        seat_map = SeatMap(3, 6, [(1, 1), (1, 2), (2, 4)])
+
+        self.assertEqual(seat_map.find_block(4), [(1, 3), (1, 4), (1, 5), (1, 6)])
+
+    def test_block_avoids_stranding_a_seat(self):
+        # Row 1 has seats 3-6 free: any 3 of them leave one seat alone.
+        seat_map = SeatMap(3, 6, [(1, 1), (1, 2), (2, 4)])
+
+        self.assertEqual(seat_map.find_block(3), [(2, 1), (2, 2), (2, 3)])
+
+    def test_split_when_no_block_fits(self):
+        seat_map = SeatMap(3, 4, [(1, 1), (1, 3), (2, 2), (2, 4), (3, 1), (3, 2), (3, 3)])
+
+        self.assertIsNone(seat_map.find_block(2))
+        self.assertEqual(seat_map.assign(3), [(1, 2), (1, 4), (2, 1)])
+        self.assertEqual(seat_map.free_count, 2)
+
+    def test_not_enough_seats(self):
+        seat_map = SeatMap(1, 2, [(1, 1)])
+
+        with self.assertRaises(NotEnoughSeats):
+            seat_map.assign(2)
+
+
+class AutoSeatsApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@myproject.com",
+            "password",
+        )
+        self.client.force_authenticate(self.user)
+        airplane = Airplane.objects.create(
+            name="Small",
+            rows=2,
+            seats_in_row=4,
+            airplane_type=AirplaneType.objects.create(name="Regional"),
+        )
+        self.flight = sample_flight1(airplane=airplane)
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(order=order, flight=self.flight, row=1, seat=2)
+
+    def auto_order(self, count):
+        return self.client.post(
+            ORDER_URL, {"flight": self.flight.id, "auto_seats": count}, format="json"
+        )
+
+    def test_auto_seats_books_adjacent_seats(self):
+        res = self.auto_order(4)
+
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(
+            [(ticket["row"], ticket["seat"]) for ticket in res.data["tickets"]],
+            [(2, 1), (2, 2), (2, 3), (2, 4)],
+        )
+
+    def test_auto_seats_falls_back_to_split_seats(self):
+        self.auto_order(4)
+
+        res = self.auto_order(3)
+
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(
+            sorted((ticket["row"], ticket["seat"]) for ticket in res.data["tickets"]),
+            [(1, 1), (1, 3), (1, 4)],
+        )
+        self.assertEqual(self.auto_order(1).status_code, 400)
+
+    def test_auto_seats_validation(self):
+        self.assertEqual(
+            self.client.post(ORDER_URL, {"auto_seats": 2}, format="json").status_code, 400
+        )
+        res = self.client.post(
+            ORDER_URL,
+            {
+                "flight": self.flight.id,
+                "auto_seats": 2,
+                "tickets": [{"flight": self.flight.id, "row": 1, "seat": 1}],
+            },
+            format="json",
+        )
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(self.client.post(ORDER_URL, {}, format="json").status_code, 400)
+
+    @override_settings(ASYNC_ORDER_INTAKE=True)
+    def test_queued_auto_seats(self):
+        first = self.auto_order(4).data
+        second = self.auto_order(4).data
+
+        process_batch(0, 1)
+
+        first = BookingRequest.objects.get(id=first["id"])
+        second = BookingRequest.objects.get(id=second["id"])
+        self.assertEqual(first.status, BookingRequest.Status.COMPLETED)
+        self.assertEqual(
+            [(ticket["row"], ticket["seat"]) for ticket in first.tickets],
+            [(2, 1), (2, 2), (2, 3), (2, 4)],
+        )
+        self.assertEqual(second.status, BookingRequest.Status.FAILED)
+        self.assertIn("auto_seats", second.errors)
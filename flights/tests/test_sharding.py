@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import serializers
+from rest_framework.test import APIClient
+
+from Airport_API_Service.db_routers import OrderShardRouter
+from flights.models import Flight, Order, Ticket
+from flights.serializers import OrderSerializer
+from flights.sharding import shard_for_user, taken_seats, ticket_counts
+from flights.tests.test_flight_api import sample_flight1
+
+SHARDS = ["orders_1", "orders_2", "orders_3"]
+
+
+@override_settings(ORDER_SHARDS=SHARDS)
+class ShardPlacementTests(TestCase):
+    def setUp(self):
+        self.router = OrderShardRouter()
+
+    def test_shard_for_user_is_stable_and_spread(self):
+        self.assertEqual(shard_for_user(42), shard_for_user(42))
+        self.assertEqual(
+            {shard_for_user(user_id) for user_id in range(300)}, set(SHARDS)
+        )
+
+    def test_orders_and_tickets_follow_the_user(self):
+        order = Order(user_id=42)
+        ticket = Ticket(order=order, row=1, seat=1)
+
+        self.assertEqual(self.router.db_for_write(Order, instance=order), shard_for_user(42))
+        self.assertEqual(self.router.db_for_write(Ticket, instance=ticket), shard_for_user(42))
+        self.assertEqual(self.router.db_for_read(Ticket, instance=order), shard_for_user(42))
+
+    def test_catalog_reads_from_shard_objects_use_primary(self):
+        ticket = Ticket(row=1, seat=1)
+        ticket._state.db = "orders_2"
+
+        self.assertEqual(self.router.db_for_read(Flight, instance=ticket), "default")
+        self.assertIsNone(self.router.db_for_write(Flight, instance=Flight()))
+
+    @override_settings(ORDER_SHARDS=[])
+    def test_disabled(self):
+        self.assertIsNone(self.router.db_for_write(Order, instance=Order(user_id=42)))
+
+
+@override_settings(ORDER_SHARDS=["default"])
+class ShardedBookingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@myproject.com",
+            "password",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight1()
+
+    def test_order_lands_on_user_shard_and_counts_are_gathered(self):
+        res = self.client.post(
+            reverse("flights:order-list"),
+            {"tickets": [{"flight": self.flight.id, "row": 3, "seat": 1}]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(ticket_counts([self.flight.id]), {self.flight.id: 1})
+        self.assertEqual(taken_seats(self.flight.id), [(3, 1)])
+
+        res = self.client.get(reverse("flights:flight-detail", args=[self.flight.id]))
+        self.assertEqual(res.data["tickets_available"], self.flight.airplane.capacity - 1)
+        self.assertEqual(res.data["taken_places"], [{"row": 3, "seat": 1}])
+
+    def test_taken_seat_rejected_across_shards(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(order=order, flight=self.flight, row=3, seat=1)
+
+        with self.assertRaises(serializers.ValidationError):
+            OrderSerializer.check_seats_across_shards(
+                [{"flight": self.flight, "row": 3, "seat": 1}]
+            )
@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from flights.models import Order, Ticket
+from flights.tests.test_flight_api import detail_url, sample_flight1
+
+FLIGHT_URL = reverse("flights:flight-list")
+ROUTE_URL = reverse("flights:route-list")
+AIRPLANE_URL = reverse("flights:airplane-list")
+ORDER_URL = reverse("flights:order-list")
+
+
+class SparseFieldsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@myproject.com",
+            "password",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight1()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(order=order, flight=self.flight, row=1, seat=1)
+
+    def test_flight_list_loads_only_requested_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(FLIGHT_URL, {"fields": "id,departure_time"})
+
+        self.assertEqual(list(res.data[0]), ["id", "departure_time"])
+        flight_query = next(
+            query["sql"] for query in queries if 'FROM "flights_flight"' in query["sql"]
+        )
+        self.assertNotIn("flights_airport", flight_query)
+        self.assertNotIn("flights_airplane", flight_query)
+        self.assertNotIn("arrival_time", flight_query)
+
+    def test_flight_detail_without_crew_and_seats(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(
+                detail_url(self.flight.id), {"fields": "id,route,tickets_available"}
+            )
+
+        self.assertEqual(
+            res.data,
+            {
+                "id": self.flight.id,
+                "route": str(self.flight.route),
+                "tickets_available": self.flight.airplane.capacity - 1,
+            },
+        )
+
+    def test_default_payload_is_unchanged(self):
+        res = self.client.get(detail_url(self.flight.id))
+
+        self.assertEqual(res.data["taken_places"], [{"row": 1, "seat": 1}])
+        self.assertIn("crew", res.data)
+
+    def test_expand_flight_relations(self):
+        res = self.client.get(FLIGHT_URL, {"fields": "id,route,airplane", "expand": "route,airplane"})
+
+        self.assertEqual(res.data[0]["route"]["source"], str(self.flight.route.source))
+        self.assertEqual(res.data[0]["airplane"]["airplane_type"], "Large Jets")
+
+    def test_route_and_airplane_fields(self):
+        res = self.client.get(ROUTE_URL, {"fields": "id,source", "expand": "source"})
+        self.assertEqual(res.data[0]["source"]["iata_code"], "GTR")
+        self.assertEqual(list(res.data[0]), ["id", "source"])
+
+        res = self.client.get(AIRPLANE_URL, {"fields": "name,capacity"})
+        self.assertEqual(res.data, [{"name": "Boeing 777X", "capacity": 500}])
+
+    def test_order_list_without_tickets(self):
+        with self.assertNumQueries(2):
+            res = self.client.get(ORDER_URL, {"fields": "id,created_at"})
+
+        self.assertEqual(list(res.data["results"][0]), ["id", "created_at"])
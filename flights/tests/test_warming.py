@@ -0,0 +1,105 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command, load_command_class
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from flights import boards, geo, route_lookup
+from flights.models import Flight
+from flights.tests.test_flight_api import sample_flight1, sample_flight2, sample_flight3
+from flights.tests.test_replica_routing import shared_cache
+from flights.warming import busiest_routes, warm_caches
+
+
+def upcoming_flights():
+    tomorrow = timezone.now() + timedelta(days=1)
+    busy = sample_flight1(departure_time=tomorrow, arrival_time=tomorrow + timedelta(hours=3))
+    Flight.objects.create(
+        route=busy.route,
+        airplane=busy.airplane,
+        departure_time=tomorrow + timedelta(days=1),
+        arrival_time=tomorrow + timedelta(days=1, hours=3),
+    )
+    quiet = sample_flight2(departure_time=tomorrow, arrival_time=tomorrow + timedelta(hours=2))
+    later = sample_flight3(
+        departure_time=tomorrow + timedelta(days=30),
+        arrival_time=tomorrow + timedelta(days=30, hours=2),
+    )
+    return busy.route, quiet.route, later.route
+
+
+class WarmCachesTests(TestCase):
+    def setUp(self):
+        for reset in (cache.clear, boards.clear, geo.reset):
+            reset()
+            self.addCleanup(reset)
+        self.busy, self.quiet, self.later = upcoming_flights()
+
+    def test_busiest_routes(self):
+        self.assertEqual(
+            busiest_routes(days=7, limit=10),
+            [
+                (self.busy.source_id, self.busy.destination_id),
+                (self.quiet.source_id, self.quiet.destination_id),
+            ],
+        )
+        self.assertEqual(len(busiest_routes(days=7, limit=1)), 1)
+
+    def test_warm_caches(self):
+        results = warm_caches(days=7, routes=1, budget=60, threads=1)
+
+        self.assertEqual(results["failed"], {})
+        self.assertEqual(results["skipped"], [])
+        self.assertEqual(
+            set(results["warmed"]),
+            {
+                "route_map",
+                "distance_matrix",
+                "airport_tree",
+                f"departures:{self.busy.source_id}",
+                f"arrivals:{self.busy.destination_id}",
+            },
+        )
+        with self.assertNumQueries(0):
+            route_lookup.resolve_route("GTR", "RTY")
+            boards.upcoming("departures", self.busy.source_id, 10)
+            geo.get_tree()
+
+    def test_budget_exhausted(self):
+        results = warm_caches(days=7, routes=10, budget=0, threads=1)
+
+        self.assertEqual(results["warmed"], {})
+        self.assertEqual(len(results["skipped"]), 7)
+
+
+class WarmCachesCommandTests(TransactionTestCase):
+    def setUp(self):
+        for reset in (cache.clear, boards.clear, geo.reset):
+            reset()
+            self.addCleanup(reset)
+        upcoming_flights()
+
+    def test_command_fills_the_shared_cache_only(self):
+        shared_cache(self)
+        out = StringIO()
+
+        call_command("warm_caches", "--threads", "2", "--budget", "60", stdout=out)
+
+        self.assertIn("Warmed 1 caches", out.getvalue())
+        with self.assertNumQueries(0):
+            self.assertIn("GTR-RTY", route_lookup.route_map())
+        self.assertEqual(boards._boards, {})
+
+    def test_command_help_points_to_the_worker_warm_up(self):
+        help_text = load_command_class("flights", "warm_caches").create_parser(
+            "manage.py", "warm_caches"
+        ).format_help()
+
+        self.assertIn("only warm-up cache shared", help_text)
+        self.assertIn("gunicorn.conf.py", help_text)
+
+    def test_command_refuses_a_process_local_cache(self):
+        with self.assertRaisesMessage(CommandError, "REDIS_URL"):
+            call_command("warm_caches", stdout=StringIO())
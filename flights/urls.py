@@ -3,25 +3,37 @@ from rest_framework import routers
 
 from flights.views import (
     OrderViewSet,
+    BookingRequestViewSet,
     CrewViewSet,
     FlightViewSet,
     AirplaneTypeViewSet,
     AirplaneViewSet,
     AirportViewSet,
     RouteViewSet,
+    RouteDailyLoadViewSet,
     TicketViewSet,
+    flight_seat_stream,
 )
 
 router = routers.DefaultRouter()
 
 router.register("orders", OrderViewSet)
+router.register("booking_requests", BookingRequestViewSet)
 router.register("airports", AirportViewSet)
 router.register("airplanes", AirplaneViewSet)
 router.register("airplane_types", AirplaneTypeViewSet)
 router.register("flights", FlightViewSet)
 router.register("crews", CrewViewSet)
 router.register("route", RouteViewSet)
+router.register("route_loads", RouteDailyLoadViewSet)
 
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path(
+        "flights/<int:pk>/seats/stream/",
+        flight_seat_stream,
+        name="flight-seat-stream",
+    ),
+    path("", include(router.urls)),
+]
 
 app_name = "flights"
@@ -1,15 +1,68 @@
-from datetime import datetime
-
-from django.db.models import F, Count
+from datetime import datetime, timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import F, Count, Prefetch, Sum
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import viewsets, status, mixins
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
-from .models import Airport, AirplaneType, Airplane, Route, Crew, Flight, Order, Ticket
+from Airport_API_Service.db_routers import pin_to_primary
+from .archive import load_archived_orders
+from .boards import BOARD_LIMIT, BOARD_MAX_LIMIT, upcoming
+from .booking_queue import enqueue
+from .geo import (
+    DISTANCE_PAIRS_LIMIT,
+    NEARBY_LIMIT,
+    NEARBY_MAX_LIMIT,
+    NEARBY_RADIUS_KM,
+    airport_distances,
+    airports_near,
+    nearby_airports,
+)
+from .idempotency import IDEMPOTENCY_HEADER, claim_key, complete_key, request_fingerprint
+from .live import (
+    LIVE_TICKET_SECONDS,
+    authenticate,
+    broker,
+    seat_snapshot,
+    sse_stream,
+    stream_ticket,
+)
+from .manifest import stream_manifest_csv, stream_manifest_json
+from .mixins import (
+    EXPAND_PARAMETER,
+    FIELDS_PARAMETER,
+    IDS_PARAMETER,
+    MultiGetMixin,
+    ReplicaReadMixin,
+    SparseFieldsMixin,
+)
+from .models import (
+    Airport,
+    AirplaneType,
+    Airplane,
+    ArchivedOrder,
+    Route,
+    Crew,
+    Flight,
+    Order,
+    Ticket,
+    BookingRequest,
+    RouteDailyLoad,
+)
 from .permissions import IsAdminOrIfAuthenticatedReadOnly
+from .route_lookup import resolve_route
+from .scheduling import airplane_timeline, find_crew_conflicts
+from .sharding import order_database, sharding_enabled, ticket_counts
 from .serializers import (
     AirportSerializer,
     AirplaneTypeSerializer,
@@ -25,10 +78,55 @@ from .serializers import (
     FlightDetailSerializer,
     OrderListSerializer,
     AirplaneImageSerializer,
+    AirplaneTimelineFlightSerializer,
+    AirplaneUtilizationSerializer,
+    BookingRequestSerializer,
+    FlightBoardSerializer,
+    RouteDailyLoadSerializer,
+    RouteLoadTotalSerializer,
+)
+
+
+FROM_PARAMETER = OpenApiParameter(
+    name="from",
+    type=str,
+    description="Filtering by source airport IATA code (ex. ?from=KBP)",
+    style="form",
+    explode=True,
+)
+
+TO_PARAMETER = OpenApiParameter(
+    name="to",
+    type=str,
+    description="Filtering by destination airport IATA code (ex. ?to=LHR)",
+    style="form",
+    explode=True,
 )
 
 
+def filter_by_iata_pair(request, queryset, route_prefix: str):
+    """Apply ``?from=`` and ``?to=`` IATA codes; a full pair becomes a route id lookup."""
+    source_iata = request.query_params.get("from")
+    destination_iata = request.query_params.get("to")
+
+    if source_iata and destination_iata:
+        route_id = resolve_route(source_iata, destination_iata)
+        if route_id is None:
+            return queryset.none()
+        return queryset.filter(**{f"{route_prefix}id": route_id})
+
+    if source_iata:
+        queryset = queryset.filter(**{f"{route_prefix}source__iata_code": source_iata.upper()})
+    if destination_iata:
+        queryset = queryset.filter(
+            **{f"{route_prefix}destination__iata_code": destination_iata.upper()}
+        )
+    return queryset
+
+
 class AirportViewSet(
+    ReplicaReadMixin,
+    MultiGetMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
@@ -39,8 +137,158 @@ class AirportViewSet(
     serializer_class = AirportSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="pairs",
+                type=str,
+                description="Comma-separated source-destination airport id pairs "
+                            f"(ex. ?pairs=1-2,1-3), at most {DISTANCE_PAIRS_LIMIT}",
+                style="form",
+                explode=True,
+            ),
+        ],
+        responses={200: dict},
+        description="Great-circle distances in km between airport pairs.",
+    )
+    @action(methods=["GET"], detail=False)
+    def distances(self, request):
+        try:
+            pairs = [
+                tuple(int(airport_id) for airport_id in pair.split("-"))
+                for pair in request.query_params.get("pairs", "").split(",")
+            ]
+            if any(len(pair) != 2 for pair in pairs):
+                raise ValueError
+        except ValueError:
+            return Response(
+                {"pairs": "pairs must look like 1-2,1-3"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(pairs) > DISTANCE_PAIRS_LIMIT:
+            return Response(
+                {"pairs": f"At most {DISTANCE_PAIRS_LIMIT} pairs can be requested at once"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(
+            [
+                {"source": source, "destination": destination, "distance": distance}
+                for (source, destination), distance in zip(pairs, airport_distances(pairs))
+            ]
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name="lat", type=float, description="Latitude", style="form", explode=True),
+            OpenApiParameter(name="lon", type=float, description="Longitude", style="form", explode=True),
+            OpenApiParameter(
+                name="radius",
+                type=float,
+                description=f"Search radius in km (default: {NEARBY_RADIUS_KM})",
+                style="form",
+                explode=True,
+            ),
+            OpenApiParameter(
+                name="k",
+                type=int,
+                description=f"Maximum number of airports (default: {NEARBY_LIMIT}, max: {NEARBY_MAX_LIMIT})",
+                style="form",
+                explode=True,
+            ),
+        ],
+        responses={200: dict},
+        description="Airports closest to a location, nearest first, with their distance in km.",
+    )
+    @action(methods=["GET"], detail=False)
+    def nearby(self, request):
+        try:
+            latitude = float(request.query_params["lat"])
+            longitude = float(request.query_params["lon"])
+            radius = float(request.query_params.get("radius", NEARBY_RADIUS_KM))
+            k = int(request.query_params.get("k", NEARBY_LIMIT))
+        except (KeyError, ValueError):
+            return Response(
+                {"detail": "lat and lon are required; lat, lon and radius must be numbers, k an integer."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180) or radius < 0:
+            return Response(
+                {"detail": "lat, lon or radius is out of range."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        found = nearby_airports(
+            latitude, longitude, radius_km=radius, k=min(max(k, 1), NEARBY_MAX_LIMIT)
+        )
+        airports = Airport.objects.in_bulk([airport_id for airport_id, _ in found])
+        return Response(
+            [
+                {**AirportSerializer(airports[airport_id]).data, "distance": distance}
+                for airport_id, distance in found
+                if airport_id in airports
+            ]
+        )
+
+    def _board(self, request, pk, direction):
+        airport = get_object_or_404(Airport.objects.only("id"), pk=pk)
+        try:
+            limit = int(request.query_params.get("limit", BOARD_LIMIT))
+        except ValueError:
+            return Response(
+                {"limit": "limit must be an integer"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        limit = min(max(limit, 1), BOARD_MAX_LIMIT)
+
+        flight_ids = upcoming(direction, airport.id, limit)
+        flights = Flight.objects.select_related(
+            "route__source", "route__destination", "airplane"
+        ).in_bulk(flight_ids)
+        return Response(
+            FlightBoardSerializer(
+                [flights[flight_id] for flight_id in flight_ids if flight_id in flights],
+                many=True,
+            ).data
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="limit",
+                type=int,
+                description=f"Number of flights (default: {BOARD_LIMIT}, max: {BOARD_MAX_LIMIT})",
+                style="form",
+                explode=True,
+            ),
+        ],
+        responses={200: FlightBoardSerializer(many=True)},
+        description="Next flights departing from the airport, soonest first.",
+    )
+    @action(methods=["GET"], detail=True)
+    def departures(self, request, pk=None):
+        return self._board(request, pk, "departures")
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="limit",
+                type=int,
+                description=f"Number of flights (default: {BOARD_LIMIT}, max: {BOARD_MAX_LIMIT})",
+                style="form",
+                explode=True,
+            ),
+        ],
+        responses={200: FlightBoardSerializer(many=True)},
+        description="Next flights arriving at the airport, soonest first.",
+    )
+    @action(methods=["GET"], detail=True)
+    def arrivals(self, request, pk=None):
+        return self._board(request, pk, "arrivals")
+
 
 class AirplaneTypeViewSet(
+    ReplicaReadMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
@@ -53,14 +301,25 @@ class AirplaneTypeViewSet(
 
 
 class AirplaneViewSet(
+    ReplicaReadMixin,
+    MultiGetMixin,
+    SparseFieldsMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
     viewsets.GenericViewSet,
 ):
-    queryset = Airplane.objects.all().select_related("airplane_type")
+    queryset = Airplane.objects.all()
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    field_queries = {
+        "airplane_type": {"only": ["airplane_type"], "select_related": ["airplane_type"]},
+        "capacity": {"only": ["rows", "seats_in_row"]},
+        "image_url": {"only": ["image"]},
+    }
+
+    def get_queryset(self):
+        return self.shape_queryset(self.queryset)
 
     def get_serializer_class(self):
         if self.action == "list" or self.action == "retrieve":
@@ -90,10 +349,70 @@ class AirplaneViewSet(
             return Response(serializer.data, status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-
-class RouteViewSet(viewsets.ModelViewSet):
-    queryset = Route.objects.select_related("source", "destination").all()
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="start",
+                type=str,
+                description="First departure date of the timeline (YYYY-MM-DD, default: today)",
+                style="form",
+                explode=True,
+            ),
+            OpenApiParameter(
+                name="end",
+                type=str,
+                description="Last departure date of the timeline (YYYY-MM-DD, default: start + 6 days)",
+                style="form",
+                explode=True,
+            ),
+        ],
+        responses={200: dict},
+        description="Flights of an airplane with ground time between them and block hours per day.",
+    )
+    @action(methods=["GET"], detail=True)
+    def timeline(self, request, pk=None):
+        airplane = get_object_or_404(Airplane.objects.only("id"), pk=pk)
+        try:
+            start = request.query_params.get("start")
+            start = (
+                datetime.strptime(start, "%Y-%m-%d").date()
+                if start
+                else timezone.localdate()
+            )
+            end = request.query_params.get("end")
+            end = (
+                datetime.strptime(end, "%Y-%m-%d").date()
+                if end
+                else start + timedelta(days=6)
+            )
+        except ValueError:
+            return Response(
+                {"detail": "Dates must be in YYYY-MM-DD format."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        flights, utilization = airplane_timeline(airplane.id, start, end)
+        return Response(
+            {
+                "airplane": airplane.id,
+                "start": start,
+                "end": end,
+                "turnaround_minutes": int(
+                    settings.FLIGHT_MIN_TURNAROUND.total_seconds() // 60
+                ),
+                "flights": AirplaneTimelineFlightSerializer(flights, many=True).data,
+                "utilization": AirplaneUtilizationSerializer(utilization, many=True).data,
+            }
+        )
+
+
+class RouteViewSet(ReplicaReadMixin, MultiGetMixin, SparseFieldsMixin, viewsets.ModelViewSet):
+    queryset = Route.objects.all()
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    field_queries = {
+        "source": {"only": ["source"], "select_related": ["source"]},
+        "destination": {"only": ["destination"], "select_related": ["destination"]},
+    }
 
     def get_serializer_class(self):
         if self.action == "list" or self.action == "retrieve":
@@ -102,7 +421,7 @@ class RouteViewSet(viewsets.ModelViewSet):
         return RouteSerializer
 
     def get_queryset(self):
-        queryset = self.queryset
+        queryset = self.shape_queryset(self.queryset)
         source_name = self.request.query_params.get("source")
         destination_name = self.request.query_params.get("destination")
 
@@ -112,6 +431,8 @@ class RouteViewSet(viewsets.ModelViewSet):
         if destination_name:
             queryset = queryset.filter(destination__name__icontains=destination_name)
 
+        queryset = filter_by_iata_pair(self.request, queryset, "")
+
         return queryset.distinct()
 
     @extend_schema(
@@ -130,6 +451,11 @@ class RouteViewSet(viewsets.ModelViewSet):
                 style="form",
                 explode=True,
             ),
+            FROM_PARAMETER,
+            TO_PARAMETER,
+            IDS_PARAMETER,
+            FIELDS_PARAMETER,
+            EXPAND_PARAMETER,
         ]
     )
     def list(self, request, *args, **kwargs):
@@ -143,23 +469,64 @@ class CrewViewSet(viewsets.ModelViewSet):
     serializer_class = CrewSerializer
     permission_classes = (IsAdminUser,)
 
+    @extend_schema(
+        responses={200: dict},
+        description="List crew members assigned to overlapping current or upcoming flights.",
+    )
+    @action(methods=["GET"], detail=False)
+    def conflicts(self, request):
+        return Response(find_crew_conflicts(since=timezone.now()))
+
 
 class FlightViewSet(
+    ReplicaReadMixin,
+    MultiGetMixin,
+    SparseFieldsMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
     viewsets.GenericViewSet,
 ):
-    queryset = Flight.objects.select_related(
-        "route__source",
-        "route__destination",
-        "airplane"
-    ).prefetch_related("crew").annotate(tickets_available=(
-                F("airplane__rows") * F("airplane__seats_in_row")
-                - Count("tickets")
-            )).all()
+    queryset = Flight.objects.all()
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    field_queries = {
+        "route": {
+            "only": ["route"],
+            "select_related": ["route__source", "route__destination"],
+        },
+        "airplane": {"only": ["airplane"], "select_related": ["airplane"]},
+        "airplane_num_seats": {"only": ["airplane"], "select_related": ["airplane"]},
+        "tickets_available": {
+            "only": ["airplane"],
+            "select_related": ["airplane"],
+            "annotate": {
+                "tickets_available": (
+                    F("airplane__rows") * F("airplane__seats_in_row")
+                    - Count("tickets")
+                )
+            },
+        },
+        "price": {
+            "only": ["route", "airplane", "departure_time"],
+            "select_related": ["route", "airplane"],
+            "annotate": {
+                "tickets_available": (
+                    F("airplane__rows") * F("airplane__seats_in_row")
+                    - Count("tickets")
+                )
+            },
+        },
+        "crew": {"prefetch_related": ["crew"]},
+        "taken_places": {
+            "prefetch_related": [
+                Prefetch("tickets", queryset=Ticket.objects.only("flight_id", "row", "seat"))
+            ]
+        },
+    }
+    expand_queries = {
+        "airplane": {"select_related": ["airplane__airplane_type"]},
+    }
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -169,12 +536,19 @@ class FlightViewSet(
 
         return FlightSerializer
 
-    @staticmethod
-    def _params_to_ints(qs):
-        return [int(str_id) for str_id in qs.split(",")]
+    def get_serializer(self, *args, **kwargs):
+        if self.action == "create" and isinstance(kwargs.get("data"), list):
+            kwargs["many"] = True
+        if sharding_enabled() and self.action in ("list", "retrieve") and args:
+            flights = args[0] if kwargs.get("many") else [args[0]]
+            kwargs.setdefault("context", self.get_serializer_context())
+            kwargs["context"]["tickets_sold"] = ticket_counts(
+                [flight.id for flight in flights]
+            )
+        return super().get_serializer(*args, **kwargs)
 
     def get_queryset(self):
-        queryset = self.queryset
+        queryset = self.shape_queryset(self.queryset)
         departure = self.request.query_params.get("departure")
         arrival = self.request.query_params.get("arrival")
         source_name = self.request.query_params.get("source")
@@ -194,6 +568,30 @@ class FlightViewSet(
         if destination_name:
             queryset = queryset.filter(route__destination__name__icontains=destination_name)
 
+        queryset = filter_by_iata_pair(self.request, queryset, "route__")
+
+        source_near = self.request.query_params.get("source_near")
+        destination_near = self.request.query_params.get("destination_near")
+        if source_near or destination_near:
+            try:
+                radius = float(self.request.query_params.get("near_radius", NEARBY_RADIUS_KM))
+                source_near = int(source_near) if source_near else None
+                destination_near = int(destination_near) if destination_near else None
+            except ValueError:
+                raise ValidationError(
+                    {"detail": "source_near and destination_near must be ids, near_radius a number."}
+                )
+            if not radius >= 0:
+                raise ValidationError({"near_radius": "near_radius must not be negative."})
+            if source_near:
+                queryset = queryset.filter(
+                    route__source_id__in=airports_near(source_near, radius)
+                )
+            if destination_near:
+                queryset = queryset.filter(
+                    route__destination_id__in=airports_near(destination_near, radius)
+                )
+
         return queryset.distinct()
 
     @extend_schema(
@@ -226,6 +624,32 @@ class FlightViewSet(
                 style="form",
                 explode=True,
             ),
+            FROM_PARAMETER,
+            TO_PARAMETER,
+            OpenApiParameter(
+                name="source_near",
+                type=int,
+                description="Filtering by source airport id, including airports within near_radius of it",
+                style="form",
+                explode=True,
+            ),
+            OpenApiParameter(
+                name="destination_near",
+                type=int,
+                description="Filtering by destination airport id, including airports within near_radius of it",
+                style="form",
+                explode=True,
+            ),
+            OpenApiParameter(
+                name="near_radius",
+                type=float,
+                description=f"Radius in km for source_near and destination_near (default: {NEARBY_RADIUS_KM})",
+                style="form",
+                explode=True,
+            ),
+            IDS_PARAMETER,
+            FIELDS_PARAMETER,
+            EXPAND_PARAMETER,
         ]
     )
     def list(self, request, *args, **kwargs):
@@ -233,21 +657,83 @@ class FlightViewSet(
         arrival date, source airport name, and destination airport name."""
         return super().list(request, *args, **kwargs)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="output",
+                type=str,
+                enum=["json", "csv"],
+                description="Manifest output format (default: json)",
+                style="form",
+                explode=True,
+            ),
+        ],
+        responses={200: bytes},
+        description="Stream the passenger manifest of a flight sorted by row and seat.",
+    )
+    @action(
+        methods=["GET"],
+        detail=True,
+        permission_classes=[IsAdminUser],
+    )
+    def manifest(self, request, pk=None):
+        flight = get_object_or_404(Flight.objects.only("id"), pk=pk)
+        output = request.query_params.get("output", "json")
+
+        if output == "csv":
+            response = StreamingHttpResponse(
+                stream_manifest_csv(flight.id), content_type="text/csv"
+            )
+            response["Content-Disposition"] = (
+                f'attachment; filename="flight-{flight.id}-manifest.csv"'
+            )
+            return response
+        if output == "json":
+            return StreamingHttpResponse(
+                stream_manifest_json(flight.id), content_type="application/json"
+            )
+        return Response(
+            {"output": "Output must be one of: json, csv"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    @extend_schema(
+        request=None,
+        responses={200: dict},
+        description="Short-lived ticket that opens the live seat feed of the flight "
+                    f"(SSE or WebSocket, ?ticket=) within {LIVE_TICKET_SECONDS} seconds.",
+    )
+    @action(
+        methods=["POST"],
+        detail=True,
+        url_path="seats/ticket",
+        permission_classes=[IsAuthenticated],
+    )
+    def seat_stream_ticket(self, request, pk=None):
+        flight = get_object_or_404(Flight.objects.only("id"), pk=pk)
+        return Response(
+            {"ticket": stream_ticket(request.user, flight.id), "expires_in": LIVE_TICKET_SECONDS}
+        )
+
 
 class OrderPagination(PageNumberPagination):
     page_size = 1
     max_page_size = 100
 
 
-class OrderViewSet(viewsets.ModelViewSet):
-    queryset = Order.objects.all().prefetch_related(
-        "tickets__flight__route__source",
-        "tickets__flight__route__destination",
-        "tickets__flight__airplane",
-
-    )
+class OrderViewSet(ReplicaReadMixin, SparseFieldsMixin, viewsets.ModelViewSet):
+    queryset = Order.objects.all()
     pagination_class = OrderPagination
     permission_classes = (IsAuthenticated,)
+    field_queries = {
+        "tickets": {
+            "prefetch_related": [
+                "tickets__flight__route__source",
+                "tickets__flight__route__destination",
+                "tickets__flight__airplane",
+            ]
+        },
+    }
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -255,15 +741,241 @@ class OrderViewSet(viewsets.ModelViewSet):
         return OrderSerializer
 
     def get_queryset(self):
-        queryset = self.queryset.filter(user=self.request.user)
+        queryset = self.shape_queryset(self.queryset).filter(user=self.request.user).using(
+            order_database(self.request.user.id)
+        )
 
         return queryset
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name=IDEMPOTENCY_HEADER,
+                type=str,
+                location=OpenApiParameter.HEADER,
+                description="Client-generated key; retries with the same key "
+                            "replay the first response instead of booking again",
+            ),
+        ]
+    )
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return self.book(request, *args, **kwargs)
+        if len(key) > 255:
+            return Response(
+                {"detail": f"{IDEMPOTENCY_HEADER} must be at most 255 characters."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        record, claimed = claim_key(request.user, key, request_fingerprint(request.data))
+        if not claimed:
+            if record.request_hash != request_fingerprint(request.data):
+                return Response(
+                    {"detail": f"{IDEMPOTENCY_HEADER} was already used with a different request."},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            if record.response_status is None:
+                return Response(
+                    {"detail": f"A request with this {IDEMPOTENCY_HEADER} is still in progress."},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            return Response(
+                record.response_body,
+                status=record.response_status,
+                headers={"Idempotent-Replayed": "true"},
+            )
+
+        try:
+            response = self.book(request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+        complete_key(record, response)
+        return response
+
+    def book(self, request, *args, **kwargs):
+        """Create the order, or queue it for the booking workers in async mode."""
+        if not settings.ASYNC_ORDER_INTAKE:
+            return super().create(request, *args, **kwargs)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        validated_data = serializer.validated_data
+        booking = enqueue(
+            request.user,
+            validated_data.get("tickets"),
+            flight=validated_data.get("flight"),
+            auto_seats=validated_data.get("auto_seats"),
+        )
+        data = BookingRequestSerializer(booking, context=self.get_serializer_context()).data
+        return Response(data, status=status.HTTP_202_ACCEPTED, headers={"Location": data["url"]})
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+        pin_to_primary(self.request.user)
+
+    @extend_schema(
+        responses={200: dict},
+        description="List the user's orders that were moved to the flight archive.",
+    )
+    @action(methods=["GET"], detail=False)
+    def archived(self, request):
+        entries = ArchivedOrder.objects.filter(user=request.user).order_by(
+            "-created_at", "-order_id"
+        )
+        page = self.paginate_queryset(entries)
+        if page is not None:
+            return self.get_paginated_response(load_archived_orders(page))
+        return Response(load_archived_orders(list(entries)))
+
+
+class BookingRequestViewSet(
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """Status of orders queued while async order intake is on.
+
+    Always read from the primary: clients poll it right after the workers
+    have written the outcome.
+    """
+    queryset = BookingRequest.objects.all()
+    serializer_class = BookingRequestSerializer
+    pagination_class = OrderPagination
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        return self.queryset.filter(user=self.request.user).order_by("-id")
 
 
 class TicketViewSet(viewsets.ModelViewSet):
     queryset = Ticket.objects.select_related("flight", "order").all()
     serializer_class = TicketSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+
+
+class RouteLoadPagination(PageNumberPagination):
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+
+ROUTE_LOAD_PARAMETERS = [
+    OpenApiParameter(
+        name="start",
+        type=str,
+        description="First departure day (YYYY-MM-DD)",
+        style="form",
+        explode=True,
+    ),
+    OpenApiParameter(
+        name="end",
+        type=str,
+        description="Last departure day (YYYY-MM-DD)",
+        style="form",
+        explode=True,
+    ),
+    OpenApiParameter(
+        name="route",
+        type=int,
+        description="Filtering by route id (ex. ?route=3)",
+        style="form",
+        explode=True,
+    ),
+    FROM_PARAMETER,
+    TO_PARAMETER,
+]
+
+
+class RouteDailyLoadViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """Load factor per route and departure day, read from the rollup table only."""
+    queryset = RouteDailyLoad.objects.select_related("route__source", "route__destination")
+    serializer_class = RouteDailyLoadSerializer
+    pagination_class = RouteLoadPagination
+    permission_classes = (IsAdminUser,)
+
+    def get_queryset(self):
+        queryset = self.queryset
+        try:
+            start = self.request.query_params.get("start")
+            if start:
+                queryset = queryset.filter(date__gte=datetime.strptime(start, "%Y-%m-%d").date())
+            end = self.request.query_params.get("end")
+            if end:
+                queryset = queryset.filter(date__lte=datetime.strptime(end, "%Y-%m-%d").date())
+        except ValueError:
+            raise ValidationError({"detail": "Dates must be in YYYY-MM-DD format."})
+
+        route = self.request.query_params.get("route")
+        if route:
+            if not route.isdigit():
+                raise ValidationError({"route": "Route must be an id."})
+            queryset = queryset.filter(route_id=int(route))
+
+        queryset = filter_by_iata_pair(self.request, queryset, "route__")
+
+        return queryset.order_by("date", "route_id")
+
+    @extend_schema(parameters=ROUTE_LOAD_PARAMETERS)
+    def list(self, request, *args, **kwargs):
+        """Seats offered and sold per route and day"""
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(
+        parameters=ROUTE_LOAD_PARAMETERS,
+        responses={200: RouteLoadTotalSerializer(many=True)},
+    )
+    @action(methods=["GET"], detail=False, url_path="by-route")
+    def by_route(self, request):
+        """Seats offered and sold per route over the whole date range"""
+        totals = (
+            self.get_queryset()
+            .order_by()
+            .values("route_id")
+            .annotate(
+                source=F("route__source__iata_code"),
+                destination=F("route__destination__iata_code"),
+                days=Count("id"),
+                seats_offered=Sum("seats_offered"),
+                seats_sold=Sum("seats_sold"),
+            )
+            .order_by("route_id")
+        )
+        page = self.paginate_queryset(totals)
+        serializer = RouteLoadTotalSerializer(
+            [{**total, "route": total["route_id"]} for total in page or totals], many=True
+        )
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
+
+async def flight_seat_stream(request, pk):
+    """Server-Sent Events with the seat map of a flight, then every change to it."""
+    if not isinstance(request, ASGIRequest):
+        # A WSGI server would buffer the endless stream and hold a thread forever.
+        return JsonResponse(
+            {"detail": "The seat stream is only served by the ASGI application."},
+            status=status.HTTP_501_NOT_IMPLEMENTED,
+        )
+    user = await sync_to_async(authenticate)(request, pk)
+    if user is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."},
+            status=status.HTTP_401_UNAUTHORIZED,
+        )
+
+    # Subscribe before reading the snapshot so no change falls in between.
+    subscription = broker.subscribe(pk)
+    snapshot = await sync_to_async(seat_snapshot)(pk)
+    if snapshot is None:
+        broker.unsubscribe(subscription)
+        raise Http404
+
+    response = StreamingHttpResponse(
+        sse_stream(pk, snapshot, subscription), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
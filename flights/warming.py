@@ -0,0 +1,123 @@
+"""Fill the caches that are cold after a deploy or a worker restart.
+
+The tasks load the IATA route map (kept in the default cache, used by
+flight and route search), the airport distance matrix and KD-tree, and
+the departure and arrival boards of the airports on the routes with the
+most flights in the next days. Boards, matrix and tree live in process
+memory, so only a warm-up inside the worker helps them: gunicorn runs
+:func:`warm_caches` in each worker at start (see ``gunicorn.conf.py``).
+``manage.py warm_caches`` runs in a process of its own and only loads
+the route map, which the workers see through the shared cache (Redis,
+see ``REDIS_URL``); it refuses to run with a process-local cache. No
+flight search results are cached, so there is nothing else a separate
+process could warm for the busiest routes.
+
+Tasks run on a small thread pool. Whatever has not finished when the
+time budget runs out is reported as skipped and left to be loaded by
+the first request that needs it.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count
+from django.utils import timezone
+
+from flights import boards, geo, route_lookup
+from flights.models import Flight
+
+WARMUP_THREADS = 4
+
+
+def busiest_routes(days: int, limit: int) -> list[tuple[int, int]]:
+    """``(source_id, destination_id)`` of the routes with the most flights departing in the next ``days``."""
+    now = timezone.now()
+    return list(
+        Flight.objects.filter(departure_time__gte=now, departure_time__lt=now + timedelta(days=days))
+        .values("route_id", "route__source_id", "route__destination_id")
+        .annotate(flights=Count("id"))
+        .order_by("-flights", "route_id")
+        .values_list("route__source_id", "route__destination_id")[:limit]
+    )
+
+
+def warmup_tasks(days: int, routes: int, local: bool = True) -> dict:
+    """Tasks by name; ``local=False`` keeps those filling the shared cache only."""
+    tasks = {"route_map": route_lookup.route_map}
+    if not local:
+        return tasks
+    tasks["distance_matrix"] = geo.get_matrix
+    tasks["airport_tree"] = geo.get_tree
+    for source_id, destination_id in busiest_routes(days, routes):
+        for direction, airport_id in (("departures", source_id), ("arrivals", destination_id)):
+            tasks.setdefault(
+                f"{direction}:{airport_id}",
+                lambda direction=direction, airport_id=airport_id: boards.upcoming(
+                    direction, airport_id, boards.BOARD_LIMIT
+                ),
+            )
+    return tasks
+
+
+def _run(task) -> float:
+    started = time.perf_counter()
+    task()
+    return time.perf_counter() - started
+
+
+def _run_in_thread(task) -> float:
+    try:
+        return _run(task)
+    finally:
+        # Pool threads do not serve requests; do not leave their connections open.
+        connections.close_all()
+
+
+def warm_caches(
+    days=None, routes=None, budget=None, threads: int = WARMUP_THREADS, local: bool = True
+) -> dict:
+    """Run the warm-up tasks and return ``warmed`` (seconds per task), ``failed`` and ``skipped``.
+
+    ``threads=1`` runs the tasks one after the other in the calling thread.
+    ``local=False`` skips the caches held in this process's memory.
+    """
+    days = settings.CACHE_WARMUP_DAYS if days is None else days
+    routes = settings.CACHE_WARMUP_ROUTES if routes is None else routes
+    budget = settings.CACHE_WARMUP_BUDGET if budget is None else budget
+    deadline = time.monotonic() + budget
+
+    tasks = warmup_tasks(days, routes, local)
+    results = {"warmed": {}, "failed": {}, "skipped": []}
+
+    def record(name, outcome):
+        if isinstance(outcome, Exception):
+            results["failed"][name] = f"{type(outcome).__name__}: {outcome}"
+        else:
+            results["warmed"][name] = outcome
+
+    if threads <= 1:
+        for name, task in tasks.items():
+            if time.monotonic() >= deadline:
+                results["skipped"].append(name)
+                continue
+            try:
+                record(name, _run(task))
+            except Exception as error:
+                record(name, error)
+        return results
+
+    executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="warm-caches")
+    futures = {executor.submit(_run_in_thread, task): name for name, task in tasks.items()}
+    wait(futures, timeout=max(deadline - time.monotonic(), 0))
+    # Tasks still queued are dropped; running ones finish in the background.
+    executor.shutdown(wait=False, cancel_futures=True)
+    for future, name in futures.items():
+        if not future.done() or future.cancelled():
+            results["skipped"].append(name)
+        elif future.exception() is not None:
+            record(name, future.exception())
+        else:
+            record(name, future.result())
+    return results
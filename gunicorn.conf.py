@@ -0,0 +1,83 @@
+"""Production server: ``gunicorn -c gunicorn.conf.py Airport_API_Service.asgi:application``.
+
+The master imports Django and warms it up (see
+``Airport_API_Service.warmup``) before forking, so workers start ready
+to serve and share that memory copy-on-write.
+
+Reloading: ``kill -HUP <master>`` starts fresh workers and stops the old
+ones gracefully, but keeps the preloaded code. To deploy new code
+without dropping requests, send ``USR2`` (starts a new master with the
+new code next to the old one), then ``WINCH`` and ``TERM`` to the old
+master once the new workers are up.
+
+Workers are uvicorn workers serving the ASGI application, which the
+live seat feed (SSE and WebSocket) needs: a stream holds no thread while
+it waits for events. ``GUNICORN_WORKER_CLASS=gthread`` with
+``Airport_API_Service.wsgi`` still serves the API, but then the seat
+stream answers 501 and ``GUNICORN_THREADS`` bounds the requests each
+worker serves at once.
+
+Each worker fills its in-memory caches (``flights.warming``) before it
+accepts connections, within ``CACHE_WARMUP_BUDGET`` seconds; set
+``WARM_CACHES_ON_START=false`` to skip that.
+"""
+import multiprocessing
+import os
+import time
+
+_started = time.monotonic()
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "Airport_API_Service.settings_production")
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "uvicorn.workers.UvicornWorker")
+# Only used by the gthread worker
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+preload_app = True
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+# Recycle workers now and then so slow leaks cannot grow without bound
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 5000))
+max_requests_jitter = max_requests // 10
+
+# Fill each worker's boards and distance caches before it takes requests
+_warm_caches_on_start = os.getenv("WARM_CACHES_ON_START", "true").lower() == "true"
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    # preload_app has imported the application in the master by now.
+    from Airport_API_Service.warmup import warm_up
+
+    timings = warm_up()
+    server.log.info(
+        "Warm-up: %s",
+        ", ".join(f"{step} {seconds * 1000:.0f} ms" for step, seconds in timings.items()),
+    )
+
+
+def when_ready(server):
+    server.log.info(
+        "Master ready in %.2f s, forking %s workers",
+        time.monotonic() - _started,
+        server.num_workers,
+    )
+
+
+def post_worker_init(worker):
+    if not _warm_caches_on_start:
+        return
+    from flights.warming import warm_caches
+
+    results = warm_caches()
+    worker.log.info(
+        "Warmed %s caches (%s failed, %s skipped)",
+        len(results["warmed"]),
+        len(results["failed"]),
+        len(results["skipped"]),
+    )
@@ -0,0 +1,121 @@
+"""Run the password hashing endpoints on a dedicated, bounded thread pool.
+
+Registering and obtaining a token spend most of their time in PBKDF2.
+:func:`offload` wraps such a view in an async view that hands the whole
+request to a pool of ``AUTH_EXECUTOR_WORKERS`` threads, so a burst of
+sign-ins uses at most that many cores and does not hold the threads (or
+the event loop) that serve flight search. ``AUTH_EXECUTOR_QUEUE`` more
+requests may wait for a free thread; beyond that the endpoint answers
+429 straight away instead of queueing without bound.
+
+That only holds under ASGI. A WSGI server (gunicorn's gthread worker)
+runs the async view through ``async_to_sync``, so the request thread
+blocks until the pool is done with it. There at most
+``AUTH_EXECUTOR_WSGI_SLOTS`` requests per process may be running or
+waiting, fewer than the server's request threads, and the rest are
+refused with 429 as well.
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+from django.http import JsonResponse
+from rest_framework import status
+
+_lock = threading.Lock()
+_executor = None
+# Free places for one more request, running or waiting
+_slots = None
+# Free places for one more request holding a WSGI request thread
+_wsgi_slots = None
+
+
+class AuthExecutorSaturated(Exception):
+    pass
+
+
+def _pool() -> tuple[ThreadPoolExecutor, threading.BoundedSemaphore]:
+    global _executor, _slots, _wsgi_slots
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.AUTH_EXECUTOR_WORKERS, thread_name_prefix="auth"
+            )
+            _slots = threading.BoundedSemaphore(
+                settings.AUTH_EXECUTOR_WORKERS + settings.AUTH_EXECUTOR_QUEUE
+            )
+            _wsgi_slots = threading.BoundedSemaphore(settings.AUTH_EXECUTOR_WSGI_SLOTS)
+        return _executor, _slots
+
+
+def _acquire(request) -> list[threading.BoundedSemaphore]:
+    """Take the places ``request`` needs, or raise ``AuthExecutorSaturated``."""
+    _, slots = _pool()
+    needed = [slots] if isinstance(request, ASGIRequest) else [_wsgi_slots, slots]
+    held = []
+    for semaphore in needed:
+        if not semaphore.acquire(blocking=False):
+            for taken in held:
+                taken.release()
+            raise AuthExecutorSaturated
+        held.append(semaphore)
+    return held
+
+
+def _call(view, request, *args, **kwargs):
+    # Pool threads see no request_started/finished signals; honour CONN_MAX_AGE here.
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, "render"):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+async def run(view, request, *args, **kwargs):
+    """Run the sync ``view`` on the pool, or raise ``AuthExecutorSaturated`` when it is full."""
+    held = _acquire(request)
+    executor, _ = _pool()
+    future = executor.submit(_call, view, request, *args, **kwargs)
+    # Released when the work is done, even if the client has gone away meanwhile.
+    future.add_done_callback(lambda _: [semaphore.release() for semaphore in held])
+    return await asyncio.wrap_future(future)
+
+
+def offload(view_class, **initkwargs):
+    """``view_class.as_view()`` served from the auth pool.
+
+    The returned view keeps the DRF view's attributes, so the schema still
+    documents it as ``view_class``.
+    """
+    view = view_class.as_view(**initkwargs)
+
+    @functools.wraps(view)
+    async def offloaded_view(request, *args, **kwargs):
+        try:
+            return await run(view, request, *args, **kwargs)
+        except AuthExecutorSaturated:
+            response = JsonResponse(
+                {"detail": "Too many sign-in requests, try again shortly."},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+            )
+            response["Retry-After"] = "1"
+            return response
+
+    return offloaded_view
+
+
+def reset() -> None:
+    global _executor, _slots, _wsgi_slots
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+        _executor = None
+        _slots = None
+        _wsgi_slots = None
@@ -1,3 +1,91 @@
-from django.test import TestCase
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import resolve, reverse
+from rest_framework_simplejwt.views import TokenObtainPairView
 
-# Create your tests here.
+from user import auth_executor
+from user.views import CreateUserView
+
+REGISTER_URL = reverse("user:create")
+TOKEN_URL = reverse("user:token_obtain_pair")
+
+
+class OffloadedAuthTests(TransactionTestCase):
+    def setUp(self):
+        auth_executor.reset()
+        self.addCleanup(auth_executor.reset)
+
+    def test_register_and_obtain_token(self):
+        res = self.client.post(
+            REGISTER_URL,
+            {"email": "user@user.com", "password": "1qazcde3"},
+            content_type="application/json",
+        )
+
+        self.assertEqual(res.status_code, 201)
+        self.assertTrue(get_user_model().objects.get(email="user@user.com").check_password("1qazcde3"))
+
+        res = self.client.post(
+            TOKEN_URL,
+            {"email": "user@user.com", "password": "1qazcde3"},
+            content_type="application/json",
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertIn("access", res.json())
+
+        res = self.client.post(
+            TOKEN_URL,
+            {"email": "user@user.com", "password": "wrong"},
+            content_type="application/json",
+        )
+        self.assertEqual(res.status_code, 401)
+
+    def test_register_validation_error(self):
+        res = self.client.post(
+            REGISTER_URL, {"email": "not-an-email"}, content_type="application/json"
+        )
+
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("password", res.json())
+
+
+@override_settings(AUTH_EXECUTOR_WORKERS=1, AUTH_EXECUTOR_QUEUE=0, AUTH_EXECUTOR_WSGI_SLOTS=1)
+class AuthExecutorSaturationTests(TestCase):
+    def setUp(self):
+        auth_executor.reset()
+        self.addCleanup(auth_executor.reset)
+
+    def test_saturated_pool_sheds_requests(self):
+        _, slots = auth_executor._pool()
+        slots.acquire()
+
+        res = self.client.post(
+            TOKEN_URL,
+            {"email": "user@user.com", "password": "1qazcde3"},
+            content_type="application/json",
+        )
+
+        self.assertEqual(res.status_code, 429)
+        self.assertEqual(res["Retry-After"], "1")
+
+        slots.release()
+        res = self.client.post(TOKEN_URL, {}, content_type="application/json")
+        self.assertEqual(res.status_code, 400)
+
+    @override_settings(AUTH_EXECUTOR_QUEUE=4)
+    async def test_wsgi_requests_are_limited_below_the_request_threads(self):
+        auth_executor._pool()
+        auth_executor._wsgi_slots.acquire()
+        self.addCleanup(auth_executor._wsgi_slots.release)
+
+        res = await sync_to_async(self.client.post)(TOKEN_URL, {}, content_type="application/json")
+        self.assertEqual(res.status_code, 429)
+
+        # The pool still has room for requests that do not hold a WSGI thread.
+        res = await self.async_client.post(TOKEN_URL, {}, content_type="application/json")
+        self.assertEqual(res.status_code, 400)
+
+    def test_offloaded_views_keep_their_drf_view_for_the_schema(self):
+        self.assertIs(resolve(REGISTER_URL).func.cls, CreateUserView)
+        self.assertIs(resolve(TOKEN_URL).func.cls, TokenObtainPairView)
@@ -6,11 +6,12 @@ from rest_framework_simplejwt.views import (
     TokenVerifyView,
 )
 
+from user.auth_executor import offload
 from user.views import CreateUserView, ManageUserView
 
 urlpatterns = [
-    path("register/", CreateUserView.as_view(), name="create"),
-    path("token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
+    path("register/", offload(CreateUserView), name="create"),
+    path("token/", offload(TokenObtainPairView), name="token_obtain_pair"),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("token/verify/", TokenVerifyView.as_view(), name="token_verify"),
     path("me/", ManageUserView.as_view(), name="manage"),